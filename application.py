@@ -1,24 +1,12 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk
 from erp_manager import OperationType
-from forms import CreateForm, OverwriteForm, DeleteForm
-import shutil
-
-
-def print_fancy_separator(text="", char='-'):
-    """
-    This function generates a visually appealing separator in the terminal.
-
-    :param text: The text to be centered within the separator. Default is an empty string.
-    :param char: The character used to build the separator. Default is '-'.
-    :return: None
-    """
-
-    terminal_width, _ = shutil.get_terminal_size()
-    if text:
-        text = f" {text} "
-    separator_width = (terminal_width - len(text)) // 2
-    print(f"{char * separator_width}{text}{char * separator_width}")
+from notifications import notify
+from forms import CreateForm, OverwriteForm, DeleteForm, MixedForm, UpsertForm
+from telemetry import telemetry, INFO
+from job_queue import JobQueue
+import settings
+import os
 
 
 class Application:
@@ -32,12 +20,15 @@ class Application:
         self.erp_manager = erp_manager
         self.root = tk.Tk()
         self.root.title("Operation Selection")
-        self.root.geometry("650x170")
-        self.root.minsize(650, 170)
+        self.root.geometry("1040x260")
+        self.root.minsize(1040, 260)
+        self.skip_applied_rows = tk.BooleanVar(value=settings.SKIP_APPLIED_ROWS)
+        self.unattended = tk.BooleanVar(value=settings.UNATTENDED)
+        self.enqueue = tk.BooleanVar(value=False)
 
     def create_ui(self):
         """
-        Configures the operation selection form to have 3 buttons each of which correspond with a specific OperationType
+        Configures the operation selection form to have 5 buttons each of which correspond with a specific OperationType
 
         :return: None
         """
@@ -62,6 +53,18 @@ class Application:
                    style='Tall.TButton', width=15).pack(side=tk.LEFT, padx=10)
         ttk.Button(button_frame, text="Delete", command=lambda: self.open_form(DeleteForm, OperationType.DELETE),
                    style='Tall.TButton', width=15).pack(side=tk.LEFT, padx=10)
+        ttk.Button(button_frame, text="Upsert", command=lambda: self.open_form(UpsertForm, OperationType.UPSERT),
+                   style='Tall.TButton', width=15).pack(side=tk.LEFT, padx=10)
+        ttk.Button(button_frame, text="Mixed", command=lambda: self.open_form(MixedForm, OperationType.MIXED),
+                   style='Tall.TButton', width=15).pack(side=tk.LEFT, padx=10)
+
+        # Run options
+        ttk.Checkbutton(self.root, text="Skip rows already applied by a previous run",
+                        variable=self.skip_applied_rows).pack()
+        ttk.Checkbutton(self.root, text="Run unattended (record errors and keep going, summarize at the end)",
+                        variable=self.unattended).pack()
+        ttk.Checkbutton(self.root, text="Add to the shared job queue instead of running now",
+                        variable=self.enqueue).pack()
 
     def open_form(self, form_class, operation_type):
         """
@@ -69,12 +72,16 @@ class Application:
         and Label Information. Verifies that the user data exist and then executes the specific looping method that
         cooresponds to a specific Operation subclass in erp_manager.
 
-        :param form_class: The specific form of use (CreateForm, OverwriteForm, or DeleteForm)
-        :param operation_type: The specific operation type (OperationType.Create, OperationType.OVERWRITE, or
-        OperationType.DELETE)
+        :param form_class: The specific form of use (CreateForm, OverwriteForm, DeleteForm, UpsertForm, or
+        MixedForm)
+        :param operation_type: The specific operation type (OperationType.Create, OperationType.OVERWRITE,
+        OperationType.DELETE, OperationType.UPSERT, or OperationType.MIXED)
         :raises: Any error that gets caught during the execute method
         """
 
+        settings.SKIP_APPLIED_ROWS = self.skip_applied_rows.get()
+        settings.UNATTENDED = self.unattended.get()
+
         form_window = tk.Toplevel(self.root)
         form = form_class(form_window)
         form.create_file_form(operation_type)  # Create the File Information form
@@ -82,16 +89,43 @@ class Application:
         self.root.wait_window(form_window)
 
         # Check for existing file data and termination global variable
-        if form.file_data and not form.is_terminated:
+        if form.file_data and not form.is_terminated and self.enqueue.get():
+            self.submit_to_queue(operation_type, form.file_data, form.label_data)
+        elif form.file_data and not form.is_terminated:
             try:
                 self.erp_manager.perform_operation(operation_type, form.file_data, form.label_data)
-                print_fancy_separator("Program Terminated")
-                messagebox.showinfo("Success", f"{operation_type.name} operation completed successfully.")
+                telemetry.separator("Program Terminated")
+                telemetry.flush()
+                notify("Success", f"{operation_type.name} operation completed successfully.", INFO)
             except Exception as e:
-                messagebox.showerror("Error", str(e))
+                notify("Error", str(e), outcome=type(e).__name__)
                 raise e
         self.root.quit()
 
+    def submit_to_queue(self, operation_type, file_data, label_data):
+        """
+        Adds the operation to the shared job queue, for the queue runner to perform when its turn comes
+
+        :param operation_type: The specific operation type
+        :param file_data: Data collected by the File Information form
+        :type file_data: dict
+        :param label_data: Data collected by the Label Information form
+        :type label_data: dict
+        :return: None
+        """
+
+        entry = dict(file_data, **{"Operation": operation_type.name, "Label Data": label_data})
+        name = f"{operation_type.name} {os.path.basename(file_data['Input File'])} [{file_data['Sheet Name']}]"
+        job_queue = JobQueue()
+        try:
+            job_id = job_queue.submit_entries([entry], name,
+                                              job_settings={"SKIP_APPLIED_ROWS": self.skip_applied_rows.get()})
+            job = job_queue.status(job_id)
+        finally:
+            job_queue.close()
+        notify("Queued", f"Job {job_id} is number {job['position']} in the queue and should be done around "
+                         f"{job['eta']}.", INFO, outcome="queued")
+
     def run(self):
         """
         Run the UI
@@ -0,0 +1,233 @@
+from concurrent.futures import ProcessPoolExecutor
+from forms import validate_file_location, is_file_open, is_valid_column, is_valid_row_combo
+from workbook_reader import read_part_rows
+from input_validation import validate_rows, format_issues
+from option_catalog import catalog
+from telemetry import telemetry
+import openpyxl
+import json
+import os
+
+
+# Operations a job entry may name, matching the OperationType member names in erp_manager
+OPERATION_NAMES = ("CREATE", "OVERWRITE", "DELETE", "MIXED", "UPSERT")
+
+# Label Information fields every entry that creates parts must fill in
+LABEL_FIELDS = ("Type", "Group", "Class", "Label Group", "Reporting Group", "On Hold Reason")
+CHECKBOX_FIELDS = ("Priced Part", "Salesforce Sync", "Catalog Part")
+
+# Settings a job may override for itself in the 'Settings' object of its job file. Everything else (the UI driver,
+# the input mode) is chosen once when a long-lived process (the hot folder, the job queue) starts and stays warm
+# across jobs.
+JOB_SETTINGS = (
+    "SKIP_APPLIED_ROWS", "VERIFY_EXPORT_FILE", "VERIFY_EXPORT_TIMEOUT", "RATE_TARGET_ROWS_PER_MINUTE",
+    "RATE_LATENCY_TARGET", "UNATTENDED_MAX_CONSECUTIVE_FAILURES", "BULK_IMPORT_DIRECTORY", "BULK_IMPORT_CHUNK_ROWS",
+    "BULK_IMPORT_COMPANY", "RUN_REPORT", "PROFILE_RUN"
+)
+
+
+def load_job(job_path):
+    """
+    Reads a job file listing several (file, sheet, range, operation) entries.
+
+    The job file is JSON with an 'entries' list. Each entry uses the same keys as the File Information form
+    ('Input File', 'Sheet Name', 'Part Column Letter', 'Description Column Letter', 'First Row', 'Last Row') plus an
+    'Operation' name (CREATE, OVERWRITE, DELETE, MIXED, or UPSERT) and, for everything but DELETE, a 'Label Data'
+    dictionary using the Label Information keys. MIXED entries also name an 'Action Column Letter'. Relative input
+    file paths are resolved against the job file's folder.
+
+    :param job_path: The path to the job file
+    :type job_path: str
+
+    :return: The list of job entries
+    :rtype: list
+    """
+
+    with open(job_path, "r", encoding="utf-8") as job_file:
+        job = json.load(job_file)
+
+    job_folder = os.path.dirname(os.path.abspath(job_path))
+    entries = []
+    for entry in job.get("entries", []):
+        entry = dict(entry)
+        entry["Operation"] = str(entry.get("Operation", "")).upper()
+        if entry.get("Input File") and not os.path.isabs(entry["Input File"]):
+            entry["Input File"] = os.path.join(job_folder, entry["Input File"])
+        entries.append(entry)
+
+    return entries
+
+
+def load_job_settings(job_path):
+    """
+    Reads the settings a job file overrides for itself
+
+    :param job_path: The path of the job file
+    :type job_path: str
+    :raises ValueError: If the job file overrides a setting that is not in JOB_SETTINGS
+    :return: The settings and their values
+    :rtype: dict
+    """
+
+    with open(job_path, "r", encoding="utf-8") as job_file:
+        job_settings = json.load(job_file).get("Settings") or {}
+    unknown = sorted(set(job_settings) - set(JOB_SETTINGS))
+    if unknown:
+        raise ValueError(f"The job file overrides settings a job cannot change: {', '.join(unknown)}")
+    return job_settings
+
+
+def parse_job_entry(entry):
+    """
+    Validates a single job entry and reads its rows. This runs inside a worker process, so it only touches the
+    workbook and never the ERP system. The label values are checked against the option catalog by prepare_job.
+
+    :param entry: A job entry as returned by load_job
+    :type entry: dict
+
+    :return: A tuple of the parsed entry (with 'Sheet Index', 'Label Data', and 'Rows' filled in) and a list of the
+    validation errors found. The parsed entry is None when any error was found.
+    :rtype: tuple
+    """
+
+    entry = dict(entry)
+    name = f"{entry.get('Input File')} [{entry.get('Sheet Name')}]"
+    errors = []
+
+    required_keys = ["Input File", "Sheet Name", "Part Column Letter", "First Row", "Last Row"]
+    if entry.get("Operation") in ("CREATE", "MIXED", "UPSERT"):
+        required_keys.append("Description Column Letter")
+    if entry.get("Operation") == "MIXED":
+        required_keys.append("Action Column Letter")
+    missing_keys = [key for key in required_keys if str(entry.get(key) or "").strip() == ""]
+    if missing_keys:
+        return None, [f"{name}: missing {', '.join(missing_keys)}"]
+
+    if entry.get("Operation") not in OPERATION_NAMES:
+        errors.append(f"{name}: invalid operation '{entry.get('Operation')}'")
+
+    label_data = dict(entry.get("Label Data") or {})
+    if entry.get("Operation") != "DELETE":
+        for field in LABEL_FIELDS:
+            label_data[field] = label_data.get(field) or ""
+        for field in CHECKBOX_FIELDS:
+            label_data[field] = bool(label_data.get(field))
+    entry["Label Data"] = label_data
+
+    # Validate the user-inputted Excel file
+    if not validate_file_location(entry["Input File"]):
+        return None, errors + [f"{name}: invalid file input"]
+    if is_file_open(entry["Input File"]):
+        return None, errors + [f"{name}: Excel file is currently open"]
+
+    # Validate column letters and row order
+    entry["First Row"], entry["Last Row"] = str(entry["First Row"]), str(entry["Last Row"])
+    if not is_valid_column(entry["Part Column Letter"]):
+        errors.append(f"{name}: invalid part column letter")
+    if entry.get("Description Column Letter"):
+        if (not is_valid_column(entry["Description Column Letter"])
+                or entry["Description Column Letter"] == entry["Part Column Letter"]):
+            errors.append(f"{name}: invalid description column letter")
+    if entry.get("Action Column Letter"):
+        if (not is_valid_column(entry["Action Column Letter"]) or entry["Action Column Letter"] in
+                (entry["Part Column Letter"], entry.get("Description Column Letter"))):
+            errors.append(f"{name}: invalid action column letter")
+    is_valid, message = is_valid_row_combo(entry["First Row"], entry["Last Row"])
+    if not is_valid:
+        errors.append(f"{name}: {message}")
+    if errors:
+        return None, errors
+
+    # Validate that the sheet is within the Excel file
+    workbook = openpyxl.load_workbook(entry["Input File"], read_only=True)
+    try:
+        sheet_names = workbook.sheetnames
+    finally:
+        workbook.close()
+    if entry["Sheet Name"] not in sheet_names:
+        return None, [f"{name}: invalid sheet name"]
+    entry["Sheet Index"] = sheet_names.index(entry["Sheet Name"])
+
+    # Read the rows once and check every row of the range in the same way the File Information form does
+    entry["Rows"] = rows = read_part_rows(entry)
+    errors += [f"{name}: {line}" for line in format_issues(validate_rows(rows, entry, entry["Operation"]))]
+
+    # Validate the label data in the same way the Label Information form does
+    creates_parts = entry["Operation"] in ("CREATE", "UPSERT") or any(row.get("Action") == "CREATE" for row in rows)
+    if creates_parts:
+        for field in LABEL_FIELDS:
+            if label_data[field] == "":
+                errors.append(f"{name}: '{field}' is required when creating parts")
+
+    return (None if errors else entry), errors
+
+
+def prepare_job(entries, max_workers=None, executor=None):
+    """
+    Parses and validates every job entry in parallel worker processes before anything touches the ERP system
+
+    :param entries: The job entries as returned by load_job
+    :type entries: list
+    :param max_workers: The largest number of worker processes to start. Defaults to one per entry, capped at the
+    machine's CPU count.
+    :type max_workers: int
+    :param executor: A process pool kept between jobs, e.g. by the hot folder. Defaults to a pool started for this
+    job alone.
+    :type executor: concurrent.futures.Executor
+
+    :raises ValueError: If the job has no entries or any entry is invalid. The message lists every problem found.
+
+    :return: The parsed entries, in job order
+    :rtype: list
+    """
+
+    if not entries:
+        raise ValueError("The job file has no entries")
+
+    if executor:
+        results = list(executor.map(parse_job_entry, entries))
+    else:
+        max_workers = max_workers or min(len(entries), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(parse_job_entry, entries))
+
+    errors = []
+    for entry, (_, entry_errors) in zip(entries, results):
+        errors += entry_errors
+        # The option catalog is only loaded in this process; the workers would check against the static lists
+        name = f"{entry.get('Input File')} [{entry.get('Sheet Name')}]"
+        errors += [f"{name}: '{value}' is not an available {field} value"
+                   for field, value in catalog.invalid_values(entry.get("Label Data") or {})]
+    if errors:
+        raise ValueError("The job could not be validated:\n" + "\n".join(errors))
+
+    return [entry for entry, _ in results]
+
+
+def warm_worker(_):
+    """
+    Does nothing in a prepare_job worker process but start it: unpickling this function imports this module there,
+    which loads openpyxl, the forms, and the option catalog. It lives here so that the workers never import
+    erp_manager.
+
+    :return: The worker's process id
+    :rtype: int
+    """
+    return os.getpid()
+
+
+def run_job(erp_manager, job_path):
+    """
+    Loads, validates, and performs a job file over a single Part Maintenance session
+
+    :param erp_manager: An instance of the ERPManager class
+    :param job_path: The path to the job file
+    :type job_path: str
+    :return: None
+    """
+
+    catalog.wait_for_refresh(timeout=60)
+    job_entries = prepare_job(load_job(job_path))
+    telemetry.info(f"Validated {len(job_entries)} job entries "
+                   f"({sum(len(entry['Rows']) for entry in job_entries)} rows)", step="validate_job")
+    erp_manager.perform_job(job_entries)
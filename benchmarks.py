@@ -0,0 +1,193 @@
+from workbook_generator import generate_workbook
+from workbook_reader import read_part_rows
+from input_validation import validate_rows
+from openpyxl import load_workbook
+import tracemalloc
+import argparse
+import platform
+import tempfile
+import time
+import json
+import sys
+import gc
+import os
+
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+BASELINE_FILENAME = "benchmark_baselines.json"
+
+# Share by which a stage may be slower or use more memory than its baseline before it counts as a regression
+DEFAULT_TOLERANCE = 0.25
+
+
+def measure(work):
+    """
+    Runs the work once and measures its wall time and its peak traced memory. Memory is traced in every thread, so
+    work handed to a background writer is included.
+
+    :param work: A callable
+    :return: A tuple of the seconds taken, the peak memory in bytes, and whatever the work returned
+    :rtype: tuple
+    """
+
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        result = work()
+        seconds = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, peak, result
+
+
+def run_suite(sizes, seed, workdir):
+    """
+    Measures the input side of a run on synthetic workbooks of each size: finding the sheet (read_sheet_names, as
+    the File Information form does), reading the selected range, validating it, and writing an operation log record
+    for every row. Workbooks are generated once per size and seed and kept in the working folder.
+
+    :param sizes: The numbers of rows to measure
+    :type sizes: list
+    :param seed: The seed of the synthetic workbooks
+    :type seed: int
+    :param workdir: The folder the workbooks, the operation logs, and the history database are written to
+    :type workdir: str
+    :return: A dictionary whose keys are 'stage@rows' and whose values hold 'seconds' and 'peak_mb' (None for a
+    stage that could not run here)
+    :rtype: dict
+    """
+
+    # The operation logger writes its log and the history database into the working folder
+    os.chdir(workdir)
+    from erp_manager import OperationLogger
+
+    try:
+        from forms import read_sheet_names
+    except ImportError as e:
+        # The forms need tkinter and the Windows console, which a build agent may lack
+        print(f"sheet_lookup skipped: {e}", file=sys.stderr)
+        read_sheet_names = None
+
+    results = {}
+    for size in sizes:
+        path = os.path.join(workdir, f"bench_{size}_{seed}.xlsx")
+        if os.path.exists(path):
+            file_data = _existing_file_data(path, size)
+        else:
+            print(f"Generating {size} rows...", file=sys.stderr)
+            file_data = generate_workbook(path, size, seed)
+
+        def record(stage, measured):
+            seconds, peak, _ = measured
+            results[f"{stage}@{size}"] = {"seconds": round(seconds, 4), "peak_mb": round(peak / 2 ** 20, 2)}
+
+        if read_sheet_names:
+            record("sheet_lookup", measure(lambda: read_sheet_names(path).index("Parts")))
+        else:
+            results[f"sheet_lookup@{size}"] = None
+
+        seconds, peak, rows = measure(lambda: read_part_rows(file_data))
+        record("ingestion", (seconds, peak, rows))
+        record("validation", measure(lambda: validate_rows(rows, file_data, "MIXED")))
+
+        def write_log():
+            logger = OperationLogger()
+            for row in rows:
+                logger.log_operation("Create", str(row["Part Number"]), row["Description"], "Completed")
+            logger.flush()
+
+        record("log_writing", measure(write_log))
+        del rows
+
+    return results
+
+
+def _existing_file_data(path, size):
+    # Generating is deterministic, so only the position of the 'Parts' sheet has to be read back
+    workbook = load_workbook(path, read_only=True)
+    try:
+        sheet_index = workbook.sheetnames.index("Parts")
+    finally:
+        workbook.close()
+    return {"Input File": path, "Sheet Name": "Parts", "Sheet Index": sheet_index, "First Row": 2,
+            "Last Row": size + 1, "Part Column Letter": "A", "Description Column Letter": "B",
+            "Action Column Letter": "C"}
+
+
+def compare(results, baselines, tolerance):
+    """
+    Compares measurements with their baselines
+
+    :param results: The measurements, as returned by run_suite
+    :type results: dict
+    :param baselines: The stored measurements
+    :type baselines: dict
+    :param tolerance: The share by which a measurement may exceed its baseline
+    :type tolerance: float
+    :return: A tuple of the report lines and the number of regressions
+    :rtype: tuple
+    """
+
+    lines = [f"{'stage@rows':<24}{'seconds':>10}{'baseline':>10}{'peak MB':>10}{'baseline':>10}"]
+    regressions = 0
+    for key, result in results.items():
+        baseline = baselines.get(key)
+        if result is None:
+            lines.append(f"{key:<24}{'skipped':>10}")
+            continue
+
+        flags = []
+        if baseline:
+            if result["seconds"] > baseline["seconds"] * (1 + tolerance):
+                flags.append("slower")
+            if result["peak_mb"] > baseline["peak_mb"] * (1 + tolerance):
+                flags.append("more memory")
+        regressions += bool(flags)
+        lines.append(f"{key:<24}{result['seconds']:>10.3f}"
+                     f"{baseline['seconds'] if baseline else '-':>10}{result['peak_mb']:>10.2f}"
+                     f"{baseline['peak_mb'] if baseline else '-':>10}"
+                     + (f"  REGRESSION: {', '.join(flags)}" if flags else ""))
+    return lines, regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the input side (sheet lookup, reading, validation, "
+                                                 "and log writing) on synthetic workbooks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="Numbers of rows to measure, up to 1000000 (default: 1000 10000 100000)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic workbooks (default: 0)")
+    parser.add_argument("--workdir", help="Folder for the workbooks and logs, reused between runs "
+                                          "(default: a new temporary folder)")
+    parser.add_argument("--baselines", default=BASELINE_FILENAME,
+                        help=f"Stored baselines to compare with (default: {BASELINE_FILENAME})")
+    parser.add_argument("--save-baselines", action="store_true",
+                        help="Store this run's measurements as the new baselines")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Allowed slowdown or memory growth over the baseline (default: {DEFAULT_TOLERANCE})")
+    args = parser.parse_args()
+
+    baselines_path = os.path.abspath(args.baselines)
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="partcreator_bench_"))
+    os.makedirs(workdir, exist_ok=True)
+
+    stored = {}
+    if os.path.exists(baselines_path):
+        with open(baselines_path, "r", encoding="utf-8") as baselines_file:
+            stored = json.load(baselines_file)
+
+    results = run_suite(args.sizes, args.seed, workdir)
+    lines, regressions = compare(results, stored.get("results", {}), args.tolerance)
+    print("\n".join(lines))
+
+    if args.save_baselines:
+        stored = {"python": platform.python_version(), "machine": platform.node(), "seed": args.seed,
+                  "results": dict(stored.get("results", {}), **{key: result for key, result in results.items()
+                                                                 if result is not None})}
+        with open(baselines_path, "w", encoding="utf-8") as baselines_file:
+            json.dump(stored, baselines_file, indent=1)
+        print(f"Baselines written to {baselines_path}")
+    elif regressions:
+        print(f"{regressions} regressions against {baselines_path}")
+        sys.exit(1)
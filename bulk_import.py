@@ -0,0 +1,255 @@
+from verification import CHECKBOX_FIELDS, TYPE_CODES, expected_values
+from telemetry import telemetry
+import csv
+import os
+
+
+# Columns of the import files for each Label Information field. Adjust these to match the site's DMT template.
+IMPORT_COLUMNS = {
+    "Type": "TypeCode",
+    "Group": "ProdCode",
+    "Class": "ClassID",
+    "Label Group": "LabelGroup_c",
+    "Reporting Group": "ReportingGroup_c",
+    "On Hold Reason": "OnHoldReasonCode",
+    "Priced Part": "PricedPart_c",
+    "Salesforce Sync": "SalesforceSync_c",
+    "Catalog Part": "CatalogPart_c"
+}
+
+# Dropdowns shown as 'CODE - Description' whose import column takes only the code
+CODE_FIELDS = ("Group", "Reporting Group")
+
+# The kind of import file each combination of logged operation names goes to
+IMPORT_KINDS = {
+    ("Create",): "create",
+    ("Overwrite",): "update",
+    ("Delete",): "delete",
+    ("Create", "Overwrite"): "upsert"
+}
+
+# Order in which the files have to be imported, so actions on the same part number do not conflict
+IMPORT_ORDER = ("delete", "create", "upsert", "update")
+
+
+class ImportFileWriter:
+    def __init__(self, directory, prefix, chunk_rows, company=""):
+        """
+        Initializes the ImportFileWriter class instance, which streams import records into CSV files, one series of
+        files per kind (create, update, upsert, delete). A file is closed and the next one started once it holds
+        chunk_rows records or the columns change, so no file ever grows past what the import tool handles well and
+        no batch is ever held in memory.
+
+        :param directory: The directory the files are written to
+        :type directory: str
+        :param prefix: The start of every file name, e.g. part_import_<run id>
+        :type prefix: str
+        :param chunk_rows: The number of records per file
+        :type chunk_rows: int
+        :param company: The Epicor company written into every record, or an empty string to leave the column out
+        :type company: str
+        """
+
+        self.directory = directory
+        self.prefix = prefix
+        self.chunk_rows = chunk_rows
+        self.company = company
+        self.open_files = {}  # The file currently written of every kind, with its csv writer, columns, and records
+        self.files = []  # (path, kind, records) of every file closed so far
+
+    def write(self, kind, record):
+        """
+        Appends a record to the current file of its kind
+
+        :param kind: create, update, upsert, or delete
+        :type kind: str
+        :param record: The columns and values of the record, in column order
+        :type record: dict
+        :return: The path of the file the record was written to
+        :rtype: str
+        """
+
+        if self.company:
+            record = dict({"Company": self.company}, **record)
+        columns = tuple(record)
+        current = self.open_files.get(kind)
+        if current and (current["columns"] != columns or current["records"] >= self.chunk_rows):
+            self._close_file(kind)
+            current = None
+        if current is None:
+            chunks = sum(1 for _, file_kind, _ in self.files if file_kind == kind)
+            path = os.path.join(self.directory, f"{self.prefix}_{kind}_{chunks + 1:03d}.csv")
+            handle = open(path, "w", encoding="utf-8", newline="")
+            writer = csv.writer(handle)
+            writer.writerow(columns)
+            current = self.open_files[kind] = {"path": path, "file": handle, "writer": writer, "columns": columns,
+                                               "records": 0}
+
+        current["writer"].writerow(record.values())
+        current["records"] += 1
+        return current["path"]
+
+    def close(self):
+        """
+        Closes every open file and writes the manifest listing the files in the order they have to be imported
+
+        :return: The path of the manifest, or None if no record was written
+        :rtype: str
+        """
+
+        for kind in list(self.open_files):
+            self._close_file(kind)
+        if not self.files:
+            return None
+
+        manifest_path = os.path.join(self.directory, f"{self.prefix}_manifest.csv")
+        with open(manifest_path, "w", encoding="utf-8", newline="") as manifest_file:
+            writer = csv.writer(manifest_file)
+            writer.writerow(["Order", "File", "Kind", "Records"])
+            ordered = sorted(self.files, key=lambda file: IMPORT_ORDER.index(file[1]))
+            for position, (path, kind, records) in enumerate(ordered, 1):
+                writer.writerow([position, os.path.basename(path), kind, records])
+        return manifest_path
+
+    def _close_file(self, kind):
+        current = self.open_files.pop(kind)
+        current["file"].close()
+        self.files.append((current["path"], kind, current["records"]))
+
+
+def import_value(field, value):
+    """
+    Converts a Label Information value into the value its import column expects
+
+    :param field: The Label Information field
+    :type field: str
+    :param value: The value chosen in the Label Information form
+    :return: The import value
+    :rtype: str
+    """
+
+    if field in CHECKBOX_FIELDS:
+        return "True" if value else "False"
+    value = str(value or "").strip()
+    if field == "Type":
+        return TYPE_CODES.get(value, value)
+    if field in CODE_FIELDS:
+        return value.split(" - ")[0].strip()
+    return value
+
+
+def import_record(kind, part_number, description, label_data):
+    """
+    Builds the import record of a row. Creates and upserts carry the description and every Label Information field,
+    updates only the fields an overwrite would type (the filled-in dropdowns and the checkboxes), and deletes only
+    the part number.
+
+    :param kind: create, update, upsert, or delete
+    :type kind: str
+    :param part_number: The part number of the row
+    :type part_number: str
+    :param description: The description of the row
+    :param label_data: A dictionary containing user data related to the label information form
+    :type label_data: dict
+    :return: The columns and values of the record, in column order
+    :rtype: dict
+    """
+
+    record = {"PartNum": part_number}
+    if kind == "delete":
+        return record
+    if kind in ("create", "upsert"):
+        record["PartDescription"] = "" if description is None else str(description)
+    for field, value in expected_values("Overwrite" if kind == "update" else "Create", label_data).items():
+        record[IMPORT_COLUMNS[field]] = import_value(field, value)
+    return record
+
+
+def export_rows(operation, rows, label_data, writer, logger):
+    """
+    Writes the rows of an operation into import files instead of typing them into Part Maintenance. Rows are
+    prepared (fingerprinted and, when skipping applied rows, checked against the history) exactly as a screen run
+    prepares them, and every row is logged under the operation it would have been logged under, with an 'Exported'
+    status naming its file. A row is only applied once its file has been imported, so a later run never skips an
+    exported row.
+
+    :param operation: The operation the rows belong to, e.g. a CreateOperation
+    :param rows: An iterable of row dictionaries as returned by read_part_rows or iter_part_rows
+    :param label_data: A dictionary containing user data related to the label information form
+    :type label_data: dict
+    :param writer: The writer the import records go to
+    :type writer: ImportFileWriter
+    :param logger: The OperationLogger the rows are logged to
+    :return: The number of rows exported
+    :rtype: int
+    """
+
+    exported = 0
+    for row, fingerprint, applied_record in operation.prepare_rows(rows, label_data):
+        if applied_record:
+            operation.log_skipped_row(row, applied_record)
+            continue
+
+        telemetry.set_context(row=row["Row"], part_number=row["Part Number"], operation=operation.name)
+        names = operation.logged_names(row)
+        kind = IMPORT_KINDS.get(tuple(names))
+        part_number = row["Part Number"]
+        if kind is None:
+            status = f"Incomplete: invalid action '{row.get('Action')}'"
+            logger.log_operation(operation.name, str(part_number), row["Description"], status)
+        elif part_number is None or str(part_number).strip() == "":
+            operation.log_null_part(row)
+            status = logger.last_record["Status"]
+        else:
+            path = writer.write(kind, import_record(kind, str(part_number).strip(), row["Description"], label_data))
+            status = f"Exported - {os.path.basename(path)}"
+            logger.row_fingerprint = fingerprint
+            logger.log_operation(names[0] if len(names) == 1 else operation.name, str(part_number),
+                                 row["Description"] if kind in ("create", "upsert") else "n/a", status)
+            logger.row_fingerprint = None
+            exported += 1
+        telemetry.debug(step="row", outcome=status, logged_as=logger.last_record["Operation"])
+        telemetry.clear_context()
+
+    return exported
+
+
+def export_batches(batches, directory, prefix, chunk_rows, company, logger):
+    """
+    Writes several batches into one set of import files and logs every row
+
+    :param batches: (operation, rows, label data) tuples, in order
+    :type batches: list
+    :param directory: The directory the files are written to
+    :type directory: str
+    :param prefix: The start of every file name
+    :type prefix: str
+    :param chunk_rows: The number of records per file
+    :type chunk_rows: int
+    :param company: The Epicor company written into every record, or an empty string to leave the column out
+    :type company: str
+    :param logger: The OperationLogger the rows are logged to
+    :return: The path of the manifest listing the files in import order, or None if nothing was exported
+    :rtype: str
+    """
+
+    os.makedirs(directory, exist_ok=True)
+    # Several exports of the same run (e.g. a long-running service) never overwrite each other's files
+    taken = {name.split("_manifest.csv")[0] for name in os.listdir(directory) if name.endswith("_manifest.csv")}
+    base, attempt = prefix, 1
+    while prefix in taken:
+        attempt += 1
+        prefix = f"{base}_{attempt}"
+    writer = ImportFileWriter(directory, prefix, chunk_rows, company)
+    exported = 0
+    try:
+        for operation, rows, label_data in batches:
+            exported += export_rows(operation, rows, label_data, writer, logger)
+    finally:
+        manifest_path = writer.close()
+        logger.flush()
+
+    telemetry.info(f"Exported {exported} rows into {len(writer.files)} import files"
+                   + (f", listed in import order in {manifest_path}" if manifest_path else ""),
+                   step="export", outcome=exported)
+    return manifest_path
@@ -1,10 +1,5 @@
 from enum import Enum
 from abc import ABC, abstractmethod
-import pywinauto.findwindows
-from pywinauto import Application
-from pywinauto.keyboard import send_keys
-from pywinauto.timings import Timings
-from tkinter import messagebox
 from openpyxl import Workbook, load_workbook
 from openpyxl.styles import Font
 from openpyxl.utils import get_column_letter
@@ -12,23 +7,25 @@ import datetime
 from datetime import datetime
 import sys
 import os
-import shutil
-
-
-def print_fancy_separator(text="", char='-'):
-    """
-    This function generates a visually appealing separator in the terminal.
-
-    :param text: The text to be centered within the separator. Default is an empty string.
-    :param char: The character used to build the separator. Default is '-'.
-    :return: None
-    """
-
-    terminal_width, _ = shutil.get_terminal_size()
-    if text:
-        text = f" {text} "
-    separator_width = (terminal_width - len(text)) // 2
-    print(f"{char * separator_width}{text}{char * separator_width}")
+from workbook_reader import read_part_rows, iter_part_rows
+from operation_history import OperationHistory, HISTORY_FILENAME
+from verification import PartExportReader, wait_for_export, verify_applied_rows
+from telemetry import telemetry, INFO
+from notifications import notify, RunSummary
+from profiling import RunProfiler
+from run_report import RunReport
+from rate_governor import governor_from_settings
+from failure_monitor import monitor_from_settings, FAILURE_MONITOR_SETTINGS
+from ui_driver import current_driver, literal_keys
+from ui_trace import recording
+from pipeline import read_ahead, WriteBehind
+from bulk_import import export_batches
+import snapshots
+import settings
+import time
+import hashlib
+import atexit
+import json
 
 
 class OperationType(Enum):
@@ -39,10 +36,32 @@ class OperationType(Enum):
     CREATE = 1
     OVERWRITE = 2
     DELETE = 3
+    MIXED = 4
+    UPSERT = 5
+
+
+# Label Information fields and the Part Maintenance controls they are typed into
+COMBOBOX_IDS = {
+    "Type": "cboTypeCode",
+    "Group": "cbProdCode",
+    "Class": "cbClass",
+    "Label Group": "ucbLabelGroup",
+    "Reporting Group": "cboReportGroup",
+    "On Hold Reason": "cbOnHoldReasonCode"
+}
+CHECKBOX_IDS = {
+    "Priced Part": "epiCheckBox1",
+    "Salesforce Sync": "epiCheckBox2",
+    "Catalog Part": "chkCatalogPart"
+}
+# Status of a part Epicor refused to save
+SAVE_ERROR_STATUS = "Incomplete - Epicor reported an error on save"
+# Every field a rollback puts back when it creates a deleted part again
+PART_RECORD_IDS = dict(COMBOBOX_IDS, Description="tbPartDescription", **CHECKBOX_IDS)
 
 
 class OperationLogger:
-    def __init__(self):
+    def __init__(self, folder=None):
         """
             Initializes the OperationLogger class instance.
 
@@ -54,9 +73,38 @@ class OperationLogger:
             - Column widths set based on specified lengths.
 
             If the operations log file already exists, it loads the existing workbook and sets the active sheet.
+
+            Every record is also written to the operation history database shared by all runs. Records are written
+            behind the run on a consumer thread, which saves the workbook and the history once per batch instead of
+            once per row.
+
+            :param folder: The folder of the operations log and the history database. Defaults to the working folder.
+            :type folder: str
             """
 
-        self.filename = f"operations_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        self.filename = os.path.join(folder or "", f"operations_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx")
+        self.open_log()
+
+        # Records of this log go into the history database live, so the log importer must never read it again
+        self.history = OperationHistory(os.path.join(folder or "", HISTORY_FILENAME))
+        self.history.mark_imported(self.filename)
+
+        # Payload fingerprint of the row currently being processed, recorded alongside its history records
+        self.row_fingerprint = None
+        # The most recently logged record, so the row loop can tell how each row ended
+        self.last_record = None
+
+        self.writer_history = None  # Connection of the consumer thread, which owns every write
+        self.last_save = time.monotonic()
+        self.writer = WriteBehind(self.write_records, settings.LOG_QUEUE_SIZE, name="operation-log-writer")
+        atexit.register(self.flush)
+
+    def open_log(self):
+        """
+        Creates the operations log workbook, or loads it if it already exists
+
+        :return: None
+        """
 
         if not os.path.exists(self.filename):
             self.workbook = Workbook()
@@ -81,6 +129,25 @@ class OperationLogger:
             self.workbook = load_workbook(self.filename)
             self.sheet = self.workbook.active
 
+    def start_log(self, filename=None):
+        """
+        Writes out the current log and starts a new one, so each job of a long-lived process gets its own log
+
+        :param filename: The name of the new log. Defaults to operations_log_<current time>.xlsx.
+        :type filename: str
+        :return: The name of the log that was closed
+        :rtype: str
+        """
+
+        # The consumer thread is idle once every record is written, so the workbook can be swapped under it
+        self.flush()
+        previous = self.filename
+        self.filename = filename or f"operations_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        self.open_log()
+        self.history.mark_imported(self.filename)
+        self.last_record = None
+        return previous
+
     def log_operation(self, operation, part_number, description, status):
         """
         Write in the operation, part number, description, and status into a pre-made Excel spreadsheet
@@ -95,8 +162,50 @@ class OperationLogger:
         :return: None
         """
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.sheet.append([operation, part_number, description, status, timestamp])
-        self.save_workbook()
+        self.writer.put((operation, part_number, description, status, timestamp, self.filename,
+                         self.row_fingerprint, telemetry.run_id))
+        self.last_record = {"Operation": operation, "Part Number": part_number, "Status": status}
+
+    def write_records(self, records):
+        """
+        Appends a batch of records to the workbook and the history database. Runs on the consumer thread.
+
+        :param records: Tuples of (operation, part number, description, status, timestamp, log file, fingerprint,
+        run id), or None to save the workbook right away
+        :type records: list
+        :return: None
+        """
+
+        # A None among the records is the save request queued by flush
+        save_requested = None in records
+        records = [record for record in records if record is not None]
+        for operation, part_number, description, status, timestamp, *_ in records:
+            self.sheet.append([operation, part_number, description, status, timestamp])
+        # Saving rewrites the whole workbook, so it happens every few seconds rather than for every batch
+        if save_requested or time.monotonic() - self.last_save >= settings.LOG_SAVE_INTERVAL:
+            try:
+                self.save_workbook()
+                self.last_save = time.monotonic()
+            except OSError as e:
+                # The rows stay in the sheet and go out with the next save, e.g. once the log is closed in Excel
+                telemetry.error(f"Could not save {self.filename}: {e}", step="log", outcome=type(e).__name__)
+
+        if not records:
+            return
+        if self.writer_history is None:
+            self.writer_history = OperationHistory(self.history.filename)
+        self.writer_history.record_many(records)
+
+    def flush(self):
+        """
+        Waits until every logged record has been written to the workbook and the history database, and the
+        workbook has been saved
+
+        :raises Exception: The error a write raised on the writer thread since the last flush
+        :return: None
+        """
+        self.writer.put(None)
+        self.writer.flush()
 
     def save_workbook(self):
         """
@@ -107,399 +216,824 @@ class OperationLogger:
 
 
 class Operation(ABC):
-    @abstractmethod
-    def execute(self, file_data, label_data):
+    name = "Operation"
+    # Set by run_rows when too many rows in a row failed, so a job does not go on to its next entry
+    aborted = False
+
+    def execute(self, file_data, label_data, rows=None):
         """
-        This method is an abstract method that must be implemented by subclasses.
+        Runs the operation over the rows selected in the File Information form.
 
         :param file_data: A dictionary containing user data related to the file information form
         :type file_data: dict
         :param label_data: A dictionary containing user data related to the label information form
         :type label_data: dict
+        :param rows: The rows to run if they were already read (e.g. for a UI trace). Defaults to streaming them out
+        of the workbook.
+        :type rows: list
 
-        This method serves as a template for executing specific operations. Subclasses of the 'Operation' class
-        must implement this method to define the behavior of the operation they represent. It takes in 'file_data'
-        and 'label_data' as parameters, which provide the necessary information for carrying out the operation.
+        The method establishes a connection to the Part Maintenance application, clears current information, and
+        hands every row selected in the user-provided workbook to process_row while the rows are still being read.
+        It returns the rows that were applied, as returned by run_rows.
+        """
+
+        telemetry.separator("User Data")
+        telemetry.info(f"File Data: {file_data}\nLabel Data: {label_data}", step="user_data")
+        telemetry.separator("Program Documentation")
+        telemetry.info(f"Initializing {self.name} operation...\n", step="initialize")
+
+        # The rows are streamed out of the workbook on the producer thread of run_rows
+        rows = iter_part_rows(file_data) if rows is None else rows
+        governor = governor_from_settings(settings)
+        monitor = monitor_from_settings(settings)
+        return run_in_session(lambda: self.run_rows(rows, label_data, governor, monitor))
+
+    def run_rows(self, rows, label_data, governor=None, monitor=None):
+        """
+        Loops through the given rows on an already connected Part Maintenance session as a three-stage pipeline:
+        prepare_rows decodes the rows and checks them against the history on a producer thread, this thread drives
+        Part Maintenance and nothing else, and the operation logger writes the results behind it on a consumer
+        thread. Bounded queues sit between the stages.
+
+        In unattended mode a row that fails (e.g. a control that cannot be found) is logged as incomplete and the loop
+        moves on to the next row, until settings.UNATTENDED_MAX_CONSECUTIVE_FAILURES rows in a row have failed. The
+        loop then stops and sets aborted, which also ends the job it belongs to.
+
+        :param rows: An iterable of row dictionaries as returned by read_part_rows or iter_part_rows
+        :param label_data: A dictionary containing user data related to the label information form
+        :type label_data: dict
+        :param governor: The rate governor pacing the rows, or None to run at full speed
+        :type governor: RateGovernor
+        :param monitor: The failure monitor that runs the canary and stops the loop on a high failure rate, or None
+        :type monitor: FailureMonitor
+
+        :return: Dictionaries with 'Operation', 'Part Number', and 'Label Data' keys for every row that completed
+        :rtype: list
+        """
+
+        # Created on this thread before the producer starts, as the logger's history connection belongs to it
+        operation_logger = get_operation_logger()
+        applied_rows = []
+        consecutive_failures = 0
+        self.aborted = False
+        try:
+            for row, fingerprint, applied_record in read_ahead(self.prepare_rows(rows, label_data),
+                                                               settings.PIPELINE_DEPTH):
+                if applied_record:
+                    self.log_skipped_row(row, applied_record)
+                    continue
+
+                telemetry.set_context(row=row["Row"], part_number=row["Part Number"], operation=self.name)
+                if governor:
+                    waited = governor.acquire()
+                    if waited:
+                        telemetry.debug(step="pacing_wait", duration=round(waited, 4))
+                started = time.perf_counter()
+
+                operation_logger.last_record = None
+                errored = False
+                try:
+                    # Reconnect to the form to ensure it doesn't fall asleep
+                    with telemetry.step("connect"):
+                        app = current_driver().connect(title="Part Maintenance")
+                        main_window = app.window(title='Part Maintenance')
+                    operation_logger.row_fingerprint = fingerprint
+                    try:
+                        self.process_row(main_window, row, label_data)
+                    finally:
+                        operation_logger.row_fingerprint = None
+                    consecutive_failures = 0
+                except Exception as e:
+                    if not settings.UNATTENDED:
+                        raise
+                    self.log_failed_row(row, e)
+                    consecutive_failures += 1
+                    errored = True
+
+                record = operation_logger.last_record
+                duration = time.perf_counter() - started
+                telemetry.debug(step="row", duration=round(duration, 4),
+                                outcome=record["Status"] if record else None,
+                                logged_as=record["Operation"] if record else None)
+                if governor:
+                    governor.record_latency(duration)
+                telemetry.clear_context()
+                completed = bool(record) and str(record["Status"]).startswith("Completed")
+                if completed:
+                    applied_rows.append({"Operation": record["Operation"], "Part Number": record["Part Number"],
+                                         "Label Data": label_data})
+
+                # The monitor counts what went wrong in Epicor: an error, a refused save, or a dialog that never
+                # appeared (the row logged nothing). A part that already exists, or never did, and an empty part
+                # number are the data's doing and do not count.
+                failed = errored or record is None or record["Status"] == SAVE_ERROR_STATUS
+                if monitor and not monitor.record(failed):
+                    break
+                if consecutive_failures >= settings.UNATTENDED_MAX_CONSECUTIVE_FAILURES:
+                    notify("Run Aborted", f"{consecutive_failures} rows in a row failed; the rest of the batch was "
+                                          f"not run", outcome="aborted")
+                    self.aborted = True
+                    break
+        finally:
+            # The next run (and the verification pass) read the history, so every record has to be written first
+            operation_logger.flush()
+            snapshots.snapshot_store.flush()
+
+        return applied_rows
+
+    def prepare_rows(self, rows, label_data):
+        """
+        Producer stage of run_rows: fingerprints every row and, when skipping applied rows, checks them against the
+        operation history in chunks. A row is skipped when the latest record of its part number is a completed one from
+        the same operation with the same payload fingerprint, meaning nothing has touched the part since the row was
+        last applied. Once a row of a part number still has to run, the later rows of that part number run as well
+        since the part will have changed under them.
+
+        :param rows: An iterable of row dictionaries as returned by read_part_rows or iter_part_rows
+        :param label_data: A dictionary containing user data related to the label information form
+        :type label_data: dict
+        :return: A generator of (row, fingerprint, applied record) tuples. The applied record is the history record
+        of a row that is skipped, None for a row that has to run.
+        """
+
+        # SQLite connections belong to the thread that opened them, so the producer opens its own
+        history = OperationHistory(get_operation_logger().history.filename) if settings.SKIP_APPLIED_ROWS else None
+        pending_parts = set()
+        try:
+            chunk = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) == 500:
+                    yield from self._prepare_chunk(chunk, label_data, history, pending_parts)
+                    chunk = []
+            yield from self._prepare_chunk(chunk, label_data, history, pending_parts)
+        finally:
+            if history:
+                history.close()
+
+    def _prepare_chunk(self, chunk, label_data, history, pending_parts):
+        latest = history.latest_completed([row["Part Number"] for row in chunk]) if history and chunk else {}
+        for row in chunk:
+            fingerprint = self.fingerprint(row, label_data)
+            part_number = None if row["Part Number"] is None else str(row["Part Number"])
+            record = latest.get(part_number)
+            if (part_number not in pending_parts and record and record["operation"] in self.logged_names(row)
+                    and record["fingerprint"] == fingerprint):
+                yield row, fingerprint, record
+            else:
+                pending_parts.add(part_number)
+                yield row, fingerprint, None
+
+    @staticmethod
+    def log_skipped_row(row, record):
+        """
+        Logs a row that was skipped because the operation history shows it was already applied
+
+        :param row: A row dictionary as returned by read_part_rows
+        :type row: dict
+        :param record: The latest completed history record of the row's part number
+        :type record: dict
+        :return: None
+        """
+
+        operation_logger = get_operation_logger()
+        operation_logger.row_fingerprint = record["fingerprint"]
+        operation_logger.log_operation(record["operation"], str(row["Part Number"]), row["Description"],
+                                       "Skipped - already applied")
+        operation_logger.row_fingerprint = None
+        telemetry.info(f"{row['Part Number']} - Skipped: Already applied on {record['timestamp']}",
+                       row=row["Row"], part_number=row["Part Number"], step="skip", outcome="skipped")
+
+    def log_failed_row(self, row, error):
+        """
+        Logs a row that raised an error in unattended mode and puts Part Maintenance back into a clean state for the
+        next row: any Epicor error dialog is closed and the form is cleared. Recovery is best effort, since the row
+        may have failed because Part Maintenance itself is gone.
+
+        :param row: A row dictionary as returned by read_part_rows
+        :type row: dict
+        :param error: The error the row raised
+        :type error: Exception
+        :return: None
+        """
+
+        names = self.logged_names(row)
+        get_operation_logger().log_operation(names[0] if len(names) == 1 else self.name, str(row["Part Number"]),
+                                             row["Description"], f"Incomplete - {type(error).__name__}: {error}")
+        telemetry.error(f"{row['Part Number']} - Unable to {self.name.lower()}: {type(error).__name__}: {error}",
+                        outcome=type(error).__name__)
+        try:
+            main_window = current_driver().connect(title="Part Maintenance").window(title='Part Maintenance')
+            self.dismiss_error(main_window)
+            main_window.child_window(title="Clear").click_input()
+        except Exception as e:
+            telemetry.warning(f"Could not clear Part Maintenance after the failed row: {e}", step="recover",
+                              outcome=type(e).__name__)
+
+    @staticmethod
+    def dismiss_error(main_window):
+        """
+        Closes Epicor's Error dialog if one is open. Only unattended runs do this; an operator closes it by hand.
+
+        :param main_window: The connected Part Maintenance window
+        :return: None
+        """
+
+        if settings.UNATTENDED and current_driver().wait_for_dialog(main_window, ("Error",), 0) == "Error":
+            main_window.child_window(title="Error").close()
+
+    def logged_names(self, row):
+        """
+        The operation names a row's records are logged under
+
+        :param row: A row dictionary as returned by read_part_rows
+        :type row: dict
+        :return: A tuple of operation names
+        :rtype: tuple
+        """
+        return self.name,
+
+    def fingerprint(self, row, label_data):
+        """
+        Fingerprints everything a row writes into Epicor so a re-run can tell whether it was already applied
+
+        :param row: A row dictionary as returned by read_part_rows
+        :type row: dict
+        :param label_data: A dictionary containing user data related to the label information form
+        :type label_data: dict
+        :return: A short hexadecimal digest of the part number, description, and label data
+        :rtype: str
+        """
+        return _digest([row["Part Number"], row["Description"], label_data])
+
+    @abstractmethod
+    def process_row(self, main_window, row, label_data):
+        """
+        This method is an abstract method that must be implemented by subclasses.
+
+        :param main_window: The connected Part Maintenance window
+        :param row: A row dictionary with 'Row', 'Part Number', and 'Description' keys
+        :type row: dict
+        :param label_data: A dictionary containing user data related to the label information form
+        :type label_data: dict
+
+        Subclasses of the 'Operation' class must implement this method to carry out their operation on a single part.
         """
         pass
 
+    def log_null_part(self, row):
+        """
+        Logs a row whose part number cell was empty
+
+        :param row: A row dictionary with 'Row', 'Part Number', and 'Description' keys
+        :return: None
+        """
+
+        get_operation_logger().log_operation(self.name, str(row["Part Number"]), row["Description"],
+                                             "Incomplete: part number was null")
+        telemetry.warning(f"{row['Part Number']} - Unable to {self.name.lower()}: Part number is null",
+                          outcome="null_part")
+
+    @staticmethod
+    def open_part(main_window, part_number):
+        """
+        Types the part number into Part Maintenance and checks whether Epicor asks to add it as a new part
+
+        :param main_window: The connected Part Maintenance window
+        :param part_number: The part number to open
+        :return: True if the "Add New Confirmation" dialog appeared (the part does not exist), False otherwise
+        :rtype: bool
+        """
+
+        with telemetry.step("open_part"):
+            # Tabbing out of the part number makes Epicor look the part up
+            main_window.child_window(auto_id='tbPart').type_keys(literal_keys(part_number) + "{TAB}")
+            return current_driver().wait_for_dialog(main_window, ("Add New Confirmation",),
+                                                    settings.DIALOG_TIMEOUT) is not None
+
+    @staticmethod
+    def apply_checkboxes(main_window, label_data, states=None):
+        """
+        Clicks every checkbox whose state in Epicor differs from the state chosen in the Label Information form
+
+        :param main_window: The connected Part Maintenance window
+        :param label_data: A dictionary containing user data related to the label information form
+        :param states: The checkbox states already read from Epicor (e.g. by read_snapshot), by label. Checkboxes
+        missing from it are read one by one.
+        :type states: dict
+        :return: None
+        """
+
+        # Either the box is checked in our form and unchecked in Epicor or it's unchecked in our form and
+        # checked in Epicor
+        for label, auto_id in CHECKBOX_IDS.items():
+            checkbox = main_window.child_window(auto_id=auto_id)
+            checked = states[label] if states and label in states else checkbox.get_toggle_state() == 1
+            if bool(label_data[label]) != checked:
+                checkbox.click_input()
+
+    @staticmethod
+    def read_snapshot(main_window, fields):
+        """
+        Reads the current values of the given fields of the open part in one sweep, to be kept as the part's state
+        from before a change
+
+        :param main_window: The connected Part Maintenance window
+        :param fields: The automation ids of the fields to read, by field name. Ids in CHECKBOX_IDS are read as
+        checkboxes, every other id as a text box or dropdown.
+        :type fields: dict
+        :return: The value of every field found, by field name: text for text fields, True or False for checkboxes
+        :rtype: dict
+        """
+
+        toggle_ids = [auto_id for auto_id in fields.values() if auto_id in CHECKBOX_IDS.values()]
+        text_ids = [auto_id for auto_id in fields.values() if auto_id not in toggle_ids]
+        with telemetry.step("snapshot"):
+            values = current_driver().read_fields(main_window, text_ids, toggle_ids)
+        return {field: values[auto_id] == 1 if auto_id in toggle_ids else values[auto_id]
+                for field, auto_id in fields.items() if auto_id in values}
+
+    @staticmethod
+    def record_snapshot(operation, part_number, snapshot):
+        """
+        Keeps the state a part had before a change that was just saved, so the run can be rolled back
+
+        :param operation: The change (Overwrite or Delete)
+        :type operation: str
+        :param part_number: The part number that was changed
+        :param snapshot: The values read by read_snapshot before the change
+        :type snapshot: dict
+        :return: None
+        """
+        snapshots.snapshot_store.record(operation, part_number, snapshot, telemetry.run_id,
+                                        get_operation_logger().filename)
+
 
-# Create a global instance of OperationLogger
-operation_logger = OperationLogger()
+def _digest(payload):
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def run_in_session(work):
+    """
+    Connects to Part Maintenance, clears current information, and runs the given work while translating connection
+    failures and timeouts into messages for the user
+
+    :param work: A callable that drives Part Maintenance once the session has been established
+    :return: Whatever the work returned, or None if the session failed
+    """
+
+    try:
+        # Connect the application to Part Maintenance and send confirmation message
+        app = current_driver().connect(title="Part Maintenance")
+        telemetry.info('Connection to Part Maintenance achieved!\n', step="connect", outcome="ok")
+
+        # Clear current information
+        app.window(title='Part Maintenance').child_window(title="Clear").click_input()
+
+        return work()
+
+    except current_driver().ElementNotFoundError:
+        telemetry.error("Epicor Connection Failed...", step="connect", outcome="not_found")
+        telemetry.flush()
+        notify("Connection Failed", "Part Maintenance not found. \nTerminating program...", INFO,
+               outcome="not_found")
+        sys.exit()
+    except current_driver().TimeoutError:
+        telemetry.error("The program took too long to respond", outcome="timeout")
+        notify("Error", "The program took too long to respond. Please restart", outcome="timeout")
+    except Exception as e:
+        telemetry.error(str(e), outcome=type(e).__name__)
+        raise e
+
+
+_operation_logger = None
+
+
+def get_operation_logger():
+    """
+    Returns the operation logger of this process, creating it (and its operations log file) on first use, so that
+    merely importing this module writes nothing
+
+    :return: The OperationLogger every operation logs to
+    :rtype: OperationLogger
+    """
+
+    global _operation_logger
+    if _operation_logger is None:
+        _operation_logger = OperationLogger()
+    return _operation_logger
+
+
+def install_operation_logger(logger):
+    """
+    Replaces the operation logger of this process, e.g. with one writing to a scratch folder while a trace is replayed
+
+    :param logger: The logger to use from now on, or None to create a new one on next use
+    :type logger: OperationLogger
+    :return: The logger that was used before, or None if none had been created yet
+    :rtype: OperationLogger
+    """
+
+    global _operation_logger
+    previous, _operation_logger = _operation_logger, logger
+    return previous
 
 
 class CreateOperation(Operation):
-    def execute(self, file_data, label_data):
+    name = "Create"
+
+    def process_row(self, main_window, row, label_data):
         """
-        Execute method specific to the CreateOperation subclass.
+        Process_row method specific to the CreateOperation subclass.
 
-        :param file_data: A dictionary containing user data related to the file information form
-        :type file_data: dict
+        :param main_window: The connected Part Maintenance window
+        :param row: A row dictionary with 'Row', 'Part Number', and 'Description' keys
+        :type row: dict
         :param label_data: A dictionary containing user data related to the label information form
         :type label_data: dict
 
-        This method is implemented in the CreateOperation subclass to carry out the create operation. It takes in 'file_data'
-        and 'label_data' as parameters, providing the necessary information for creating parts in the system.
-        The method first establishes a connection to the Part Maintenance application, clears current information,
-        loads the user-provided workbook, and loops through the part numbers to overwrite them. If a part number is null,
-        it logs an incomplete operation. If the part doesn't exist, it logs that the creation cannot be performed.
-        If the part exists, it proceeds with the creating process by confirming in Epicor.
-        Upon successful overwriting, it logs the completion of the operation.
+        If the part number is null, it logs an incomplete operation. If the part already exists, it logs that the
+        creation cannot be performed. Otherwise, it confirms the new part in Epicor, writes in the description and
+        label information, and saves the part.
         """
 
-        # Print messages and separators to the console
-        print_fancy_separator("User Data")
-        print(f"File Data: {file_data}\nLabel Data: {label_data}")
-        print_fancy_separator("Program Documentation")
-        print("Initializing Part Deletion...\n")
+        part_number = row["Part Number"]
+        part_description = row["Description"]
 
-        try:
-            # Connect the application to Part Maintenance and send confirmation message
-            app = Application(backend="uia").connect(title="Part Maintenance")
-            print('Connection to Part Maintenance achieved!\n')
-
-            # Clear current information
-            app.window(title='Part Maintenance').child_window(title="Clear").click_input()
-
-            # Load in the user-provided workbook and access the specific sheet
-            book = load_workbook(file_data["Input File"])
-            sheet_index = file_data["Sheet Index"]
-            sheets = book.sheetnames
-            active_sheet = book[sheets[sheet_index]]
-
-            # Loop through all the part numbers
-            for i in range(int(file_data["First Row"]), int(file_data["Last Row"]) + 1):
-                # Reconnect to the form toe ensure it doesn't fall asleep
-                app = Application(backend="uia").connect(title="Part Maintenance")
-                main_window = app.window(title='Part Maintenance')
-
-                # Find the cell that hosts the part numbers and descriptions
-                pn_cell = file_data["Part Column Letter"] + str(i)
-                part_number = active_sheet[pn_cell].value
-                desc_cell = file_data["Description Column Letter"] + str(i)
-                part_description = active_sheet[desc_cell].value
-
-                # Type cell value into text box
-                main_window.child_window(auto_id='tbPart').type_keys(part_number)
-                send_keys("{TAB}")
-
-                # Validate that part number is not None
-                if part_number is None:
-                    operation_logger.log_operation("Create", str(part_number), part_description,
-                                                   "Incomplete: part number was null")
-                    print(str(part_number) + " - Unable to create: Part number is null")
-                    main_window.child_window(auto_id='btnNo2').click_input()
-                    continue
+        # Validate that part number is not None
+        if part_number is None:
+            self.log_null_part(row)
+            return
 
-                # Confirm that the part does not already exist
-                if main_window.child_window(title="Add New Confirmation").exists():
-                    main_window.child_window(auto_id='btnYes2').click_input()
-                    # Validate that part description is not None
-                    if part_description is None:
-                        operation_logger.log_operation("Create", str(part_number), part_description,
-                                                       "Completed with empty description")
-                        print(str(part_number) + " - Part Created   **No Description**")
-                    else:
-                        operation_logger.log_operation("Create", str(part_number), part_description,
-                                                       "Completed")
-                        print(str(part_number) + " - Part Created")
-                else:
-                    # Write PN into Excel file
-                    operation_logger.log_operation("Create", str(part_number), part_description,
-                                                   "Incomplete - Part already exists")
-                    print(str(part_number) + " - Unable to create: Part already exists")
-                    continue
+        # Confirm that the part does not already exist
+        if not self.open_part(main_window, part_number):
+            get_operation_logger().log_operation("Create", str(part_number), part_description,
+                                                 "Incomplete - Part already exists")
+            telemetry.info(str(part_number) + " - Unable to create: Part already exists", outcome="exists")
+            return
 
-                # Begin writing data into Epicor
-                main_window.child_window(auto_id="tbPartDescription").type_keys(part_description, with_spaces=True)
-                main_window.child_window(auto_id="cboTypeCode").type_keys(label_data["Type"], with_spaces=True)
-                main_window.child_window(auto_id="cbProdCode").type_keys(label_data["Group"], with_spaces=True)
-                main_window.child_window(auto_id="cbClass").type_keys(label_data["Class"], with_spaces=True)
-                main_window.child_window(auto_id="ucbLabelGroup").type_keys(label_data["Label Group"],
-                                                                            with_spaces=True)
-                main_window.child_window(auto_id="cboReportGroup").type_keys(label_data["Reporting Group"],
-                                                                             with_spaces=True)
-                main_window.child_window(auto_id="cbOnHoldReasonCode").type_keys(label_data["On Hold Reason"],
-                                                                                 with_spaces=True)
-
-                # Here, we use simple logic to determine whether a checkbox should be clicked
-                # Either the box is checked in our form and unchecked in Epicor or it's unchecked in our form and
-                # checked in Epicor
-                if (label_data["Priced Part"] and main_window.child_window(auto_id="epiCheckBox1").
-                        get_toggle_state() == 0):
-                    main_window.child_window(auto_id="epiCheckBox1").click_input()
-                elif (not label_data["Priced Part"] and main_window.child_window(auto_id="epiCheckBox1").
-                        get_toggle_state() == 1):
-                    main_window.child_window(auto_id="epiCheckBox1").click_input()
-
-                if (label_data["Salesforce Sync"] and main_window.child_window(auto_id="epiCheckBox2").
-                        get_toggle_state() == 0):
-                    main_window.child_window(auto_id="epiCheckBox2").click_input()
-                elif (not label_data["Salesforce Sync"] and main_window.child_window(auto_id="epiCheckBox2").
-                        get_toggle_state() == 1):
-                    main_window.child_window(auto_id="epiCheckBox2").click_input()
-
-                if (label_data["Catalog Part"] and main_window.child_window(auto_id="chkCatalogPart").
-                        get_toggle_state() == 0):
-                    main_window.child_window(auto_id="chkCatalogPart").click_input()
-                elif (not label_data["Catalog Part"] and main_window.child_window(auto_id="chkCatalogPart").
-                        get_toggle_state() == 1):
-                    main_window.child_window(auto_id="chkCatalogPart").click_input()
-
-                # Save the form and check for any unexpected errors
-                main_window.child_window(title="Save").click_input()
-                if main_window.child_window(title="Error").exists():
-                    messagebox.showerror(
-                        "Error",
-                        "If you are creating parts and not overwriting existing ones, you must add a "
-                        "description in the first form of the program. "
-                    )
-                main_window.child_window(title="Clear").click_input()
-
-        except pywinauto.findwindows.ElementNotFoundError:
-            print("Epicor Connection Failed...")
-            messagebox.showinfo("Connection Failed", "Part Maintenance not found. \nTerminating "
-                                                     "program...")
-            sys.exit()
-        except pywinauto.timings.TimeoutError:
-            messagebox.showerror("Error", "The program took too long to respond. Please restart")
-        except Exception as e:
-            print(e)
-            raise e
+        self.add_new_part(main_window, part_number, part_description, label_data)
+
+    @staticmethod
+    def add_new_part(main_window, part_number, part_description, label_data):
+        """
+        Confirms the "Add New Confirmation" dialog, writes the description and every label field into the new part,
+        saves it, and logs whether Epicor accepted the save
+
+        :param main_window: The connected Part Maintenance window
+        :param part_number: The part number being created
+        :param part_description: The description of the new part
+        :param label_data: A dictionary containing user data related to the label information form
+        :return: None
+        """
+
+        main_window.child_window(auto_id='btnYes2').click_input()
+
+        # Begin writing data into Epicor
+        main_window.child_window(auto_id="tbPartDescription").type_keys(literal_keys(part_description),
+                                                                        with_spaces=True)
+        for label, auto_id in COMBOBOX_IDS.items():
+            main_window.child_window(auto_id=auto_id).type_keys(literal_keys(label_data[label]),
+                                                                with_spaces=True)
+
+        Operation.apply_checkboxes(main_window, label_data)
+
+        # Save the form and check for any unexpected errors
+        with telemetry.step("save"):
+            main_window.child_window(title="Save").click_input()
+            save_failed = current_driver().wait_for_dialog(main_window, ("Error",),
+                                                           settings.DIALOG_TIMEOUT) is not None
+        if save_failed:
+            get_operation_logger().log_operation("Create", str(part_number), part_description,
+                                                 SAVE_ERROR_STATUS)
+            notify("Error", "If you are creating parts and not overwriting existing ones, you must add a "
+                            "description in the first form of the program. ", outcome="save_error")
+            Operation.dismiss_error(main_window)
+        elif part_description is None:
+            get_operation_logger().log_operation("Create", str(part_number), part_description,
+                                                 "Completed with empty description")
+            telemetry.warning(str(part_number) + " - Part Created   **No Description**", outcome="created")
+        else:
+            get_operation_logger().log_operation("Create", str(part_number), part_description,
+                                                 "Completed")
+            telemetry.info(str(part_number) + " - Part Created", outcome="created")
+        main_window.child_window(title="Clear").click_input()
 
 
 class OverwriteOperation(Operation):
-    def execute(self, file_data, label_data):
+    name = "Overwrite"
+
+    def fingerprint(self, row, label_data):
         """
-        Execute method specific to the OverwriteOperation subclass.
+        Overwriting never writes the description, so only the part number and label data are fingerprinted
 
-        :param file_data: A dictionary containing user data related to the file information form
-        :type file_data: dict
+        :param row: A row dictionary as returned by read_part_rows
+        :param label_data: A dictionary containing user data related to the label information form
+        :return: A short hexadecimal digest of the part number and label data
+        :rtype: str
+        """
+        return _digest([row["Part Number"], label_data])
+
+    def process_row(self, main_window, row, label_data):
+        """
+        Process_row method specific to the OverwriteOperation subclass.
+
+        :param main_window: The connected Part Maintenance window
+        :param row: A row dictionary with 'Row', 'Part Number', and 'Description' keys
+        :type row: dict
         :param label_data: A dictionary containing user data related to the label information form
         :type label_data: dict
 
-        This method is implemented in the OverwriteOperation subclass to carry out the overwriting operation. It takes in 'file_data'
-        and 'label_data' as parameters, providing the necessary information for overwriting parts in the system.
-        The method first establishes a connection to the Part Maintenance application, clears current information,
-        loads the user-provided workbook, and loops through the part numbers to overwrite them. If a part number is null,
-        it logs an incomplete operation. If the part doesn't exist, it logs that the overwriting cannot be performed.
-        If the part exists, it proceeds with the overwriting process by confirming the edit in Epicor.
-        Upon successful overwriting, it logs the completion of the operation.
+        If the part number is null, it logs an incomplete operation. If the part doesn't exist, it logs that the
+        overwriting cannot be performed. If the part exists, it proceeds with the overwriting process by confirming
+        the edit in Epicor. Upon successful overwriting, it logs the completion of the operation.
         """
 
-        # Print messages and separators to the console
-        print_fancy_separator("User Data")
-        print(f"File Data: {file_data}\nLabel Data: {label_data}")
-        print_fancy_separator("Program Documentation")
-        print("Initializing Part Deletion...\n")
+        part_number = row["Part Number"]
 
-        try:
-            # Connect the application to Part Maintenance and send confirmation message
-            app = Application(backend="uia").connect(title="Part Maintenance")
-            print('Connection to Part Maintenance achieved\n')
-
-            # Clear current information
-            app.window(title='Part Maintenance').child_window(title="Clear").click_input()
-
-            # Load in the user-provided workbook and access the specific sheet
-            book = load_workbook(file_data["Input File"])
-            sheet_index = file_data["Sheet Index"]
-            sheets = book.sheetnames
-            active_sheet = book[sheets[sheet_index]]
-
-            # Loop through all the part numbers
-            for i in range(int(file_data["First Row"]), int(file_data["Last Row"]) + 1):
-                # Reconnect to the form toe ensure it doesn't fall asleep
-                app = Application(backend="uia").connect(title="Part Maintenance")
-                main_window = app.window(title='Part Maintenance')
-
-                # Find the cell that hosts the part numbers
-                pn_cell = file_data["Part Column Letter"] + str(i)
-                part_number = active_sheet[pn_cell].value
-
-                # Type cell value into text box
-                main_window.child_window(auto_id='tbPart').type_keys(part_number)
-                send_keys("{TAB}")
-
-                # Validate that part number is not None
-                if part_number is None:
-                    operation_logger.log_operation("Create", str(part_number), "n/a",
-                                                   "Incomplete: part number was null")
-                    print(str(part_number) + " - Unable to overwrite: Part number is null")
-                    main_window.child_window(auto_id='btnNo2').click_input()
-                    continue
+        # Validate that part number is not None
+        if part_number is None:
+            self.log_null_part(row)
+            return
 
-                # Confirm that the part already exist
-                if main_window.child_window(title="Add New Confirmation").exists():
-                    main_window.child_window(auto_id='btnNo2').click_input()
-                    operation_logger.log_operation("Overwrite", part_number, "n/a", "Incomplete - "
-                                                                                    "part doesn't exist and therefore "
-                                                                                    "can't "
-                                                                                    "be overwritten")
-                    print(str(part_number) + " - Unable to overwrite: Part never existed")
-                    continue
+        # Confirm that the part already exist
+        if self.open_part(main_window, part_number):
+            main_window.child_window(auto_id='btnNo2').click_input()
+            get_operation_logger().log_operation("Overwrite", part_number, "n/a", "Incomplete - "
+                                                                                  "part doesn't exist and therefore "
+                                                                                  "can't "
+                                                                                  "be overwritten")
+            telemetry.info(str(part_number) + " - Unable to overwrite: Part never existed", outcome="missing")
+            return
 
-                # Conditionally write in any existing fields into Epicor
-                if label_data["Type"]:
-                    main_window.child_window(auto_id="cboTypeCode").type_keys(label_data["Type"], with_spaces=True)
-                if label_data["Group"]:
-                    main_window.child_window(auto_id="cbProdCode").type_keys(label_data["Group"], with_spaces=True)
-                if label_data["Class"]:
-                    main_window.child_window(auto_id="cbClass").type_keys(label_data["Class"], with_spaces=True)
-                if label_data["Label Group"]:
-                    main_window.child_window(auto_id="ucbLabelGroup").type_keys(label_data["Label Group"],
-                                                                                with_spaces=True)
-                if label_data["Reporting Group"]:
-                    main_window.child_window(auto_id="cboReportGroup").type_keys(label_data["Reporting Group"],
-                                                                                 with_spaces=True)
-                if label_data["On Hold Reason"]:
-                    main_window.child_window(auto_id="cbOnHoldReasonCode").type_keys(label_data["On Hold Reason"],
-                                                                                     with_spaces=True)
-
-                # Here, we use simple logic to determine whether a checkbox should be clicked
-                # Either the box is checked in our form and unchecked in Epicor or it's unchecked in our form and
-                # checked in Epicor
-                if label_data["Priced Part"] and main_window.child_window(auto_id="epiCheckBox1").get_toggle_state() \
-                        == 0:
-                    main_window.child_window(auto_id="epiCheckBox1").click_input()
-                elif (not label_data["Priced Part"] and main_window.child_window(auto_id="epiCheckBox1").
-                        get_toggle_state() == 1):
-                    main_window.child_window(auto_id="epiCheckBox1").click_input()
-
-                if (label_data["Salesforce Sync"] and main_window.child_window(auto_id="epiCheckBox2").
-                        get_toggle_state() == 0):
-                    main_window.child_window(auto_id="epiCheckBox2").click_input()
-                elif (not label_data["Salesforce Sync"] and main_window.child_window(auto_id="epiCheckBox2").
-                        get_toggle_state() == 1):
-                    main_window.child_window(auto_id="epiCheckBox2").click_input()
-
-                if (label_data["Catalog Part"] and main_window.child_window(auto_id="chkCatalogPart").
-                        get_toggle_state() == 0):
-                    main_window.child_window(auto_id="chkCatalogPart").click_input()
-                elif (not label_data["Catalog Part"] and main_window.child_window(auto_id="chkCatalogPart").
-                        get_toggle_state() == 1):
-                    main_window.child_window(auto_id="chkCatalogPart").click_input()
-
-                # Save the form and check for any unexpected errors
-                main_window.child_window(title="Save").click_input()
-                if main_window.child_window(title="Error").exists():
-                    messagebox.showerror(
-                        "Error",
-                        "An error has occurred. Please try again."
-                    )
-
-                # Confirm saving
-                if main_window.child_window(title="Save Confirmation").exists():
-                    confirmation_dialog = main_window.child_window(title="Save Confirmation",
-                                                                   auto_id="EpiCheckMessageBox")
-                    yes_button = confirmation_dialog.child_window(title="Yes", auto_id="btnYes2", control_type="Button")
-                    yes_button.click_input()
-
-                # Log successful operation
-                operation_logger.log_operation("Overwrite", part_number, "n/a", "Completed")
-                print(str(part_number) + " - Overwrite Complete")
-
-                # Clear form
-                main_window.child_window(title="Clear").click_input()
-
-        except pywinauto.findwindows.ElementNotFoundError as e:
-            print("Epicor Connection Failed...")
-            messagebox.showinfo("Connection Failed", "Part Maintenance not found. \nTerminating "
-                                                     "program...")
-            sys.exit()
-        except pywinauto.timings.TimeoutError:
-            messagebox.showerror("Error", "The program took too long to respond. Please restart")
-        except Exception as e:
-            print(e)
-            raise e
+        self.fill_existing_part(main_window, part_number, label_data)
+
+    @staticmethod
+    def fill_existing_part(main_window, part_number, label_data):
+        """
+        Writes every filled-in label field into an existing part, saves it, and logs the overwrite
+
+        :param main_window: The connected Part Maintenance window
+        :param part_number: The part number being overwritten
+        :param label_data: A dictionary containing user data related to the label information form
+        :return: None
+        """
+
+        # Keep what the overwrite is about to replace; the checkbox states read here also decide which to click
+        snapshot = None
+        if settings.SNAPSHOT_CHANGES:
+            fields = {label: auto_id for label, auto_id in COMBOBOX_IDS.items() if label_data[label]}
+            snapshot = Operation.read_snapshot(main_window, dict(fields, **CHECKBOX_IDS))
+
+        # Conditionally write in any existing fields into Epicor
+        for label, auto_id in COMBOBOX_IDS.items():
+            if label_data[label]:
+                main_window.child_window(auto_id=auto_id).type_keys(literal_keys(label_data[label]),
+                                                                with_spaces=True)
+
+        Operation.apply_checkboxes(main_window, label_data, snapshot)
+
+        # Save the form and watch for an unexpected error or the save confirmation in a single wait
+        with telemetry.step("save"):
+            main_window.child_window(title="Save").click_input()
+            dialog = current_driver().wait_for_dialog(main_window, ("Error", "Save Confirmation"),
+                                                      settings.DIALOG_TIMEOUT)
+        if dialog == "Error":
+            get_operation_logger().log_operation("Overwrite", part_number, "n/a",
+                                                 SAVE_ERROR_STATUS)
+            notify("Error", "An error has occurred. Please try again.", outcome="save_error")
+            Operation.dismiss_error(main_window)
+            main_window.child_window(title="Clear").click_input()
+            return
+
+        # Confirm saving
+        if dialog == "Save Confirmation":
+            confirmation_dialog = main_window.child_window(title="Save Confirmation",
+                                                           auto_id="EpiCheckMessageBox")
+            yes_button = confirmation_dialog.child_window(title="Yes", auto_id="btnYes2", control_type="Button")
+            yes_button.click_input()
+
+        # Log successful operation
+        get_operation_logger().log_operation("Overwrite", part_number, "n/a", "Completed")
+        telemetry.info(str(part_number) + " - Overwrite Complete", outcome="overwritten")
+        if snapshot is not None:
+            Operation.record_snapshot("Overwrite", part_number, snapshot)
+
+        # Clear form
+        main_window.child_window(title="Clear").click_input()
 
 
 class DeleteOperation(Operation):
-    def execute(self, file_data, label_data):
+    name = "Delete"
+
+    def fingerprint(self, row, label_data):
         """
-        Execute method specific to the DeleteOperation subclass.
+        Deleting only depends on the part number
 
-        :param file_data: A dictionary containing user data related to the file information form
-        :type file_data: dict
+        :param row: A row dictionary as returned by read_part_rows
+        :param label_data: A dictionary containing user data related to the label information form
+        :return: A short hexadecimal digest of the part number
+        :rtype: str
+        """
+        return _digest([row["Part Number"]])
+
+    def process_row(self, main_window, row, label_data):
+        """
+        Process_row method specific to the DeleteOperation subclass.
+
+        :param main_window: The connected Part Maintenance window
+        :param row: A row dictionary with 'Row', 'Part Number', and 'Description' keys
+        :type row: dict
         :param label_data: A dictionary containing user data related to the label information form
         :type label_data: dict
 
-        This method is implemented in the DeleteOperation subclass to carry out the deletion operation. It takes in 'file_data'
-        and 'label_data' as parameters, providing the necessary information for deleting parts in the system.
-        The method first establishes a connection to the Part Maintenance application, clears current information,
-        loads the user-provided workbook, and loops through the part numbers to delete them. If a part number is null,
-        it logs an incomplete operation. If the part doesn't exist, it logs that the deletion cannot be performed.
-        If the part exists, it proceeds with the deletion process by confirming the deletion in Epicor.
-        Upon successful deletion, it logs the completion of the operation.
+        If the part number is null, it logs an incomplete operation. If the part doesn't exist, it logs that the
+        deletion cannot be performed. If the part exists, it proceeds with the deletion process by confirming the
+        deletion in Epicor. Upon successful deletion, it logs the completion of the operation.
         """
 
-        # Print messages and separators to the console
-        print_fancy_separator("User Data")
-        print(f"File Data: {file_data}\nLabel Data: {label_data}")
-        print_fancy_separator("Program Documentation")
-        print("Initializing Part Deletion...\n")
+        part_number = row["Part Number"]
+
+        # Validate that part number is not None
+        if part_number is None:
+            self.log_null_part(row)
+            return
+
+        # Confirm that the part already exist
+        if self.open_part(main_window, part_number):
+            main_window.child_window(auto_id='btnNo2').click_input()
+            get_operation_logger().log_operation("Delete", part_number, "n/a", "Incomplete - "
+                                                                               "part doesn't exist and therefore "
+                                                                               "can't be deleted")
+            telemetry.info(str(part_number) + " - Unable to delete: Part never existed", outcome="missing")
+            return
+
+        # Keep the whole part record, so the part can be created again
+        snapshot = None
+        if settings.SNAPSHOT_CHANGES:
+            snapshot = self.read_snapshot(main_window, PART_RECORD_IDS)
+
+        main_window.child_window(title="Delete").click_input()
+        if current_driver().wait_for_dialog(main_window, ("Delete Confirmation",),
+                                            settings.DIALOG_TIMEOUT) == "Delete Confirmation":
+            main_window.child_window(auto_id='btnYes2').click_input()
+            get_operation_logger().log_operation("Delete", part_number, "n/a", "Completed")
+            telemetry.info(str(part_number) + " - Deletion Complete", outcome="deleted")
+            if snapshot is not None:
+                self.record_snapshot("Delete", part_number, snapshot)
+
+
+class UpsertOperation(Operation):
+    name = "Upsert"
+
+    def logged_names(self, row):
+        """
+        Upserted rows are logged as whichever branch they took
 
-        try:
-            # Connect the application to Part Maintenance and send confirmation message
-            app = Application(backend="uia").connect(title="Part Maintenance")
-            print('Connection to Part Maintenance achieved\n')
-
-            # Clear current information
-            app.window(title='Part Maintenance').child_window(title="Clear").click_input()
-
-            # Load in the user-provided workbook and access the specific sheet
-            book = load_workbook(file_data["Input File"])
-            sheet_index = file_data["Sheet Index"]
-            sheets = book.sheetnames
-            active_sheet = book[sheets[sheet_index]]
-
-            # Loop through all the part numbers
-            for i in range(int(file_data["First Row"]), int(file_data["Last Row"]) + 1):
-                # Reconnect to the form toe ensure it doesn't fall asleep
-                app = Application(backend="uia").connect(title="Part Maintenance")
-                main_window = app.window(title='Part Maintenance')
-
-                # Find the cell that hosts the part numbers
-                pn_cell = file_data["Part Column Letter"] + str(i)
-                part_number = active_sheet[pn_cell].value
-
-                # Type cell value into text box
-                main_window.child_window(auto_id='tbPart').type_keys(part_number)
-                send_keys("{TAB}")
-
-                # Validate that part number is not None
-                if part_number is None:
-                    operation_logger.log_operation("Create", str(part_number), "n/a",
-                                                   "Incomplete: part number was null")
-                    print(str(part_number) + " - Unable to delete: Part number is null")
-                    main_window.child_window(auto_id='btnNo2').click_input()
-                    continue
+        :param row: A row dictionary as returned by read_part_rows
+        :return: A tuple of operation names
+        :rtype: tuple
+        """
+        return "Create", "Overwrite"
 
-                # Confirm that the part already exist
-                if main_window.child_window(title="Add New Confirmation").exists():
-                    main_window.child_window(auto_id='btnNo2').click_input()
-                    operation_logger.log_operation("Delete", part_number, "n/a", "Incomplete - "
-                                                                                 "part doesn't exist and therefore "
-                                                                                 "can't be deleted")
-                    print(str(part_number) + " - Unable to delete: Part never existed")
-                    continue
-                else:
-                    main_window.child_window(title="Delete").click_input()
-                    if main_window.child_window(title="Delete Confirmation").exists():
-                        main_window.child_window(auto_id='btnYes2').click_input()
-                        operation_logger.log_operation("Delete", part_number, "n/a", "Completed")
-                        print(str(part_number) + " - Deletion Complete")
-
-        except pywinauto.findwindows.ElementNotFoundError:
-            print("Epicor Connection Failed...")
-            messagebox.showinfo("Connection Failed", "Part Maintenance not found. \nTerminating "
-                                                     "program...")
-            sys.exit()
-        except pywinauto.timings.TimeoutError:
-            messagebox.showerror("Error", "The program took too long to respond. Please restart")
-        except Exception as e:
-            print(e)
-            raise e
+    def process_row(self, main_window, row, label_data):
+        """
+        Process_row method specific to the UpsertOperation subclass.
+
+        :param main_window: The connected Part Maintenance window
+        :param row: A row dictionary with 'Row', 'Part Number', and 'Description' keys
+        :type row: dict
+        :param label_data: A dictionary containing user data related to the label information form
+        :type label_data: dict
+
+        Opens the part once and lets that single existence check decide the branch: a part Epicor offers to add is
+        created exactly as CreateOperation would, and an existing part is overwritten exactly as OverwriteOperation
+        would. Each branch logs under its own operation name.
+        """
+
+        part_number = row["Part Number"]
+
+        # Validate that part number is not None
+        if part_number is None:
+            self.log_null_part(row)
+            return
+
+        if self.open_part(main_window, part_number):
+            CreateOperation.add_new_part(main_window, part_number, row["Description"], label_data)
+        else:
+            OverwriteOperation.fill_existing_part(main_window, part_number, label_data)
+
+
+class MixedOperation(Operation):
+    name = "Mixed"
+
+    # Order in which the actions for the same part number are carried out
+    ACTION_ORDER = {"DELETE": 0, "CREATE": 1, "OVERWRITE": 2}
+
+    def __init__(self, operations):
+        """
+        Initializes the MixedOperation class instance with the operations its rows are dispatched to
+
+        :param operations: A dictionary whose keys are action names (CREATE, OVERWRITE, DELETE) and whose values are
+        the corresponding operation objects
+        :type operations: dict
+        """
+
+        self.operations = operations
+
+    def run_rows(self, rows, label_data, governor=None, monitor=None):
+        """
+        Orders the rows so actions on the same part number do not conflict, then loops through them
+
+        :param rows: An iterable of row dictionaries carrying an 'Action' key. The whole batch is read before it is
+        ordered.
+        :param label_data: A dictionary containing user data related to the label information form
+        :type label_data: dict
+        :param governor: The rate governor pacing the rows, or None to run at full speed
+        :type governor: RateGovernor
+        :param monitor: The failure monitor watching the rows, or None
+        :type monitor: FailureMonitor
+        :return: The rows that completed, as returned by Operation.run_rows
+        :rtype: list
+        """
+
+        return super().run_rows(self.order_rows(list(rows)), label_data, governor, monitor)
+
+    def logged_names(self, row):
+        """
+        Rows of a mixed batch are logged under the operation of their action
+
+        :param row: A row dictionary carrying an 'Action' key
+        :return: A tuple of operation names
+        :rtype: tuple
+        """
+
+        operation = self.operations.get(row.get("Action"))
+        return operation.logged_names(row) if operation else ()
+
+    def fingerprint(self, row, label_data):
+        """
+        Rows of a mixed batch are fingerprinted by the operation of their action
+
+        :param row: A row dictionary carrying an 'Action' key
+        :param label_data: A dictionary containing user data related to the label information form
+        :return: A short hexadecimal digest of the row's payload
+        :rtype: str
+        """
+
+        operation = self.operations.get(row.get("Action"))
+        return operation.fingerprint(row, label_data) if operation else super().fingerprint(row, label_data)
+
+    def process_row(self, main_window, row, label_data):
+        """
+        Process_row method specific to the MixedOperation subclass.
+
+        :param main_window: The connected Part Maintenance window
+        :param row: A row dictionary with 'Row', 'Part Number', 'Description', and 'Action' keys
+        :type row: dict
+        :param label_data: A dictionary containing user data related to the label information form
+        :type label_data: dict
+
+        Hands the row to the operation matching its action. Rows without a valid action are logged as incomplete.
+        """
+
+        operation = self.operations.get(row.get("Action"))
+        if operation is None:
+            get_operation_logger().log_operation(self.name, str(row["Part Number"]), row["Description"],
+                                                 f"Incomplete: invalid action '{row.get('Action')}'")
+            telemetry.warning(f"{row['Part Number']} - Unable to process: Invalid action '{row.get('Action')}'",
+                              outcome="invalid_action")
+            return
+
+        operation.process_row(main_window, row, label_data)
+
+    @classmethod
+    def order_rows(cls, rows):
+        """
+        Reorders the actions of every part number that appears more than once so deletes run before creates and
+        creates run before overwrites. Each part number keeps the row positions it had, so the rest of the batch stays
+        in spreadsheet order.
+
+        :param rows: A list of row dictionaries carrying an 'Action' key
+        :type rows: list
+        :return: The reordered list of rows
+        :rtype: list
+        """
+
+        positions = {}
+        for index, row in enumerate(rows):
+            positions.setdefault(row["Part Number"], []).append(index)
+
+        ordered_rows = list(rows)
+        for indexes in positions.values():
+            if len(indexes) < 2:
+                continue
+            part_rows = sorted((rows[index] for index in indexes),
+                               key=lambda row: cls.ACTION_ORDER.get(row.get("Action"), len(cls.ACTION_ORDER)))
+            for index, row in zip(indexes, part_rows):
+                ordered_rows[index] = row
+
+        return ordered_rows
 
 
 class ERPManager:
@@ -512,23 +1046,34 @@ class ERPManager:
         :param delete_op: Operation object for the DELETE operation
 
         This method sets up a dictionary 'operations' where keys are OperationType enums
-        (CREATE, OVERWRITE, DELETE) and values are the corresponding operation objects.
+        (CREATE, OVERWRITE, DELETE, MIXED, UPSERT) and values are the corresponding operation objects. The MIXED
+        operation dispatches each row to the create, overwrite, or delete operation named in its action column, and
+        the UPSERT operation creates or overwrites each part depending on whether it already exists.
         """
 
         self.operations = {
             OperationType.CREATE: create_op,
             OperationType.OVERWRITE: overwrite_op,
-            OperationType.DELETE: delete_op
+            OperationType.DELETE: delete_op,
+            OperationType.MIXED: MixedOperation({
+                OperationType.CREATE.name: create_op,
+                OperationType.OVERWRITE.name: overwrite_op,
+                OperationType.DELETE.name: delete_op
+            }),
+            OperationType.UPSERT: UpsertOperation()
         }
 
-    def perform_operation(self, op_type: OperationType, form_data, label_data):
+    def perform_operation(self, op_type: OperationType, form_data, label_data, rows=None):
         """
         Perform the specified operation based on the given operation type.
 
-        :param op_type: The type of operation to be performed (CREATE, OVERWRITE, DELETE)
+        :param op_type: The type of operation to be performed (CREATE, OVERWRITE, DELETE, MIXED, UPSERT)
         :type op_type: OperationType
         :param form_data: Data related to the form for the operation
         :param label_data: Data related to the labels for the operation
+        :param rows: The rows to run if they were already read (e.g. by a trace replay) instead of the rows the form
+        data selects
+        :type rows: list
 
         :raises ValueError: If the provided operation type is not valid
 
@@ -537,7 +1082,211 @@ class ERPManager:
         If the operation type is not found in the dictionary, a ValueError is raised.
         """
         operation = self.operations.get(op_type)
-        if operation:
-            operation.execute(form_data, label_data)
+        if operation and settings.BULK_IMPORT_DIRECTORY:
+            self.summarized(lambda: self.reported(
+                lambda: self.exported([(operation, iter_part_rows(form_data) if rows is None else rows,
+                                        label_data)])))
+        elif operation:
+            header = {"operation": op_type.name, "file_data": form_data, "label_data": label_data}
+            if settings.RECORD_TRACE_FILE:
+                # The trace keeps the rows that were read, so it replays without the workbook (as a job's does)
+                rows = header["rows"] = read_part_rows(form_data) if rows is None else rows
+            self.summarized(lambda: self.reported(lambda: self.verify(
+                self.profiled(lambda: self.recorded(header, lambda: operation.execute(form_data, label_data, rows))))))
         else:
             raise ValueError("Invalid operation type")
+
+    def perform_job(self, job_entries):
+        """
+        Perform every entry of a prepared job back-to-back over a single Part Maintenance session.
+
+        :param job_entries: Parsed job entries as returned by batch_job.prepare_job. Each entry carries its
+        'Operation' name, its 'Label Data', and the 'Rows' read from its workbook.
+        :type job_entries: list
+
+        :raises ValueError: If an entry names an invalid operation type
+
+        All entries share one connection, one initial Clear, and the global operation log, so a job spanning several
+        workbooks and sheets costs a single start-up.
+        """
+
+        operations = []
+        for entry in job_entries:
+            operation = self.operations.get(OperationType.__members__.get(entry["Operation"]))
+            if not operation:
+                raise ValueError(f"Invalid operation type: {entry['Operation']}")
+            operations.append(operation)
+
+        if settings.BULK_IMPORT_DIRECTORY:
+            self.summarized(lambda: self.reported(lambda: self.exported(
+                [(operation, entry["Rows"], entry["Label Data"])
+                 for entry, operation in zip(job_entries, operations)])))
+            return
+
+        # One governor paces the whole job, so what it learned about Epicor's latency carries over between entries.
+        # One monitor watches it, so the canary is the first rows of the job and a stop ends every entry, as does an
+        # entry aborted after too many failed rows in a row.
+        governor = governor_from_settings(settings)
+        monitor = monitor_from_settings(settings)
+
+        def run_entries():
+            applied_rows = []
+            for entry, operation in zip(job_entries, operations):
+                if monitor and monitor.stopped:
+                    break
+                telemetry.separator(f"{operation.name}: {os.path.basename(entry['Input File'])} "
+                                    f"[{entry['Sheet Name']}] rows {entry['First Row']}-{entry['Last Row']}")
+                applied_rows += operation.run_rows(entry["Rows"], entry["Label Data"], governor, monitor)
+                if operation.aborted:
+                    break
+            return applied_rows
+
+        telemetry.separator("Program Documentation")
+        telemetry.info(f"Initializing job with {len(job_entries)} entries...\n", step="initialize")
+        header = {"job_entries": job_entries}
+        self.summarized(lambda: self.reported(lambda: self.verify(
+            self.profiled(lambda: self.recorded(header, lambda: run_in_session(run_entries))))))
+
+    @staticmethod
+    def exported(batches):
+        """
+        Runs the bulk-load backend, which writes the batches into import files for Epicor's import tool in
+        settings.BULK_IMPORT_DIRECTORY instead of typing them into Part Maintenance. Nothing connects to Epicor.
+
+        :param batches: (operation, rows, label data) tuples, in order
+        :type batches: list
+        :return: The path of the manifest listing the files in import order, or None if nothing was exported
+        :rtype: str
+        """
+
+        telemetry.separator("Bulk Import Export")
+        return export_batches(batches, settings.BULK_IMPORT_DIRECTORY, f"part_import_{telemetry.run_id}",
+                              settings.BULK_IMPORT_CHUNK_ROWS, settings.BULK_IMPORT_COMPANY,
+                              get_operation_logger())
+
+    @staticmethod
+    def summarized(work):
+        """
+        Runs the work under the optional unattended mode, which gathers every row outcome, notification, and error of
+        the run into one summary report instead of message boxes, then writes run_summary_<run id>.txt and shows it
+        on the console
+
+        :param work: A callable that performs the run
+        :return: Whatever the work returned
+        """
+
+        if not settings.UNATTENDED:
+            return work()
+
+        summary = RunSummary(telemetry.run_id)
+        telemetry.add_sink(summary)
+        try:
+            return work()
+        finally:
+            # Every event of the run has to reach the summary before it is written
+            telemetry.flush()
+            telemetry.remove_sink(summary)
+            report_path = summary.save()
+            telemetry.separator("Run Summary")
+            telemetry.info(f"{summary.report()}\n\nRun summary written to {report_path}", step="summary")
+
+    @staticmethod
+    def reported(work):
+        """
+        Runs the work under the run report, which collects the timing of every row and step and writes
+        run_report_<run id>.html: throughput over time, step latency percentiles, outcomes, the slowest rows, and a
+        comparison with earlier runs of the same operations from the operation history
+
+        :param work: A callable that performs the run
+        :return: Whatever the work returned
+        """
+
+        if not settings.RUN_REPORT:
+            return work()
+
+        report = RunReport(telemetry.run_id)
+        telemetry.add_sink(report)
+        try:
+            return work()
+        finally:
+            # Every row event has to reach the report before it is written
+            telemetry.flush()
+            telemetry.remove_sink(report)
+            try:
+                telemetry.info(f"Run report written to {report.save(get_operation_logger().history)}", step="report")
+            except (OSError, ValueError) as e:
+                # The report is a by-product; failing to write it must not mask the outcome of the run
+                telemetry.warning(f"The run report could not be written: {e}", step="report")
+
+    @staticmethod
+    def profiled(work):
+        """
+        Runs the work under the optional profiling mode, which captures a CPU profile of the whole run and periodic
+        heap snapshots, then writes profile_<run id>.prof and a text report comparing the first and last rows.
+
+        :param work: A callable that performs the run
+        :return: Whatever the work returned
+        """
+
+        if not settings.PROFILE_RUN:
+            return work()
+
+        profiler = RunProfiler(telemetry.run_id, settings.PROFILE_SNAPSHOT_EVERY, settings.PROFILE_COMPARE_ROWS)
+        telemetry.add_sink(profiler)
+        profiler.start()
+        try:
+            return work()
+        finally:
+            # Every row event has to reach the profiler before the report is written
+            telemetry.flush()
+            telemetry.remove_sink(profiler)
+            telemetry.info(f"Profile report written to {profiler.stop()}", step="profile")
+
+    @staticmethod
+    def recorded(header, work):
+        """
+        Runs the work under the optional trace recording, which writes every driver call with its arguments, result,
+        and latency so ui_trace.py can replay the run without Epicor
+
+        :param header: The run inputs needed to replay the trace
+        :type header: dict
+        :param work: A callable that performs the run
+        :return: Whatever the work returned
+        """
+
+        if not settings.RECORD_TRACE_FILE:
+            return work()
+        telemetry.info(f"Recording UI trace to {settings.RECORD_TRACE_FILE}", step="record")
+        # Unattended runs make extra calls to recover from failed rows, and a failure monitor may stop the run
+        # early, so the replay has to run the same way
+        monitor_settings = {name: getattr(settings, name) for name in FAILURE_MONITOR_SETTINGS}
+        return recording(settings.RECORD_TRACE_FILE, dict(header, unattended=settings.UNATTENDED,
+                                                          snapshots=settings.SNAPSHOT_CHANGES,
+                                                          failure_monitor=monitor_settings), work)
+
+    @staticmethod
+    def verify(applied_rows):
+        """
+        Runs the optional verification pass, which reads back every applied part from a part-master export once the
+        export has been refreshed after the run, and logs every value Epicor did not keep.
+
+        :param applied_rows: The rows that completed, as returned by Operation.run_rows
+        :type applied_rows: list
+        :return: None
+        """
+
+        if not settings.VERIFY_EXPORT_FILE or not applied_rows:
+            return
+
+        # An export written while the run was still going lacks the parts applied after it
+        finished = time.time()
+        telemetry.separator("Verification")
+        telemetry.info(f"Waiting for a refreshed part export at {settings.VERIFY_EXPORT_FILE}...", step="verify")
+        if not wait_for_export(settings.VERIFY_EXPORT_FILE, finished, settings.VERIFY_EXPORT_TIMEOUT):
+            telemetry.warning("Verification skipped: the part export was not refreshed after the run",
+                              step="verify", outcome="stale_export")
+            return
+
+        operation_logger = get_operation_logger()
+        verify_applied_rows(applied_rows, PartExportReader(settings.VERIFY_EXPORT_FILE), operation_logger)
+        operation_logger.flush()
@@ -0,0 +1,114 @@
+from collections import deque
+from notifications import notify, confirm
+from telemetry import telemetry
+import settings
+
+
+# The settings a failure monitor is built from
+FAILURE_MONITOR_SETTINGS = ("CANARY_ROWS", "CANARY_CONFIRM", "FAILURE_RATE_WINDOW", "FAILURE_RATE_THRESHOLD",
+                            "FAILURE_RATE_ACTION")
+
+
+class FailureMonitor:
+    def __init__(self, canary_rows=0, confirm_canary=False, window_rows=20, max_failure_rate=None, action="pause"):
+        """
+        Initializes the FailureMonitor class instance, which stops a run early when its rows fail systematically (a
+        wrong label value, Epicor rejecting saves) instead of letting every remaining row fail at full UI cost.
+
+        The first canary_rows rows of the run are a canary: if any of them fails, the run pauses (or aborts) before
+        the rest of the batch is touched; if they all complete, the run carries on by itself, or asks first when
+        confirm_canary is set. After the canary, the failure rate over the last window_rows rows is watched, and the
+        run pauses (or aborts) as soon as it reaches max_failure_rate.
+
+        :param canary_rows: The number of rows run as a canary. 0 runs no canary.
+        :type canary_rows: int
+        :param confirm_canary: Whether the operator confirms a canary whose rows all completed
+        :type confirm_canary: bool
+        :param window_rows: The number of recent rows the failure rate is measured over
+        :type window_rows: int
+        :param max_failure_rate: The share of failed rows in the window (0 to 1) that stops the run. None does not
+        watch the failure rate.
+        :type max_failure_rate: float
+        :param action: 'pause' asks the operator whether to carry on (unattended runs abort, since nobody can
+        answer); 'abort' stops the run straight away
+        :type action: str
+        """
+
+        self.canary_rows = canary_rows or 0
+        self.confirm_canary = confirm_canary
+        self.max_failure_rate = max_failure_rate
+        self.action = action
+        self.window = deque(maxlen=max(1, window_rows))
+        self.rows = 0
+        self.failures = 0
+        self.stopped = False
+
+    def record(self, failed):
+        """
+        Feeds the outcome of a row that was run (skipped rows are not counted) into the monitor
+
+        :param failed: Whether the row failed in Epicor (an error, a refused save, a dialog that never appeared). Rows
+        left undone because of their data, e.g. a part that already exists, are not failures.
+        :type failed: bool
+        :return: True if the run should carry on, False if it has to stop here
+        :rtype: bool
+        """
+
+        self.rows += 1
+        self.failures += failed
+        self.window.append(failed)
+
+        if self.rows == self.canary_rows:
+            if self.failures:
+                telemetry.warning(f"Canary failed: {self.failures} of the first {self.rows} rows failed",
+                                  step="canary", outcome="failed")
+                return self._pause_or_abort("Canary Failed", f"{self.failures} of the first {self.rows} rows failed.")
+            telemetry.info(f"Canary passed: none of the first {self.rows} rows failed", step="canary", outcome="passed")
+            if self.confirm_canary:
+                return self._carry_on("Canary Passed", f"None of the first {self.rows} rows failed.",
+                                      "Check them in Epicor, then continue with the rest of the batch?", default=True)
+            return True
+
+        if (self.max_failure_rate is not None and self.rows > self.canary_rows
+                and len(self.window) == self.window.maxlen):
+            failures = sum(self.window)
+            if failures / len(self.window) >= self.max_failure_rate:
+                telemetry.warning(f"Failure rate too high: {failures} of the last {len(self.window)} rows failed",
+                                  step="failure_rate", outcome="too_high")
+                # A run the operator lets carry on is judged on a fresh window
+                self.window.clear()
+                return self._pause_or_abort("High Failure Rate",
+                                            f"{failures} of the last {self.window.maxlen} rows failed.")
+        return True
+
+    def _pause_or_abort(self, title, message):
+        if self.action == "pause":
+            return self._carry_on(title, message, "Continue with the rest of the batch?", default=False)
+        self.stopped = True
+        notify("Run Aborted", f"{message} The rest of the batch was not run.", outcome="aborted")
+        return False
+
+    def _carry_on(self, title, message, question, default):
+        if confirm(title, f"{message}\n\n{question}", default=default, outcome="paused"):
+            return True
+        self.stopped = True
+        if settings.UNATTENDED:
+            notify("Run Aborted", f"{message} The rest of the batch was not run.", outcome="aborted")
+        else:
+            telemetry.warning("Run stopped by the operator; the rest of the batch was not run", step="stop",
+                              outcome="stopped")
+        return False
+
+
+def monitor_from_settings(settings):
+    """
+    Builds the failure monitor configured in the run options
+
+    :param settings: The settings module
+    :return: A FailureMonitor, or None when neither a canary nor the failure rate is configured
+    """
+
+    if not settings.CANARY_ROWS and settings.FAILURE_RATE_THRESHOLD is None:
+        return None
+    return FailureMonitor(settings.CANARY_ROWS, settings.CANARY_CONFIRM, settings.FAILURE_RATE_WINDOW,
+                          settings.FAILURE_RATE_THRESHOLD, settings.FAILURE_RATE_ACTION)
@@ -1,62 +1,46 @@
 import tkinter as tk
 import tkinter.font as tkfont
 from tkinter import ttk, filedialog, messagebox
-from combobox_options import (TYPE_OPTIONS, CLASS_OPTIONS, REPORTING_GROUP_OPTIONS,
-                              ON_HOLD_REASON_OPTIONS, GROUP_OPTIONS, LABEL_GROUP_OPTIONS)
+from option_catalog import catalog
 from openpyxl.utils import get_column_letter, exceptions, column_index_from_string
+from workbook_reader import iter_part_rows
+from input_validation import validate_rows
 import openpyxl
+import threading
 import sys
 import os
 import re
 import msvcrt
-import gc
 
 
 # region Validation Methods
 
-def check_empty_rows(file_path, sheet_index, column, row_start, row_end):
+def read_sheet_names(excel_file_path):
     """
-    Checks for empty rows in a specified column for a specified range of rows
-
-    :param file_path: The file containing the sheet and column the user intends to check
-    :param sheet_index: The index of the sheet within the file_path parameter
-    :param column: The specified column
-    :param row_start: The first row the program should check
-    :param row_end: The last row the program should check
-    :return: A list of the rows that were empty
-    """
-
-    workbook = None
-    try:
-        workbook = openpyxl.load_workbook(file_path, read_only=True, keep_vba=False, data_only=True)
-
-        if sheet_index < 0 or sheet_index >= len(workbook.sheetnames):
-            raise ValueError(
-                f"Sheet index {sheet_index} is out of range. The workbook has {len(workbook.sheetnames)} sheets.")
-
-        sheet = workbook.worksheets[sheet_index]
-        empty_rows = []
-
-        # Convert column reference to index if it's a string
-        column = column_index_from_string(column) if isinstance(column, str) else column
+    Reads the sheet names of an Excel file. The workbook is opened read-only, so only its index is parsed and not the
+    cells of every sheet.
 
-        # Ensure row_start and row_end are within the sheet's range
-        max_row = sheet.max_row
-        row_start = max(1, min(row_start, max_row))
-        row_end = min(row_end, max_row)
-
-        for row in range(row_start, row_end + 1):
-            cell_value = sheet.cell(row=row, column=column).value
-
-            if cell_value is None or cell_value == "":
-                empty_rows.append(row)
-
-        return empty_rows
+    :param excel_file_path: The path to the Excel file
+    :type excel_file_path: str
 
+    :return: The names of the sheets in workbook order, or an empty list if the file cannot be read
+    :rtype: list
+    """
+    try:
+        workbook = openpyxl.load_workbook(excel_file_path, read_only=True)
+    except FileNotFoundError:
+        print(f"File not found: {excel_file_path}")
+        return []
+    except openpyxl.utils.exceptions.InvalidFileException:
+        print(f"Invalid Excel file: {excel_file_path}")
+        return []
+    except Exception as e:
+        print(f"An error occured while reading {excel_file_path}: {e}")
+        return []
+    try:
+        return workbook.sheetnames
     finally:
-        if workbook:
-            workbook.close()
-        gc.collect()  # Force garbage collection
+        workbook.close()
 
 
 def sheet_exists(excel_file_path, sheet_name):
@@ -71,17 +55,7 @@ def sheet_exists(excel_file_path, sheet_name):
     :return: True if the sheet exists, False otherwise
     :rtype: bool
     """
-    try:
-        workbook = openpyxl.load_workbook(excel_file_path)
-        return sheet_name in workbook.sheetnames
-    except FileNotFoundError:
-        print(f"File not found: {excel_file_path}")
-        return False
-    except openpyxl.utils.exceptions.InvalidFileException:
-        print(f"Invalid Excel file: {excel_file_path}")
-        return False
-    except Exception(BaseException):
-        print("An error occured. Please try again.")
+    return sheet_name in read_sheet_names(excel_file_path)
 
 
 def get_sheet_index(excel_file_path, sheet_name):
@@ -97,19 +71,11 @@ def get_sheet_index(excel_file_path, sheet_name):
     :rtype: int
     """
 
-    try:
-        workbook = openpyxl.load_workbook(excel_file_path)
-        sheet_index = workbook.sheetnames.index(sheet_name)
-        return sheet_index
-    except FileNotFoundError:
-        print(f"File not found: {excel_file_path}")
-        return False
-    except openpyxl.utils.exceptions.InvalidFileException:
-        print(f"Invalid Excel file: {excel_file_path}")
-        return False
-    except ValueError:
+    sheet_names = read_sheet_names(excel_file_path)
+    if sheet_name not in sheet_names:
         print(f"Sheet '{sheet_name}' not found in the Excel file.")
         return False
+    return sheet_names.index(sheet_name)
 
 
 def validate_file_location(file_path):
@@ -221,15 +187,199 @@ def is_valid_integer(var):
     return isinstance(var, str) and var.isdigit()
 
 
-def browse_file(var):
+def show_validation_report(master, issues):
+    """
+    Shows every validation issue in one window and waits until the user closes it
+
+    :param master: The form the report belongs to
+    :param issues: Issue dictionaries with 'Row', 'Column', and 'Issue' keys
+    :type issues: list
+    :return: None
+    """
+
+    report = tk.Toplevel(master)
+    report.title("Validation Report")
+    report.transient(master)
+
+    frame = ttk.Frame(report, padding="10")
+    frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+    report.columnconfigure(0, weight=1)
+    report.rowconfigure(0, weight=1)
+    frame.columnconfigure(0, weight=1)
+    frame.rowconfigure(1, weight=1)
+
+    noun = "issue" if len(issues) == 1 else "issues"
+    tk.Label(frame, text=f"{len(issues)} {noun} found. Fix them all, then submit again.").grid(
+        row=0, column=0, columnspan=2, sticky=tk.W, pady=(0, 5))
+
+    table = ttk.Treeview(frame, columns=("Row", "Column", "Issue"), show="headings", height=min(len(issues), 15))
+    for column, width in (("Row", 60), ("Column", 70), ("Issue", 520)):
+        table.heading(column, text=column)
+        table.column(column, width=width, stretch=column == "Issue")
+    for issue in issues:
+        table.insert("", tk.END, values=("" if issue["Row"] is None else issue["Row"], issue["Column"],
+                                         issue["Issue"]))
+    scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=table.yview)
+    table.configure(yscrollcommand=scrollbar.set)
+    table.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+    scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
+
+    tk.Button(frame, text="Close", command=report.destroy).grid(row=2, column=0, columnspan=2, pady=(7, 0))
+
+    report.grab_set()
+    master.wait_window(report)
+
+
+def browse_file(var, on_selected=None):
     """
     Sets the selected file path to the given `var`.
 
     :param var: tkinter variable to store the selected file path
+    :param on_selected: Called once a file has been picked, e.g. to start validating it before the form is submitted
     """
 
     file_path = filedialog.askopenfilename()
     var.set(file_path)
+    if file_path and on_selected:
+        on_selected()
+
+
+def workbook_key(file_path):
+    """
+    Identifies a version of a workbook, so work done on it can be reused until the file changes
+
+    :param file_path: The path to the workbook
+    :type file_path: str
+    :return: A tuple of the absolute path, the modification time, and the size, or None if the file cannot be read
+    :rtype: tuple
+    """
+
+    try:
+        stat = os.stat(file_path)
+    except (OSError, ValueError):
+        return None
+    return os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size
+
+
+class FileValidation:
+    def __init__(self, file_data, previous=None):
+        """
+        Initializes the FileValidation class instance, which checks the values of a File Information form on a
+        background thread, so the form stays responsive while the workbook is opened and the range is read: the file
+        and its sheet, the column letters and the row range, and then the rows themselves. The results are read by
+        the form once done is True; nothing here touches tkinter.
+
+        A form whose fields are not all filled in yet only gets its sheet names read, so a validation started as
+        soon as the file is picked still saves the slowest step of the one started on submit.
+
+        :param file_data: The values of the File Information form, by label
+        :type file_data: dict
+        :param previous: The validation this one replaces. Its sheet names are reused when it read the same version
+        of the same workbook.
+        :type previous: FileValidation
+        """
+
+        self.file_data = dict(file_data)
+        self.workbook = workbook_key(self.file_data.get("Input File", ""))
+        self.key = (self.workbook, tuple(sorted(self.file_data.items())))
+        self.is_complete = all(str(value).strip() for value in self.file_data.values())
+        self.previous = previous if previous and self.workbook and previous.workbook == self.workbook else None
+
+        self.cancelled = threading.Event()
+        self.finished = threading.Event()
+        self.status = "Opening workbook..."
+        self.rows_read = 0
+        self.total_rows = 0
+        self.sheet_names = None
+        self.sheet_index = None
+        self.rows = None
+        self.issues = []
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="file-validation", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        self.cancelled.set()
+
+    @property
+    def done(self):
+        return self.finished.is_set()
+
+    def _run(self):
+        try:
+            self._validate()
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+        finally:
+            self.previous = None
+            self.status = "Cancelled" if self.cancelled.is_set() else "Done"
+            self.finished.set()
+
+    def _validate(self):
+        file_data = self.file_data
+        if self.workbook and validate_file_location(file_data["Input File"]):
+            self.sheet_names = self._read_sheet_names()
+        if not self.is_complete or self.cancelled.is_set():
+            return
+
+        # Validate the user-inputted Excel file and that the sheet is within it
+        issues = []
+        file_is_valid = False
+        if not validate_file_location(file_data["Input File"]):
+            issues.append("Invalid file input")
+        elif is_file_open(file_data["Input File"]):
+            issues.append("Excel file is currently open. Please close it and try again")
+        elif self.sheet_names and file_data["Sheet Name"] in self.sheet_names:
+            self.sheet_index = self.sheet_names.index(file_data["Sheet Name"])
+            file_is_valid = True
+        else:
+            issues.append("Invalid sheet name")
+
+        # Validate Column Letters
+        if not is_valid_column(file_data["Part Column Letter"]):
+            issues.append("Invalid part column letter")
+        if "Description Column Letter" in file_data:
+            if (not is_valid_column(file_data["Description Column Letter"])
+                    or file_data["Description Column Letter"] == file_data["Part Column Letter"]):
+                issues.append("Invalid description column letter")
+        if "Action Column Letter" in file_data:
+            if (not is_valid_column(file_data["Action Column Letter"]) or file_data["Action Column Letter"] in
+                    (file_data["Part Column Letter"], file_data.get("Description Column Letter"))):
+                issues.append("Invalid action column letter")
+
+        # Validate row order
+        is_valid, message = is_valid_row_combo(file_data["First Row"], file_data["Last Row"])
+        if not is_valid:
+            issues.append(message)
+
+        self.issues = [{"Row": None, "Column": "", "Issue": issue} for issue in issues]
+        if not file_is_valid or self.issues:
+            return
+
+        # Read the selected range once, so the form can check every row of it
+        self.total_rows = int(file_data["Last Row"]) - int(file_data["First Row"]) + 1
+        self.status = "Reading rows..."
+        rows = []
+        for row in iter_part_rows(dict(file_data, **{"Sheet Index": self.sheet_index})):
+            if self.cancelled.is_set():
+                return
+            rows.append(row)
+            self.rows_read = len(rows)
+        self.rows = rows
+
+    def _read_sheet_names(self):
+        previous = self.previous
+        if previous:
+            # Wait for the validation this one replaces rather than opening the same workbook a second time
+            while not previous.finished.wait(0.1):
+                if self.cancelled.is_set():
+                    return None
+            if previous.sheet_names is not None:
+                return previous.sheet_names
+        return read_sheet_names(self.file_data["Input File"])
 
 
 # endregion
@@ -254,6 +404,11 @@ class BaseForm:
         self.label_widgets = []  # List to hold label-related widgets
         self.small_font = tkfont.Font(size=12)  # Define a small font for the form
         self.is_terminated = False  # Flag to track if the form is terminated
+        self.has_create_rows = False  # Flag to track if a mixed batch contains any create actions
+        self.validation = None  # The latest background validation of the File Information form
+        self.pending_submit = None  # The submit waiting for its validation to finish, with that validation
+        self.speculation_job = None  # The scheduled start of a validation while the form is being filled in
+        self.progress_frame = None  # The progress indicator shown while a submit waits
 
     # region Widget Creation
     def create_entry_widget(self, frame, label, row, col, arr, var_type=tk.StringVar):
@@ -275,6 +430,8 @@ class BaseForm:
         var = var_type()
         entry = ttk.Entry(frame, textvariable=var)
         entry.grid(row=row, column=col + 1, padx=(0, 10), pady=7, sticky='ew')
+        if arr is self.file_widgets:
+            var.trace_add("write", lambda *_: self.schedule_validation())
 
         arr.append((label, var))
 
@@ -301,7 +458,7 @@ class BaseForm:
         entry = ttk.Entry(frame, textvariable=var)
         entry.grid(row=row, column=col + 1, padx=(0, 10), pady=7, sticky='ew')
 
-        browse_button = tk.Button(frame, text="Browse", command=lambda: browse_file(var))
+        browse_button = tk.Button(frame, text="Browse", command=lambda: browse_file(var, self.start_validation))
         browse_button.grid(row=row, column=col + 2, padx=(0, 10), pady=7, sticky='ew')
 
         arr.append((label, var))
@@ -361,6 +518,8 @@ class BaseForm:
         """
 
         if messagebox.askokcancel("Quit", "Do you want to quit the program?"):
+            if self.validation:
+                self.validation.cancel()
             self.is_terminated = True
             self.master.destroy()
             sys.exit()
@@ -385,10 +544,52 @@ class BaseForm:
         # To be implemented by subclasses
         pass
 
+    # region File Validation
+    def schedule_validation(self):
+        """
+        Starts validating the File Information form shortly after its fields stop changing, so the work is usually
+        done by the time the form is submitted
+
+        :return: None
+        """
+
+        # A submit that is still waiting checked values the form no longer holds, so it is given up
+        if self.pending_submit:
+            self.cancel_validation()
+        if self.speculation_job:
+            self.master.after_cancel(self.speculation_job)
+        self.speculation_job = self.master.after(500, self.start_validation)
+
+    def start_validation(self):
+        """
+        Validates the current values of the File Information form on a background thread, unless a validation of
+        these exact values (and of the same version of the workbook) is already running or done
+
+        :return: The validation of the current values
+        :rtype: FileValidation
+        """
+
+        if self.speculation_job:
+            self.master.after_cancel(self.speculation_job)
+            self.speculation_job = None
+
+        validation = FileValidation({label: var.get() for label, var in self.file_widgets}, self.validation)
+        if self.validation and self.validation.key == validation.key and not self.validation.cancelled.is_set():
+            return self.validation
+        if self.validation:
+            self.validation.cancel()
+        self.validation = validation.start()
+        return validation
+
     def submit_file_data(self, target_dict, operation_type):
         """
         Validates data collected from the File Information form and creates the Label Information form if operation_type
-        isn't DELETE.
+        isn't DELETE. Every issue found in the form and the selected range is listed in a single validation report.
+
+        The workbook is read on a background thread while a progress indicator is shown, so the form stays
+        responsive and the check can be cancelled. Results of a validation started while the form was being filled
+        in are used as they are when the values have not changed since. Changing a field while the submit waits
+        cancels the submit.
 
         :param target_dict: The dictionary containing all the data collected from the File Information form
         :type target_dict: dict
@@ -397,71 +598,104 @@ class BaseForm:
         :return: None
         """
 
+        if self.pending_submit:
+            return  # Already waiting for the validation of this form
+
         for label, var in self.file_widgets:
             if var.get().strip() == "":
                 messagebox.showerror("Error", "There are missing fields in the current form")
                 return
-            target_dict[label] = var.get()
 
-        # Validate the user-inputted Excel file
-        if not validate_file_location(target_dict["Input File"]):
-            messagebox.showerror("Error", "Invalid file input")
-            return
+        validation = self.start_validation()
+        self.pending_submit = (target_dict, operation_type, validation)
+        if validation.done:
+            self.finish_file_validation(validation)
+        else:
+            self.show_progress()
+            self.master.after(100, self.poll_validation)
 
-        # Validate that the file is not open
-        if is_file_open(target_dict["Input File"]):
-            messagebox.showerror("Error", "Excel file is currently open. Please close it and try again")
-            return
+    def poll_validation(self):
+        """
+        Updates the progress indicator and finishes the submit once the validation is done
 
-        # Validate that the sheet is within the user-inputted Excel file
-        if sheet_exists(target_dict["Input File"], target_dict["Sheet Name"]):
-            sheet_index = get_sheet_index(target_dict["Input File"], target_dict["Sheet Name"])
+        :return: None
+        """
 
-            # Replace 'Sheet Name' with 'Sheet Index' for simplicity
-            target_dict["Sheet Index"] = target_dict.pop("Sheet Name")
-            target_dict["Sheet Index"] = sheet_index
-        else:
-            messagebox.showerror("Error", "Invalid sheet name")
+        if not self.pending_submit or self.is_terminated or not self.master.winfo_exists():
             return
-
-        # Validate Column Letters
-        if not is_valid_column(target_dict["Part Column Letter"]):
-            messagebox.showerror("Error", "Invalid part column letter")
+        validation = self.pending_submit[2]
+        if validation.done:
+            self.hide_progress()
+            self.finish_file_validation(validation)
             return
-        if "Description Column Letter" in target_dict:
-            if target_dict["Description Column Letter"] != target_dict["Part Column Letter"]:
-                if not is_valid_column(target_dict["Description Column Letter"]):
-                    messagebox.showerror("Error", "Invalid description column letter")
-                    return
-            else:
-                messagebox.showerror("Error", "Invalid description column letter")
-                return
 
-        # Validate row order
-        is_valid, message = is_valid_row_combo(target_dict["First Row"], target_dict["Last Row"])
-        if not is_valid:
-            messagebox.showerror("Error", message)
-            return
+        if validation.total_rows:
+            self.progress_bar.stop()
+            self.progress_bar.configure(mode="determinate", maximum=validation.total_rows,
+                                        value=validation.rows_read)
+            self.progress_label.configure(text=f"{validation.status} {validation.rows_read} of "
+                                               f"{validation.total_rows}")
+        else:
+            self.progress_label.configure(text=validation.status)
+        self.master.after(100, self.poll_validation)
+
+    def cancel_validation(self):
+        """
+        Stops the validation a submit is waiting for and gives the form back to the user
+
+        :return: None
+        """
+
+        if self.pending_submit:
+            self.pending_submit[2].cancel()
+        self.pending_submit = None
+        self.hide_progress()
+
+    def show_progress(self):
+        self.progress_frame = ttk.Frame(self.master, padding=(10, 0, 10, 10))
+        self.progress_frame.grid(row=1, column=0, sticky=(tk.W, tk.E))
+        self.progress_frame.columnconfigure(1, weight=1)
+        self.progress_label = ttk.Label(self.progress_frame, text="Validating...", width=26, anchor='w')
+        self.progress_label.grid(row=0, column=0, padx=(0, 10), sticky='w')
+        self.progress_bar = ttk.Progressbar(self.progress_frame, mode="indeterminate", length=160)
+        self.progress_bar.grid(row=0, column=1, padx=(0, 10), sticky='ew')
+        self.progress_bar.start(15)
+        tk.Button(self.progress_frame, text="Cancel", command=self.cancel_validation).grid(row=0, column=2)
+
+    def hide_progress(self):
+        if self.progress_frame:
+            self.progress_frame.destroy()
+            self.progress_frame = None
+
+    def finish_file_validation(self, validation):
+        """
+        Shows the issues a finished validation found, or moves on to the Label Information form (or closes the form
+        for a DELETE operation) when there are none
+
+        :param validation: The finished validation of the submitted values
+        :type validation: FileValidation
+        :return: None
+        """
+
+        target_dict, operation_type, _ = self.pending_submit
+        self.pending_submit = None
 
-        # Validate that each column has no empty cells
-        empty_rows = check_empty_rows(target_dict['Input File'], target_dict['Sheet Index'],
-                                      target_dict['Part Column Letter'], int(target_dict['First Row']),
-                                      int(target_dict['Last Row']))
-        if len(empty_rows) > 0:
-            messagebox.showerror("Error", f"There are empty cells in column "
-                                          f"{target_dict['Part Column Letter']}. Please remove them and try again.")
+        issues = validation.issues
+        if validation.error:
+            issues = [{"Row": None, "Column": "", "Issue": f"The workbook could not be read ({validation.error})"}]
+        elif validation.rows is not None:
+            # Check every row of the range the validation read
+            issues = validate_rows(validation.rows, validation.file_data, operation_type.name)
+            self.has_create_rows = any(row.get("Action") == "CREATE" for row in validation.rows)
+
+        if issues:
+            show_validation_report(self.master, issues)
             return
 
-        if 'Description Column Letter' in target_dict:
-            empty_rows.clear()
-            empty_rows = check_empty_rows(target_dict['Input File'], target_dict['Sheet Index'],
-                                          target_dict['Description Column Letter'], int(target_dict['First Row']),
-                                          int(target_dict['Last Row']))
-            if len(empty_rows) > 0:
-                messagebox.showerror("Error", f"There are empty cells in column "
-                                              f"{target_dict['Description Column Letter']}. "
-                                              f"Please remove them and try again.")
-                return
+        target_dict.update(validation.file_data)
+        # Replace 'Sheet Name' with 'Sheet Index' for simplicity
+        target_dict.pop("Sheet Name")
+        target_dict["Sheet Index"] = validation.sheet_index
 
         # Verify the current subclass isn't DeleteForm
         class_name = type(self).__name__
@@ -471,6 +705,8 @@ class BaseForm:
             # Close the current form
             self.master.destroy()
 
+    # endregion
+
     def submit_label_data(self, target_dict, operation_type):
         """
         Validates data collected from the Label Information form and terminates the self.master form
@@ -483,7 +719,7 @@ class BaseForm:
         """
 
         is_create_operation = False  # Variable that checks for the CREATE operation type
-        if operation_type.name == "CREATE":
+        if operation_type.name in ("CREATE", "UPSERT") or (operation_type.name == "MIXED" and self.has_create_rows):
             is_create_operation = True
 
         empty_fields = 0  # Variable that counts the amount of total empty fields
@@ -496,7 +732,8 @@ class BaseForm:
             if var.get() == "":
                 empty_dropdown_fields += 1
 
-            target_dict[label] = var.get()
+            # Required fields are labelled with a trailing '*', which is not part of the key the operations read
+            target_dict[label.rstrip("*")] = var.get()
 
         # Check for empty dropdown fields in case of user creating
         if is_create_operation and empty_dropdown_fields > 0:
@@ -504,6 +741,14 @@ class BaseForm:
                                                 " fields")
             return
 
+        # Reject values Epicor no longer accepts (e.g. a retired group) before the batch starts
+        invalid_values = catalog.invalid_values(target_dict)
+        if invalid_values:
+            messagebox.showerror("Input Error", "These values are no longer available in Epicor:\n" +
+                                 "\n".join(f"{field}: {value}" for field, value in invalid_values) +
+                                 "\nPlease choose them again from the refreshed lists.")
+            return
+
         # In the case of user overwriting with no inputs, ask for confirmation
         if empty_fields == len(target_dict):
             if not messagebox.askyesno("Warning", "You haven't made any changes. "
@@ -559,17 +804,17 @@ class CreateForm(BaseForm):
         self.second_frame = ttk.Frame(self.master, padding="10")
         self.second_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
 
-        self.create_dropdown_widget(self.second_frame, "Type*", 13, TYPE_OPTIONS,
+        self.create_dropdown_widget(self.second_frame, "Type*", 13, catalog.options("Type"),
                                     0, 0, self.label_widgets)
-        self.create_dropdown_widget(self.second_frame, "On Hold Reason*", 28, ON_HOLD_REASON_OPTIONS,
+        self.create_dropdown_widget(self.second_frame, "On Hold Reason*", 28, catalog.options("On Hold Reason"),
                                     5, 0, self.label_widgets)
-        self.create_dropdown_widget(self.second_frame, "Group*", 28, GROUP_OPTIONS,
+        self.create_dropdown_widget(self.second_frame, "Group*", 28, catalog.options("Group"),
                                     1, 0, self.label_widgets)
-        self.create_dropdown_widget(self.second_frame, "Class*", 28, CLASS_OPTIONS,
+        self.create_dropdown_widget(self.second_frame, "Class*", 28, catalog.options("Class"),
                                     2, 0, self.label_widgets)
-        self.create_dropdown_widget(self.second_frame, "Label Group*", 28, LABEL_GROUP_OPTIONS,
+        self.create_dropdown_widget(self.second_frame, "Label Group*", 28, catalog.options("Label Group"),
                                     3, 0, self.label_widgets)
-        self.create_dropdown_widget(self.second_frame, "Reporting Group*", 28, REPORTING_GROUP_OPTIONS,
+        self.create_dropdown_widget(self.second_frame, "Reporting Group*", 28, catalog.options("Reporting Group"),
                                     4, 0, self.label_widgets)
         self.create_checkbox_widget(self.second_frame, "Priced Part", 0, 2, self.label_widgets)
         self.create_checkbox_widget(self.second_frame, "Salesforce Sync", 1, 2, self.label_widgets)
@@ -628,17 +873,17 @@ class OverwriteForm(BaseForm):
         self.second_frame = ttk.Frame(self.master, padding="10")
         self.second_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
 
-        self.create_dropdown_widget(self.second_frame, "Type", 13, TYPE_OPTIONS,
+        self.create_dropdown_widget(self.second_frame, "Type", 13, catalog.options("Type"),
                                     0, 0, self.label_widgets)
-        self.create_dropdown_widget(self.second_frame, "On Hold Reason", 28, ON_HOLD_REASON_OPTIONS,
+        self.create_dropdown_widget(self.second_frame, "On Hold Reason", 28, catalog.options("On Hold Reason"),
                                     5, 0, self.label_widgets)
-        self.create_dropdown_widget(self.second_frame, "Group", 28, GROUP_OPTIONS,
+        self.create_dropdown_widget(self.second_frame, "Group", 28, catalog.options("Group"),
                                     1, 0, self.label_widgets)
-        self.create_dropdown_widget(self.second_frame, "Class", 28, CLASS_OPTIONS,
+        self.create_dropdown_widget(self.second_frame, "Class", 28, catalog.options("Class"),
                                     2, 0, self.label_widgets)
-        self.create_dropdown_widget(self.second_frame, "Label Group", 28, LABEL_GROUP_OPTIONS,
+        self.create_dropdown_widget(self.second_frame, "Label Group", 28, catalog.options("Label Group"),
                                     3, 0, self.label_widgets)
-        self.create_dropdown_widget(self.second_frame, "Reporting Group", 28, REPORTING_GROUP_OPTIONS,
+        self.create_dropdown_widget(self.second_frame, "Reporting Group", 28, catalog.options("Reporting Group"),
                                     4, 0, self.label_widgets)
 
         self.create_checkbox_widget(self.second_frame, "Priced Part", 0, 2, self.label_widgets)
@@ -677,3 +922,102 @@ class DeleteForm(BaseForm):
         self.create_entry_widget(self.first_frame, "Last Row", 4, 0, self.file_widgets)
         tk.Button(self.first_frame, text="Submit", command=lambda: self.submit_file_data(self.file_data, operation_type)
                   ).grid(row=4, column=2, padx=(0, 10), pady=7)
+
+
+class UpsertForm(CreateForm):
+
+    # Build custom File Form
+    def create_file_form(self, operation_type):
+        """
+        Creates the File Information form using the UPSERT operation type. The fields match the CREATE form since new
+        parts need their descriptions.
+
+        :param operation_type: The specific operation type (OperationType.Create, OperationType.OVERWRITE,
+        OperationType.DELETE, or OperationType.UPSERT)
+        :return: None
+        """
+
+        super().create_file_form(operation_type)
+        self.master.title("File Information - Upsert")
+
+    # Build custom Label Form
+    def create_label_form(self, operation_type):
+        """
+        Creates the Label Information form using the UPSERT operation type. Every dropdown is required since each
+        part may end up being created.
+
+        :param operation_type: The specific operation type (OperationType.Create, OperationType.OVERWRITE,
+        OperationType.DELETE, or OperationType.UPSERT)
+        :return: None
+        """
+
+        super().create_label_form(operation_type)
+        self.master.title("Label Information - Upsert")
+
+
+class MixedForm(BaseForm):
+
+    # Build custom File Form
+    def create_file_form(self, operation_type):
+        """
+        Creates the File Information form using the MIXED operation type and links the form data to
+        self.submit_file_data
+
+        :param operation_type: The specific operation type (OperationType.Create, OperationType.OVERWRITE,
+        OperationType.DELETE, or OperationType.MIXED)
+        :return: None
+        """
+
+        self.master.title("File Information - Mixed")
+        self.master.minsize(420, 280)
+        self.first_frame = ttk.Frame(self.master, padding="10")
+        self.first_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+        self.create_file_widget(self.first_frame, "Input File", 0, 0, self.file_widgets)
+        self.create_entry_widget(self.first_frame, "Sheet Name", 1, 0, self.file_widgets)
+        self.create_entry_widget(self.first_frame, "Part Column Letter", 2, 0, self.file_widgets)
+        self.create_entry_widget(self.first_frame, "Description Column Letter", 3, 0, self.file_widgets)
+        self.create_entry_widget(self.first_frame, "Action Column Letter", 4, 0, self.file_widgets)
+        self.create_entry_widget(self.first_frame, "First Row", 5, 0, self.file_widgets)
+        self.create_entry_widget(self.first_frame, "Last Row", 6, 0, self.file_widgets)
+        tk.Button(self.first_frame, text="Submit", command=lambda: self.submit_file_data(self.file_data, operation_type)
+                  ).grid(row=6, column=2, padx=(0, 10), pady=7)
+
+    # Build custom Label Form
+    def create_label_form(self, operation_type):
+        """
+        Creates the Label Information form using the MIXED operation type and links the form data to
+        self.submit_label_data. Every dropdown is required when the batch contains create actions.
+
+        :param operation_type: The specific operation type (OperationType.Create, OperationType.OVERWRITE,
+        OperationType.DELETE, or OperationType.MIXED)
+        :return: None
+        """
+
+        self.master.title("Label Information - Mixed")
+        self.second_frame = ttk.Frame(self.master, padding="10")
+        self.second_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+        required = "*" if self.has_create_rows else ""
+        self.create_dropdown_widget(self.second_frame, "Type" + required, 13, catalog.options("Type"),
+                                    0, 0, self.label_widgets)
+        self.create_dropdown_widget(self.second_frame, "On Hold Reason" + required, 28,
+                                    catalog.options("On Hold Reason"), 5, 0, self.label_widgets)
+        self.create_dropdown_widget(self.second_frame, "Group" + required, 28, catalog.options("Group"),
+                                    1, 0, self.label_widgets)
+        self.create_dropdown_widget(self.second_frame, "Class" + required, 28, catalog.options("Class"),
+                                    2, 0, self.label_widgets)
+        self.create_dropdown_widget(self.second_frame, "Label Group" + required, 28, catalog.options("Label Group"),
+                                    3, 0, self.label_widgets)
+        self.create_dropdown_widget(self.second_frame, "Reporting Group" + required, 28,
+                                    catalog.options("Reporting Group"), 4, 0, self.label_widgets)
+
+        self.create_checkbox_widget(self.second_frame, "Priced Part", 0, 2, self.label_widgets)
+        self.create_checkbox_widget(self.second_frame, "Salesforce Sync", 1, 2, self.label_widgets)
+        self.create_checkbox_widget(self.second_frame, "Catalog Part", 2, 2, self.label_widgets)
+        if required:
+            tk.Label(self.second_frame, text="* = required field").grid(row=6, column=1)
+
+        tk.Button(self.second_frame, text="Submit",
+                  command=lambda: self.submit_label_data(self.label_data, operation_type)).grid(row=5, column=2,
+                                                                                                padx=(0, 10), pady=7)
@@ -0,0 +1,273 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from batch_job import load_job, load_job_settings, prepare_job, warm_worker
+from erp_manager import get_operation_logger
+from notifications import RunSummary
+from option_catalog import catalog
+from ui_driver import current_driver
+from telemetry import telemetry
+from datetime import datetime
+import settings
+import shutil
+import json
+import time
+import glob
+import os
+
+
+WORKBOOK_EXTENSIONS = (".xlsx", ".xlsm")
+
+
+class HotFolder:
+    def __init__(self, inbox, erp_manager, poll_interval=5, settle_seconds=10):
+        """
+        Initializes the HotFolder class instance, a long-running service that runs every job dropped into an inbox
+        folder over one warm process: the imports, the UI driver and its Part Maintenance connection, the option
+        catalog, and the job validation workers are set up once instead of once per job.
+
+        A job is a job file (<name>.json, in the format batch_job.load_job reads) with its workbooks next to it.
+        Entries that name no 'Input File' use the workbook of the same name (<name>.xlsx), so a single workbook with
+        a small sidecar is a complete job. An optional 'Settings' object overrides batch_job.JOB_SETTINGS for that
+        job alone.
+
+        Each job gets its own operations log, event file, summary, and report. When it ends, its inputs and these
+        files are moved to done/<job id> or, if it could not run or any row did not complete, to failed/<job id>.
+
+        :param inbox: The folder watched for job files
+        :type inbox: str
+        :param erp_manager: An instance of the ERPManager class
+        :param poll_interval: The number of seconds between two looks at the inbox
+        :type poll_interval: float
+        :param settle_seconds: The number of seconds a job's files must stay unchanged before it is picked up, so a
+        job is never started while it is still being copied in
+        :type settle_seconds: float
+        """
+
+        self.inbox = os.path.abspath(inbox)
+        self.erp_manager = erp_manager
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.done_folder = os.path.join(self.inbox, "done")
+        self.failed_folder = os.path.join(self.inbox, "failed")
+        self.running_folder = os.path.join(self.inbox, "running")
+        for folder in (self.done_folder, self.failed_folder, self.running_folder):
+            os.makedirs(folder, exist_ok=True)
+        self.executor = None
+
+    def serve_forever(self, stop=None):
+        """
+        Warms the session up, then runs the jobs of the inbox as they arrive, oldest first
+
+        :param stop: An event that ends the service once set. Defaults to running until interrupted.
+        :type stop: threading.Event
+        :return: None
+        """
+
+        self.warm_up()
+        telemetry.info(f"Watching {self.inbox} for jobs", step="hot_folder", outcome="watching")
+        try:
+            while not (stop and stop.is_set()):
+                for job_path in self.ready_jobs():
+                    self.run_job(job_path)
+                    if stop and stop.is_set():
+                        break
+                if stop:
+                    stop.wait(self.poll_interval)
+                else:
+                    time.sleep(self.poll_interval)
+        finally:
+            if self.executor:
+                self.executor.shutdown()
+
+    def warm_up(self):
+        """
+        Loads the option catalog, starts the job validation workers, and connects to Part Maintenance, so the first
+        job starts as fast as every later one. Epicor not running yet is only a warning; every job connects again.
+
+        :return: None
+        """
+
+        catalog.wait_for_refresh(timeout=60)
+        self._start_executor()
+        if settings.BULK_IMPORT_DIRECTORY:
+            return
+        driver = current_driver()
+        try:
+            driver.connect(title="Part Maintenance")
+            telemetry.info("Connection to Part Maintenance achieved!", step="hot_folder", outcome="warm")
+        except (driver.ElementNotFoundError, driver.TimeoutError) as e:
+            telemetry.warning(f"Part Maintenance is not available yet: {e}", step="hot_folder", outcome="cold")
+
+    def ready_jobs(self):
+        """
+        Lists the job files of the inbox whose files have settled, oldest first
+
+        :return: The paths of the job files
+        :rtype: list
+        """
+
+        now = time.time()
+        ready = []
+        for job_path in glob.glob(os.path.join(self.inbox, "*.json")):
+            try:
+                changed = max(os.path.getmtime(path) for path in [job_path] + self._sibling_workbooks(job_path))
+            except OSError:
+                continue  # Moved away while looking
+            if now - changed >= self.settle_seconds:
+                ready.append((changed, job_path))
+        return [job_path for _, job_path in sorted(ready)]
+
+    def run_job(self, job_path):
+        """
+        Runs one job and files it with its logs under done or failed
+
+        :param job_path: The path of the job file in the inbox
+        :type job_path: str
+        :return: True if the job ran and every row completed
+        :rtype: bool
+        """
+
+        name = os.path.splitext(os.path.basename(job_path))[0]
+        job_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{name}"
+        job_folder = os.path.join(self.running_folder, job_id)
+        self._move_inputs(job_path, job_folder)
+
+        job_file = os.path.join(job_folder, os.path.basename(job_path))
+        succeeded, error, files = run_isolated_job(self.erp_manager, job_id, lambda: self.load(job_file),
+                                                   self._prepare)
+        for path in files:
+            shutil.move(path, os.path.join(job_folder, os.path.basename(path)))
+        destination = os.path.join(self.done_folder if succeeded else self.failed_folder, job_id)
+        self._file_job(job_folder, destination, error)
+        telemetry.info(f"Job {name} filed under {destination}", step="hot_folder", outcome="filed")
+        return succeeded
+
+    def load(self, job_path):
+        """
+        Reads a job file and its job settings
+
+        :param job_path: The path of the job file
+        :type job_path: str
+        :raises ValueError: If the job file overrides a setting that is not in JOB_SETTINGS
+        :return: A tuple of the settings to override and the job entries
+        :rtype: tuple
+        """
+
+        job_settings = load_job_settings(job_path)
+        entries = load_job(job_path)
+        workbooks = self._sibling_workbooks(job_path)
+        for entry in entries:
+            if not entry.get("Input File") and workbooks:
+                entry["Input File"] = workbooks[0]
+        return job_settings, entries
+
+    def _prepare(self, entries):
+        try:
+            return prepare_job(entries, executor=self.executor)
+        except BrokenProcessPool:
+            # A worker died (e.g. on a corrupt workbook); the next job gets a fresh pool
+            self._start_executor()
+            raise
+
+    def _start_executor(self):
+        if self.executor:
+            self.executor.shutdown(wait=False)
+        workers = os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        # Start the workers now, so their imports are paid before the first job rather than during it
+        list(self.executor.map(warm_worker, range(workers)))
+
+    @staticmethod
+    def _sibling_workbooks(job_path):
+        stem = os.path.splitext(job_path)[0]
+        return [stem + extension for extension in WORKBOOK_EXTENSIONS if os.path.exists(stem + extension)]
+
+    def _move_inputs(self, job_path, job_folder):
+        # Files are moved out of the inbox before the job starts, so it is never picked up twice. Workbooks the job
+        # names by a relative path move along and keep that path, so it still resolves against the job file.
+        inputs = [job_path] + self._sibling_workbooks(job_path)
+        try:
+            with open(job_path, "r", encoding="utf-8") as job_file:
+                entries = json.load(job_file).get("entries", [])
+            inputs += [os.path.join(self.inbox, entry["Input File"]) for entry in entries
+                       if entry.get("Input File") and not os.path.isabs(entry["Input File"])]
+        except (OSError, ValueError, AttributeError, TypeError):
+            pass  # The job fails when it is loaded, with the reason
+
+        for path in dict.fromkeys(os.path.normpath(path) for path in inputs):
+            relative_path = os.path.relpath(path, self.inbox)
+            if relative_path.startswith(os.pardir) or not os.path.isfile(path):
+                continue
+            os.makedirs(os.path.dirname(os.path.join(job_folder, relative_path)), exist_ok=True)
+            shutil.move(path, os.path.join(job_folder, relative_path))
+
+    @staticmethod
+    def _file_job(job_folder, destination, error):
+        if error:
+            with open(os.path.join(job_folder, "error.txt"), "w", encoding="utf-8") as error_file:
+                error_file.write(error + "\n")
+        shutil.move(job_folder, destination)
+
+
+def run_isolated_job(erp_manager, job_id, load, prepare=prepare_job):
+    """
+    Runs one job of a long-lived process with its own operations log, event file, summary, and report, all named
+    after the job, then switches back to the files the process used before. Nothing the job does ends the process.
+
+    :param erp_manager: An instance of the ERPManager class
+    :param job_id: The identifier of the job, used as its run id and in the names of its files
+    :type job_id: str
+    :param load: A callable returning the settings the job overrides and its entries. It is called within the job,
+    so a job that cannot be loaded fails like any other.
+    :param prepare: A callable validating the entries and reading their rows, like batch_job.prepare_job
+    :return: A tuple of whether the job ran and every row completed, the reason it could not run (or None), and the
+    paths of the files it wrote in the working folder
+    :rtype: tuple
+    """
+
+    operation_logger = get_operation_logger()
+    process_run_id, process_log = telemetry.run_id, operation_logger.filename
+    telemetry.start_run(job_id)
+    operation_logger.start_log(f"operations_log_{job_id}.xlsx")
+    summary = RunSummary(job_id)
+    telemetry.add_sink(summary)
+    telemetry.separator(f"Job {job_id}")
+    started = time.perf_counter()
+    error = None
+    saved_settings = {}
+    try:
+        job_settings, entries = load()
+        saved_settings = {key: getattr(settings, key) for key in job_settings}
+        for key, value in job_settings.items():
+            setattr(settings, key, value)
+
+        if catalog.is_stale():
+            catalog.wait_for_refresh(timeout=60)
+        job_entries = prepare(entries)
+        telemetry.info(f"Validated {len(job_entries)} job entries "
+                       f"({sum(len(entry['Rows']) for entry in job_entries)} rows)", step="validate_job")
+        erp_manager.perform_job(job_entries)
+    except SystemExit:
+        # A session that cannot reach Part Maintenance ends the program; a long-lived process outlives it
+        error = "Part Maintenance could not be reached"
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        for key, value in saved_settings.items():
+            setattr(settings, key, value)
+
+    operation_logger.flush()
+    telemetry.flush()
+    telemetry.remove_sink(summary)
+    succeeded = error is None and not summary.failed_rows and not summary.notifications
+    if error:
+        telemetry.error(f"Job {job_id} failed: {error}", step="job", outcome="failed")
+    duration = time.perf_counter() - started
+    telemetry.info(f"Job {job_id} {'done' if succeeded else 'failed'} in {duration:.1f} s", step="job",
+                   outcome="done" if succeeded else "failed", duration=round(duration, 4))
+
+    # The process's own files take over again, so the job's files are closed before anyone moves them
+    telemetry.start_run(process_run_id)
+    operation_logger.start_log(process_log)
+    # The operations log, the events, the summary, the report, and the profile of the job all carry its id
+    return succeeded, error, glob.glob(f"*{glob.escape(job_id)}*")
@@ -0,0 +1,131 @@
+from workbook_reader import ACTION_NAMES
+import numbers
+import datetime
+
+
+# Longest part number and description Epicor stores
+PART_NUMBER_MAX_LENGTH = 50
+DESCRIPTION_MAX_LENGTH = 1000
+
+# Characters Epicor does not accept in part numbers. Extend this to match the site's part numbering rules.
+PART_NUMBER_ILLEGAL_CHARACTERS = "\"'\\|"
+
+
+def validate_rows(rows, file_data, operation_name):
+    """
+    Checks every row of the selected range in a single pass and collects every issue instead of stopping at the
+    first one: empty cells, duplicate part numbers within the batch, part numbers and descriptions that are too long
+    or contain characters that cannot be typed or saved, numeric part numbers, and unknown actions.
+
+    :param rows: A list of row dictionaries as returned by read_part_rows
+    :type rows: list
+    :param file_data: A dictionary containing user data related to the file information form
+    :type file_data: dict
+    :param operation_name: The operation type name (CREATE, OVERWRITE, DELETE, MIXED, or UPSERT)
+    :type operation_name: str
+    :return: A list of issue dictionaries with 'Row', 'Column', and 'Issue' keys, in row order
+    :rtype: list
+    """
+
+    is_mixed = operation_name == "MIXED"
+    part_letter = file_data["Part Column Letter"]
+    description_letter = file_data.get("Description Column Letter")
+    action_letter = file_data.get("Action Column Letter")
+
+    issues = []
+    first_rows = {}  # The first row of every (part number, action) seen so far, to spot duplicates
+    for row in rows:
+        def add(letter, issue, row_number=row["Row"]):
+            issues.append({"Row": row_number, "Column": letter, "Issue": issue})
+
+        if is_mixed and row["Action"] not in ACTION_NAMES:
+            add(action_letter, "Missing action" if row["Action"] is None else
+                f"Unknown action '{row['Action']}' (use Create, Overwrite, or Delete)")
+
+        part_number = row["Part Number"]
+        if part_number is None or str(part_number).strip() == "":
+            add(part_letter, "Empty part number")
+        else:
+            for issue in part_number_issues(part_number):
+                add(part_letter, issue)
+
+            # A batch may only touch a part number twice through different actions of a mixed batch
+            key = (str(part_number).strip().upper(), row.get("Action") if is_mixed else None)
+            if key in first_rows:
+                add(part_letter, f"Duplicate of row {first_rows[key]}")
+            else:
+                first_rows[key] = row["Row"]
+
+        # Descriptions are only typed into Epicor when a part is created
+        if description_letter and (row.get("Action") == "CREATE" if is_mixed else True):
+            description = row["Description"]
+            if description is None or str(description).strip() == "":
+                add(description_letter, "Empty description")
+            else:
+                for issue in description_issues(description):
+                    add(description_letter, issue)
+
+    return issues
+
+
+def part_number_issues(part_number):
+    """
+    Lists the reasons a part number cannot be typed into Part Maintenance as it is
+
+    :param part_number: The cell value of the part number
+    :return: A list of issue messages
+    :rtype: list
+    """
+
+    if isinstance(part_number, bool) or isinstance(part_number, (datetime.date, datetime.time)):
+        return [f"Part number is stored as a {type(part_number).__name__}; format the column as Text"]
+    if isinstance(part_number, numbers.Number):
+        return [f"Part number {part_number} is stored as a number and would not be typed as written; "
+                f"format the column as Text"]
+
+    issues = []
+    if len(part_number) > PART_NUMBER_MAX_LENGTH:
+        issues.append(f"Part number is {len(part_number)} characters long (at most {PART_NUMBER_MAX_LENGTH})")
+    if part_number != part_number.strip():
+        issues.append("Part number has leading or trailing spaces")
+    elif " " in part_number:
+        issues.append("Part number contains spaces, which are dropped when it is typed")
+    illegal = sorted({character for character in part_number
+                      if character in PART_NUMBER_ILLEGAL_CHARACTERS or not character.isprintable()})
+    if illegal:
+        issues.append(f"Part number contains illegal characters: "
+                      f"{' '.join(repr(character) for character in illegal)}")
+    return issues
+
+
+def description_issues(description):
+    """
+    Lists the reasons a description cannot be typed into Part Maintenance as it is
+
+    :param description: The cell value of the description
+    :return: A list of issue messages
+    :rtype: list
+    """
+
+    description = str(description)
+    issues = []
+    if len(description) > DESCRIPTION_MAX_LENGTH:
+        issues.append(f"Description is {len(description)} characters long (at most {DESCRIPTION_MAX_LENGTH})")
+    illegal = sorted({character for character in description if not character.isprintable()})
+    if illegal:
+        issues.append(f"Description contains characters that cannot be typed (e.g. line breaks): "
+                      f"{' '.join(repr(character) for character in illegal)}")
+    return issues
+
+
+def format_issues(issues):
+    """
+    Formats issues as one line each, e.g. for the console or a job report
+
+    :param issues: Issue dictionaries as returned by validate_rows
+    :type issues: list
+    :return: A list of lines
+    :rtype: list
+    """
+    return [f"row {issue['Row']}, column {issue['Column']}: {issue['Issue']}" if issue["Row"] is not None
+            else issue["Issue"] for issue in issues]
@@ -0,0 +1,430 @@
+from batch_job import load_job, load_job_settings
+from datetime import datetime, timedelta
+from telemetry import telemetry
+import settings
+import argparse
+import getpass
+import threading
+import sqlite3
+import shutil
+import json
+import re
+import time
+import os
+
+
+QUEUE_FILENAME = "job_queue.db"
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Completed jobs whose throughput estimates how long the jobs still waiting will take
+THROUGHPUT_SAMPLE_JOBS = 20
+
+
+class JobQueue:
+    def __init__(self, filename=QUEUE_FILENAME):
+        """
+        Initializes the JobQueue class instance and the embedded database it keeps its jobs in.
+
+        Planners sharing the automation machine submit jobs from the GUI or the command line; one runner performs
+        them back to back. Jobs with a higher priority go first. Among jobs of equal priority, the submitter served
+        least recently goes first, so one planner's long list never starves the others. The queue is a file, so it
+        survives restarts of the runner and of the machine.
+
+        :param filename: The path to the queue database. Defaults to job_queue.db in the working folder.
+        :type filename: str
+        """
+
+        self.filename = filename
+        # Submitters and the runner are separate processes; a writer waits for the others instead of failing
+        self.connection = sqlite3.connect(filename, timeout=30, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                submitter TEXT NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL,
+                entries TEXT NOT NULL,
+                settings TEXT NOT NULL,
+                rows INTEGER NOT NULL,
+                submitted TEXT NOT NULL,
+                started TEXT,
+                finished TEXT,
+                error TEXT,
+                results TEXT,
+                heartbeat TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, priority, submitted);
+            CREATE INDEX IF NOT EXISTS idx_jobs_submitter ON jobs (submitter, started);
+        """)
+
+        # Queues created before the runner kept a lease on its job lack the column
+        columns = [column[1] for column in self.connection.execute("PRAGMA table_info(jobs)")]
+        if "heartbeat" not in columns:
+            self.connection.execute("ALTER TABLE jobs ADD COLUMN heartbeat TEXT")
+
+    def submit(self, job_path, submitter=None, priority=0):
+        """
+        Adds a job file to the queue. The entries are read now, with their input files resolved, so the job file
+        may be changed or removed once it is queued; the workbooks it names are read when the job runs.
+
+        :param job_path: The path to the job file
+        :type job_path: str
+        :param submitter: The name of the planner submitting the job. Defaults to the user logged in.
+        :type submitter: str
+        :param priority: Jobs with a higher priority run first
+        :type priority: int
+        :raises ValueError: If the job has no entries or overrides a setting a job cannot change
+        :return: The id of the job
+        :rtype: int
+        """
+
+        return self.submit_entries(load_job(job_path), os.path.splitext(os.path.basename(job_path))[0], submitter,
+                                   priority, load_job_settings(job_path))
+
+    def submit_entries(self, entries, name, submitter=None, priority=0, job_settings=None):
+        """
+        Adds a job to the queue
+
+        :param entries: The job entries, as returned by batch_job.load_job or built from the File Information and
+        Label Information forms
+        :type entries: list
+        :param name: A name for the job, shown in the queue
+        :type name: str
+        :param submitter: The name of the planner submitting the job. Defaults to the user logged in.
+        :type submitter: str
+        :param priority: Jobs with a higher priority run first
+        :type priority: int
+        :param job_settings: The settings the job overrides for itself, from batch_job.JOB_SETTINGS
+        :type job_settings: dict
+        :raises ValueError: If the job has no entries
+        :return: The id of the job
+        :rtype: int
+        """
+
+        if not entries:
+            raise ValueError("The job has no entries")
+        rows = sum(_entry_rows(entry) for entry in entries)
+        cursor = self.connection.execute(
+            "INSERT INTO jobs (name, submitter, priority, status, entries, settings, rows, submitted) "
+            "VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+            (name, submitter or getpass.getuser(), int(priority), json.dumps(entries, default=str),
+             json.dumps(job_settings or {}), rows, datetime.now().strftime(TIME_FORMAT))
+        )
+        return cursor.lastrowid
+
+    def cancel(self, job_id):
+        """
+        Removes a job that has not started yet from the queue
+
+        :param job_id: The id of the job
+        :type job_id: int
+        :return: True if the job was cancelled, False if it had already started or does not exist
+        :rtype: bool
+        """
+
+        cursor = self.connection.execute(
+            "UPDATE jobs SET status = 'cancelled', finished = ? WHERE id = ? AND status = 'queued'",
+            (datetime.now().strftime(TIME_FORMAT), job_id))
+        return cursor.rowcount == 1
+
+    def claim(self):
+        """
+        Takes the next job off the queue and marks it as running. The claim holds a lease on the job, which the
+        runner renews with heartbeats while it performs the job.
+
+        :return: The job, with its entries and settings parsed, or None if the queue is empty
+        :rtype: dict
+        """
+
+        # An immediate transaction keeps a second runner from claiming the same job
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            order = self._queue_order()
+            if not order:
+                self.connection.execute("COMMIT")
+                return None
+            job = order[0]
+            job["started"] = datetime.now().strftime(TIME_FORMAT)
+            self.connection.execute("UPDATE jobs SET status = 'running', started = ?, heartbeat = ? WHERE id = ?",
+                                    (job["started"], job["started"], job["id"]))
+            self.connection.execute("COMMIT")
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+
+        job["status"] = "running"
+        job["entries"] = json.loads(job["entries"])
+        job["settings"] = json.loads(job["settings"])
+        return job
+
+    def finish(self, job_id, succeeded, error=None, results=None):
+        """
+        Records how a job ended
+
+        :param job_id: The id of the job
+        :type job_id: int
+        :param succeeded: Whether the job ran and every row completed
+        :type succeeded: bool
+        :param error: The reason the job could not run
+        :type error: str
+        :param results: The folder holding the job's logs and reports
+        :type results: str
+        :return: None
+        """
+
+        self.connection.execute("UPDATE jobs SET status = ?, finished = ?, error = ?, results = ? WHERE id = ?",
+                                ("done" if succeeded else "failed", datetime.now().strftime(TIME_FORMAT), error,
+                                 results, job_id))
+
+    def recover(self):
+        """
+        Puts back the jobs a runner was performing when it stopped (a crash, a reboot), i.e. the running jobs without
+        a heartbeat for settings.JOB_QUEUE_LEASE_SECONDS. A job whose runner is still alive keeps running. They run
+        again with SKIP_APPLIED_ROWS set, so the rows they already applied are skipped.
+
+        :return: The number of jobs put back
+        :rtype: int
+        """
+
+        expired = (datetime.now() - timedelta(seconds=settings.JOB_QUEUE_LEASE_SECONDS)).strftime(TIME_FORMAT)
+        lease_expired = "status = 'running' AND (heartbeat IS NULL OR heartbeat < ?)"
+        recovered = 0
+        for job in self._fetch(f"SELECT id, settings FROM jobs WHERE {lease_expired}", (expired,)):
+            job_settings = dict(json.loads(job["settings"]), SKIP_APPLIED_ROWS=True)
+            # The lease is checked again, in case the job finished or its runner came back in the meantime
+            cursor = self.connection.execute(
+                f"UPDATE jobs SET status = 'queued', started = NULL, heartbeat = NULL, settings = ? "
+                f"WHERE id = ? AND {lease_expired}", (json.dumps(job_settings), job["id"], expired))
+            if cursor.rowcount == 1:
+                recovered += 1
+                telemetry.warning(f"Job {job['id']} was interrupted and is queued again", step="job_queue",
+                                  outcome="recovered", job=job["id"])
+        return recovered
+
+    def heartbeat(self, job_id, stop, interval):
+        """
+        Renews the lease on a running job every interval seconds until stopped. It runs on a thread of its own beside
+        the job, with a connection of its own, since SQLite connections belong to the thread that opened them.
+
+        :param job_id: The id of the job
+        :type job_id: int
+        :param stop: An event that ends the heartbeat once set
+        :type stop: threading.Event
+        :param interval: The number of seconds between two heartbeats
+        :type interval: float
+        :return: None
+        """
+
+        connection = sqlite3.connect(self.filename, timeout=30, isolation_level=None)
+        try:
+            while not stop.wait(interval):
+                connection.execute("UPDATE jobs SET heartbeat = ? WHERE id = ? AND status = 'running'",
+                                   (datetime.now().strftime(TIME_FORMAT), job_id))
+        finally:
+            connection.close()
+
+    def depth(self):
+        """
+        :return: The number of jobs waiting to run
+        :rtype: int
+        """
+        return self.connection.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+    def listing(self):
+        """
+        Lists the running job and every waiting job in the order they will run, each with its position and an
+        estimate of when it will finish, based on the throughput of recently finished jobs
+
+        :return: A list of job dictionaries with 'position' and 'eta' keys added. Entries and settings are left out.
+        :rtype: list
+        """
+
+        rate = self.rows_per_minute()
+        now = datetime.now()
+        clock = now
+        jobs = []
+        for job in self._fetch("SELECT * FROM jobs WHERE status = 'running' ORDER BY started", ()):
+            elapsed = (now - datetime.strptime(job["started"], TIME_FORMAT)).total_seconds()
+            clock += timedelta(seconds=max(0.0, job["rows"] * 60 / rate - elapsed))
+            jobs.append(dict(job, position=0, eta=clock.strftime(TIME_FORMAT)))
+        for position, job in enumerate(self._queue_order(), 1):
+            clock += timedelta(seconds=job["rows"] * 60 / rate)
+            jobs.append(dict(job, position=position, eta=clock.strftime(TIME_FORMAT)))
+        for job in jobs:
+            del job["entries"], job["settings"]
+        return jobs
+
+    def status(self, job_id):
+        """
+        Looks up a job
+
+        :param job_id: The id of the job
+        :type job_id: int
+        :return: The job (with its position and estimated finish time while it is waiting or running), or None if
+        it does not exist
+        :rtype: dict
+        """
+
+        for job in self.listing():
+            if job["id"] == job_id:
+                return job
+        jobs = self._fetch("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        if not jobs:
+            return None
+        job = jobs[0]
+        del job["entries"], job["settings"]
+        return dict(job, position=None, eta=None)
+
+    def rows_per_minute(self):
+        """
+        Measures the throughput of the most recently finished jobs
+
+        :return: Rows per minute, or settings.JOB_QUEUE_DEFAULT_ROWS_PER_MINUTE before any job has finished
+        :rtype: float
+        """
+
+        finished = self._fetch("SELECT rows, started, finished FROM jobs WHERE status IN ('done', 'failed') "
+                               "AND started IS NOT NULL ORDER BY finished DESC LIMIT ?", (THROUGHPUT_SAMPLE_JOBS,))
+        rows = sum(job["rows"] for job in finished)
+        seconds = sum((datetime.strptime(job["finished"], TIME_FORMAT)
+                       - datetime.strptime(job["started"], TIME_FORMAT)).total_seconds() for job in finished)
+        if rows and seconds > 0:
+            return rows * 60 / seconds
+        return settings.JOB_QUEUE_DEFAULT_ROWS_PER_MINUTE
+
+    def serve(self, erp_manager, poll_interval=5, stop=None):
+        """
+        Runner loop: performs the queued jobs one after another over the same Part Maintenance session, and waits
+        for new ones when the queue is empty. Only one runner may drive Part Maintenance at a time. Each job's
+        operations log, events, summary, and report are moved to settings.JOB_QUEUE_RESULTS_DIRECTORY/<job id>.
+        Before each claim, jobs whose runner stopped without finishing them are queued again.
+
+        :param erp_manager: An instance of the ERPManager class
+        :param poll_interval: The number of seconds between two looks at an empty queue
+        :type poll_interval: float
+        :param stop: An event that ends the runner once set. Defaults to running until interrupted.
+        :type stop: threading.Event
+        :return: None
+        """
+
+        # Imported here so submitting a job or looking at the queue never opens an operations log
+        from hot_folder import run_isolated_job
+
+        telemetry.info(f"Running jobs from {os.path.abspath(self.filename)} ({self.depth()} waiting)",
+                       step="job_queue", outcome="serving")
+        while not (stop and stop.is_set()):
+            # A job interrupted shortly before this runner started still holds its lease for a while
+            self.recover()
+            job = self.claim()
+            if job is None:
+                if stop:
+                    stop.wait(poll_interval)
+                else:
+                    time.sleep(poll_interval)
+                continue
+
+            job_id = f"job{job['id']}_" + re.sub(r"[^\w.-]+", "_", job["name"])
+            telemetry.info(f"Starting job {job['id']} '{job['name']}' for {job['submitter']} "
+                           f"({job['rows']} rows, {self.depth()} waiting)", step="job_queue", outcome="started",
+                           job=job["id"])
+            beating = threading.Event()
+            heartbeat = threading.Thread(target=self.heartbeat, name="job-queue-heartbeat", daemon=True,
+                                         args=(job["id"], beating, settings.JOB_QUEUE_HEARTBEAT_INTERVAL))
+            heartbeat.start()
+            try:
+                succeeded, error, files = run_isolated_job(erp_manager, job_id,
+                                                           lambda: (job["settings"], job["entries"]))
+            finally:
+                beating.set()
+                heartbeat.join()
+            results = os.path.join(settings.JOB_QUEUE_RESULTS_DIRECTORY, job_id)
+            os.makedirs(results, exist_ok=True)
+            for path in files:
+                shutil.move(path, os.path.join(results, os.path.basename(path)))
+            self.finish(job["id"], succeeded, error, os.path.abspath(results))
+
+    def _queue_order(self):
+        # Replays the claims to come: the highest priority first, then the submitter served least recently, then
+        # the oldest submission. Every claim makes its submitter the most recently served.
+        waiting = self._fetch("SELECT * FROM jobs WHERE status = 'queued' ORDER BY submitted, id", ())
+        served = dict(self.connection.execute(
+            "SELECT submitter, MAX(started) FROM jobs WHERE started IS NOT NULL GROUP BY submitter").fetchall())
+        order = []
+        for turn in range(len(waiting)):
+            job = min(waiting, key=lambda candidate: (-candidate["priority"],
+                                                      served.get(candidate["submitter"]) or "",
+                                                      candidate["submitted"], candidate["id"]))
+            waiting.remove(job)
+            # Claims to come are later than every claim so far
+            served[job["submitter"]] = f"~{turn:09d}"
+            order.append(job)
+        return order
+
+    def _fetch(self, query, parameters):
+        cursor = self.connection.execute(query, parameters)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def close(self):
+        self.connection.close()
+
+
+def _entry_rows(entry):
+    try:
+        return max(0, int(entry["Last Row"]) - int(entry["First Row"]) + 1)
+    except (KeyError, TypeError, ValueError):
+        return 0
+
+
+def format_listing(jobs):
+    """
+    Formats the queue for the console
+
+    :param jobs: The jobs, as returned by JobQueue.listing
+    :type jobs: list
+    :return: The table
+    :rtype: str
+    """
+
+    lines = [f"{'#':>3} {'Id':>5} {'Status':<9} {'Priority':>8} {'Submitter':<14} {'Rows':>7} {'ETA':<20} Name"]
+    for job in jobs:
+        lines.append(f"{job['position']:>3} {job['id']:>5} {job['status']:<9} {job['priority']:>8} "
+                     f"{job['submitter'][:14]:<14} {job['rows']:>7} {job['eta'] or '-':<20} {job['name']}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Submit jobs to the shared job queue and look at it. "
+                                                 "Run the queue with main.py --run-queue.")
+    parser.add_argument("--queue", default=QUEUE_FILENAME, help=f"Queue database (default: {QUEUE_FILENAME})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    submit_parser = commands.add_parser("submit", help="Add a job file to the queue")
+    submit_parser.add_argument("job", help="The job file")
+    submit_parser.add_argument("--priority", type=int, default=0, help="Higher priorities run first (default: 0)")
+    submit_parser.add_argument("--submitter", help="Name shown in the queue (default: the user logged in)")
+    status_parser = commands.add_parser("status", help="Show the queue, or one job")
+    status_parser.add_argument("job_id", type=int, nargs="?", help="The id of a job")
+    cancel_parser = commands.add_parser("cancel", help="Remove a job that has not started yet")
+    cancel_parser.add_argument("job_id", type=int, help="The id of the job")
+    args = parser.parse_args()
+
+    job_queue = JobQueue(args.queue)
+    if args.command == "submit":
+        job_id = job_queue.submit(args.job, args.submitter, args.priority)
+        job = job_queue.status(job_id)
+        print(f"Queued job {job_id} at position {job['position']}, expected to finish around {job['eta']}")
+    elif args.command == "status" and args.job_id is not None:
+        job = job_queue.status(args.job_id)
+        if job is None:
+            raise SystemExit(f"No job {args.job_id}")
+        print("\n".join(f"{key}: {value}" for key, value in job.items()))
+    elif args.command == "status":
+        print(format_listing(job_queue.listing()))
+        print(f"{job_queue.depth()} waiting, {job_queue.rows_per_minute():.1f} rows per minute")
+    else:
+        if not job_queue.cancel(args.job_id):
+            raise SystemExit(f"Job {args.job_id} is not waiting in the queue")
+        print(f"Cancelled job {args.job_id}")
@@ -1,8 +1,100 @@
-from erp_manager import ERPManager, CreateOperation, OverwriteOperation, DeleteOperation
-from application import Application
+from batch_job import run_job
+from job_queue import JobQueue
+from snapshots import run_rollback
+from telemetry import telemetry
+from option_catalog import catalog
+import multiprocessing
+import argparse
+import settings
 
 
 if __name__ == "__main__":
+    # Allow the job validation workers to start from the frozen executable
+    multiprocessing.freeze_support()
+
+    # Imported here rather than at the top: the worker processes re-import this module when they start and must not
+    # load erp_manager
+    from erp_manager import ERPManager, CreateOperation, OverwriteOperation, DeleteOperation
+    from application import Application
+    from hot_folder import HotFolder
+
+    parser = argparse.ArgumentParser(description="PartCreator - ERP Automation Tool")
+    parser.add_argument("--job", help="Path to a job file listing several file/sheet/range entries to run "
+                                      "over a single Part Maintenance session")
+    parser.add_argument("--hot-folder", metavar="INBOX",
+                        help="Keep running and perform every job file dropped into this folder over one warm "
+                             "Part Maintenance session")
+    parser.add_argument("--run-queue", action="store_true",
+                        help="Keep running and perform the jobs submitted to the shared job queue one after another")
+    parser.add_argument("--rollback", metavar="RUN",
+                        help="Put every part a run overwrote or deleted back the way it was, from the snapshots the "
+                             "run took (RUN is its run id or operations log file)")
+    parser.add_argument("--skip-applied", action="store_true",
+                        help="Skip rows that were already applied by a previous run")
+    parser.add_argument("--verify-export", metavar="PATH",
+                        help="Part-master export to read back after the run to verify every applied value")
+    parser.add_argument("--verify-timeout", type=float,
+                        help="Seconds to wait for the part export to be refreshed after the run (default: 120)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Capture a CPU profile and heap snapshots of the run and write a report")
+    parser.add_argument("--rate", type=float, metavar="ROWS_PER_MINUTE",
+                        help="Pace the run at this many rows per minute, adapting to Epicor's response time")
+    parser.add_argument("--rate-latency", type=float, metavar="SECONDS",
+                        help="Row latency considered healthy by the pacing (default: the fastest seen)")
+    parser.add_argument("--record-trace", metavar="PATH",
+                        help="Record every UI call of the run to a trace file that ui_trace.py can replay")
+    parser.add_argument("--option-catalog", metavar="PATH",
+                        help="Export of the values Epicor accepts in each Label Information dropdown")
+    parser.add_argument("--unattended", action="store_true",
+                        help="Never stop for a message box: record errors against their row, keep going, and write "
+                             "a summary report at the end of the run")
+    parser.add_argument("--ui-worker", action="store_true",
+                        help="Drive Epicor from a separate worker process that is restarted on a hang and recycled "
+                             "every few hundred rows")
+    parser.add_argument("--bulk-import", metavar="DIRECTORY",
+                        help="Write the batch into import files for Epicor's import tool instead of typing it "
+                             "into Part Maintenance")
+    parser.add_argument("--background-input", action="store_true",
+                        help="Actuate Epicor's controls without the mouse or the keyboard focus, so Part Maintenance "
+                             "can stay in the background")
+    parser.add_argument("--no-report", action="store_true",
+                        help="Do not write the HTML run report with throughput and latency charts")
+    parser.add_argument("--snapshots", action="store_true",
+                        help="Keep the values overwrites and deletes replace, so the run can be rolled back with "
+                             "--rollback")
+    parser.add_argument("--canary", type=int, metavar="ROWS",
+                        help="Run the first ROWS rows as a canary and stop before the rest if any of them fails")
+    parser.add_argument("--confirm-canary", action="store_true",
+                        help="Ask before carrying on after a canary whose rows all completed")
+    parser.add_argument("--max-failure-rate", type=float, metavar="RATE",
+                        help="Stop the run once this share (0 to 1) of the recent rows failed")
+    parser.add_argument("--failure-action", choices=("pause", "abort"),
+                        help="Whether a failed canary or a high failure rate asks to carry on or aborts the run")
+    args = parser.parse_args()
+    settings.SKIP_APPLIED_ROWS = settings.SKIP_APPLIED_ROWS or args.skip_applied
+    settings.VERIFY_EXPORT_FILE = args.verify_export or settings.VERIFY_EXPORT_FILE
+    settings.VERIFY_EXPORT_TIMEOUT = args.verify_timeout or settings.VERIFY_EXPORT_TIMEOUT
+    settings.PROFILE_RUN = settings.PROFILE_RUN or args.profile
+    settings.RATE_TARGET_ROWS_PER_MINUTE = args.rate or settings.RATE_TARGET_ROWS_PER_MINUTE
+    settings.RATE_LATENCY_TARGET = args.rate_latency or settings.RATE_LATENCY_TARGET
+    settings.RECORD_TRACE_FILE = args.record_trace or settings.RECORD_TRACE_FILE
+    settings.OPTION_CATALOG_SOURCE = args.option_catalog or settings.OPTION_CATALOG_SOURCE
+    # Nobody watches the screen of the hot folder service or the queue runner
+    settings.UNATTENDED = settings.UNATTENDED or args.unattended or bool(args.hot_folder) or args.run_queue
+    settings.UI_WORKER = settings.UI_WORKER or args.ui_worker
+    settings.BULK_IMPORT_DIRECTORY = args.bulk_import or settings.BULK_IMPORT_DIRECTORY
+    settings.BACKGROUND_INPUT = settings.BACKGROUND_INPUT or args.background_input
+    settings.RUN_REPORT = settings.RUN_REPORT and not args.no_report
+    settings.SNAPSHOT_CHANGES = settings.SNAPSHOT_CHANGES or args.snapshots
+    settings.CANARY_ROWS = args.canary or settings.CANARY_ROWS
+    settings.CANARY_CONFIRM = settings.CANARY_CONFIRM or args.confirm_canary
+    settings.FAILURE_RATE_THRESHOLD = (settings.FAILURE_RATE_THRESHOLD if args.max_failure_rate is None
+                                       else args.max_failure_rate)
+    settings.FAILURE_RATE_ACTION = args.failure_action or settings.FAILURE_RATE_ACTION
+
+    # Bring the dropdown values up to date while the operation selection form is shown
+    catalog.refresh_in_background()
+
     try:
         # Start the program
         erp_manager = ERPManager(
@@ -10,15 +102,21 @@ if __name__ == "__main__":
             OverwriteOperation(),
             DeleteOperation()
         )
-        app = Application(erp_manager)
-        app.run()
+        if args.hot_folder:
+            HotFolder(args.hot_folder, erp_manager, settings.HOT_FOLDER_POLL_INTERVAL,
+                      settings.HOT_FOLDER_SETTLE_SECONDS).serve_forever()
+        elif args.rollback:
+            run_rollback(erp_manager, args.rollback)
+        elif args.run_queue:
+            JobQueue().serve(erp_manager, settings.HOT_FOLDER_POLL_INTERVAL)
+        elif args.job:
+            run_job(erp_manager, args.job)
+        else:
+            app = Application(erp_manager)
+            app.run()
     except Exception as e:
-        print(f"An error occurred: {e}")
+        telemetry.error(f"An error occurred: {e}", outcome=type(e).__name__)
     finally:
-        input("Press Enter to exit...")
-
-
-
-
-
-
+        telemetry.flush()
+        if not settings.UNATTENDED:
+            input("Press Enter to exit...")
@@ -0,0 +1,133 @@
+from collections import Counter
+from tkinter import messagebox
+from telemetry import telemetry, WARNING, ERROR
+import settings
+
+
+def notify(title, message, level=ERROR, **fields):
+    """
+    Tells the operator about something that happened during a run. In attended mode this is a message box; in
+    unattended mode the notification is recorded in the run telemetry and gathered into the end-of-run summary, so
+    nothing ever waits for a click.
+
+    :param title: The title of the notification
+    :type title: str
+    :param message: The text of the notification
+    :type message: str
+    :param level: The telemetry level (WARNING or ERROR show as an error box, anything lower as an info box)
+    :type level: int
+    :param fields: Structured fields for the telemetry event, e.g. outcome
+    :return: None
+    """
+
+    if settings.UNATTENDED:
+        telemetry.emit(level, f"{title}: {message}", step="notification", **fields)
+    elif level >= WARNING:
+        messagebox.showerror(title, message)
+    else:
+        messagebox.showinfo(title, message)
+
+
+def confirm(title, message, default=False, **fields):
+    """
+    Asks the operator whether the run should carry on. In unattended mode nobody is there to answer, so the default
+    is taken and recorded in the run telemetry.
+
+    :param title: The title of the question
+    :type title: str
+    :param message: The question
+    :type message: str
+    :param default: The answer taken in unattended mode
+    :type default: bool
+    :param fields: Structured fields for the telemetry event, e.g. outcome
+    :return: True if the run should carry on
+    :rtype: bool
+    """
+
+    if settings.UNATTENDED:
+        telemetry.info(f"{title}: {message} ({'yes' if default else 'no'}, unattended)", step="confirmation",
+                       **fields)
+        return default
+    answer = messagebox.askyesno(title, message)
+    telemetry.info(f"{title}: {message} ({'yes' if answer else 'no'})", step="confirmation", **fields)
+    return answer
+
+
+class RunSummary:
+    def __init__(self, run_id):
+        """
+        Initializes the RunSummary class instance, a telemetry sink that gathers the outcome of every row and every
+        notification and error of an unattended run into one report
+
+        :param run_id: The run identifier used to name the report file
+        :type run_id: str
+        """
+
+        self.run_id = run_id
+        self.started = None
+        self.finished = None
+        self.statuses = Counter()
+        self.failed_rows = []  # (row, part number, status) of every row that did not complete
+        self.notifications = []  # (time, row, part number, message) of every notification and error
+
+    def write(self, events):
+        """
+        Telemetry sink method: collects row outcomes, notifications, and errors
+
+        :param events: The events written by the run telemetry
+        :type events: list
+        :return: None
+        """
+
+        for event in events:
+            self.started = self.started or event["time"]
+            self.finished = event["time"]
+            step = event.get("step")
+            if step in ("row", "skip"):
+                status = "Skipped - already applied" if step == "skip" else event.get("outcome") or "Not logged"
+                self.statuses[status] += 1
+                if not status.startswith(("Completed", "Skipped")):
+                    self.failed_rows.append((event.get("row"), event.get("part_number"), status))
+            elif step == "notification" or event["level"] >= ERROR:
+                self.notifications.append((event["time"], event.get("row"), event.get("part_number"),
+                                           event["message"]))
+
+    def close(self):
+        pass
+
+    def report(self):
+        """
+        Builds the summary report
+
+        :return: The report
+        :rtype: str
+        """
+
+        lines = [f"Run {self.run_id}: {self.started} to {self.finished}",
+                 f"{sum(self.statuses.values())} rows processed", ""]
+        lines.append("Outcomes")
+        for status, count in self.statuses.most_common():
+            lines.append(f"  {count:>7}  {status}")
+        if self.failed_rows:
+            lines += ["", "Rows that did not complete"]
+            for row, part_number, status in self.failed_rows:
+                lines.append(f"  row {row}  {part_number}: {status}")
+        if self.notifications:
+            lines += ["", "Notifications"]
+            for event_time, row, part_number, message in self.notifications:
+                location = f" (row {row}, {part_number})" if row is not None else ""
+                lines.append(f"  {event_time}{location}: {message}")
+        return "\n".join(lines)
+
+    def save(self):
+        """
+        Writes the report to run_summary_<run id>.txt
+
+        :return: The path of the report
+        :rtype: str
+        """
+
+        report_path = f"run_summary_{self.run_id}.txt"
+        with open(report_path, "w", encoding="utf-8") as report_file:
+            report_file.write(self.report() + "\n")
+        return report_path
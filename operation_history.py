@@ -0,0 +1,332 @@
+from openpyxl import load_workbook
+import argparse
+import sqlite3
+import glob
+import os
+
+
+HISTORY_FILENAME = "operations_history.db"
+
+
+class OperationHistory:
+    def __init__(self, filename=HISTORY_FILENAME):
+        """
+        Initializes the OperationHistory class instance and the embedded database it writes to.
+
+        The database holds one record per logged operation across every run, indexed by part number, operation,
+        status, and timestamp, plus the list of operations log files that were already imported.
+
+        :param filename: The path to the history database. Defaults to operations_history.db in the working folder.
+        :type filename: str
+        """
+
+        self.filename = filename
+        self.connection = sqlite3.connect(filename)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS operations (
+                id INTEGER PRIMARY KEY,
+                operation TEXT NOT NULL,
+                part_number TEXT,
+                description TEXT,
+                status TEXT,
+                timestamp TEXT NOT NULL,
+                log_file TEXT,
+                fingerprint TEXT,
+                run_id TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_operations_part ON operations (part_number, timestamp);
+            CREATE INDEX IF NOT EXISTS idx_operations_operation ON operations (operation, timestamp);
+            CREATE INDEX IF NOT EXISTS idx_operations_status ON operations (status, timestamp);
+            CREATE INDEX IF NOT EXISTS idx_operations_timestamp ON operations (timestamp);
+            CREATE TABLE IF NOT EXISTS imported_logs (
+                log_file TEXT PRIMARY KEY
+            );
+        """)
+
+        # Databases created before payload fingerprints or run ids were recorded lack the columns
+        columns = [column[1] for column in self.connection.execute("PRAGMA table_info(operations)")]
+        if "fingerprint" not in columns:
+            self.connection.execute("ALTER TABLE operations ADD COLUMN fingerprint TEXT")
+        if "run_id" not in columns:
+            self.connection.execute("ALTER TABLE operations ADD COLUMN run_id TEXT")
+        self.connection.commit()
+
+    def record(self, operation, part_number, description, status, timestamp, log_file=None, fingerprint=None,
+               run_id=None):
+        """
+        Writes a single operation record into the history database
+
+        :param operation: The specific operation being performed
+        :type operation: str
+        :param part_number: The specific part number being logged
+        :param description: The specific description being logged
+        :param status: The status of the operation (Complete/Incomplete) and why
+        :param timestamp: The time of the operation formatted as '%Y-%m-%d %H:%M:%S'
+        :type timestamp: str
+        :param log_file: The name of the operations log file the record was also written to
+        :type log_file: str
+        :param fingerprint: The payload fingerprint of the row that produced the record
+        :type fingerprint: str
+        :param run_id: The id of the run that logged the record
+        :type run_id: str
+        :return: None
+        """
+
+        self.connection.execute(
+            "INSERT INTO operations (operation, part_number, description, status, timestamp, log_file, fingerprint, "
+            "run_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (operation, _text(part_number), _text(description), status, timestamp, log_file, fingerprint, run_id)
+        )
+        self.connection.commit()
+
+    def record_many(self, records):
+        """
+        Writes several operation records into the history database in a single transaction
+
+        :param records: Tuples of (operation, part number, description, status, timestamp, log file, fingerprint,
+        run id)
+        :type records: list
+        :return: None
+        """
+
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO operations (operation, part_number, description, status, timestamp, log_file, "
+                "fingerprint, run_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(operation, _text(part_number), _text(description), status, timestamp, log_file, fingerprint, run_id)
+                 for operation, part_number, description, status, timestamp, log_file, fingerprint, run_id in records]
+            )
+
+    def import_log_file(self, log_path):
+        """
+        Imports the records of an existing operations log file. A log file is only ever imported once, and logs
+        written since the history database existed are marked as imported when they are created.
+
+        :param log_path: The path to an operations_log_YYYYMMDD_HHMMSS.xlsx file
+        :type log_path: str
+        :return: The number of records imported (0 if the file was already imported)
+        :rtype: int
+        """
+
+        log_file = os.path.basename(log_path)
+        if self.connection.execute("SELECT 1 FROM imported_logs WHERE log_file = ?", (log_file,)).fetchone():
+            return 0
+
+        workbook = load_workbook(log_path, read_only=True, data_only=True)
+        try:
+            records = [
+                (operation, _text(part_number), _text(description), status, _text(timestamp), log_file)
+                for operation, part_number, description, status, timestamp, *_ in
+                workbook.active.iter_rows(min_row=2, values_only=True)
+                if operation is not None and timestamp is not None
+            ]
+        finally:
+            workbook.close()
+
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO operations (operation, part_number, description, status, timestamp, log_file) "
+                "VALUES (?, ?, ?, ?, ?, ?)", records
+            )
+            self.connection.execute("INSERT INTO imported_logs (log_file) VALUES (?)", (log_file,))
+
+        return len(records)
+
+    def import_log_folder(self, folder, skip=()):
+        """
+        Imports every operations log file in a folder that has not been imported yet
+
+        :param folder: The folder holding the operations log files
+        :type folder: str
+        :param skip: Log file names that should not be imported
+        :type skip: tuple
+        :return: The total number of records imported
+        :rtype: int
+        """
+
+        imported = 0
+        for log_path in sorted(glob.glob(os.path.join(folder, "operations_log_*.xlsx"))):
+            if os.path.basename(log_path) not in skip:
+                imported += self.import_log_file(log_path)
+        return imported
+
+    def mark_imported(self, log_file):
+        """
+        Records a log file as imported so the importer never reads records that were written to the database live
+
+        :param log_file: The name of the operations log file
+        :type log_file: str
+        :return: None
+        """
+
+        self.connection.execute("INSERT OR IGNORE INTO imported_logs (log_file) VALUES (?)",
+                                (os.path.basename(log_file),))
+        self.connection.commit()
+
+    def part_history(self, part_number, operation=None, status=None):
+        """
+        Looks up every record of a part number, newest first
+
+        :param part_number: The part number to look up
+        :param operation: Only return records of this operation (Create, Overwrite, Delete)
+        :type operation: str
+        :param status: Only return records whose status starts with this text (e.g. 'Completed')
+        :type status: str
+        :return: A list of record dictionaries
+        :rtype: list
+        """
+
+        query = "SELECT * FROM operations WHERE part_number = ?"
+        parameters = [_text(part_number)]
+        query, parameters = _add_filters(query, parameters, operation, status)
+        return self._fetch(query + " ORDER BY timestamp DESC, id DESC", parameters)
+
+    def last_operation(self, part_number, operation=None, status=None):
+        """
+        Looks up the most recent record of a part number, e.g. when it was last created or deleted
+
+        :param part_number: The part number to look up
+        :param operation: Only consider records of this operation (Create, Overwrite, Delete)
+        :type operation: str
+        :param status: Only consider records whose status starts with this text (e.g. 'Completed')
+        :type status: str
+        :return: The record dictionary, or None if the part was never logged
+        :rtype: dict
+        """
+
+        records = self.part_history(part_number, operation, status)
+        return records[0] if records else None
+
+    def latest_completed(self, part_numbers):
+        """
+        Looks up the most recent record of each part number in a single pass, for the part numbers whose most
+        recent record is a completed one. Records of rows skipped as already applied do not count, since they left the
+        part untouched.
+
+        :param part_numbers: The part numbers to look up
+        :type part_numbers: list
+        :return: A dictionary whose keys are part numbers and whose values are record dictionaries. Part numbers
+        that never completed an operation, or whose last operation did not complete, are left out.
+        :rtype: dict
+        """
+
+        part_numbers = list({_text(part_number) for part_number in part_numbers if part_number is not None})
+        latest = {}
+        # Stay well below SQLite's limit on query parameters
+        for start in range(0, len(part_numbers), 500):
+            chunk = part_numbers[start:start + 500]
+            records = self._fetch(
+                "SELECT * FROM (SELECT *, ROW_NUMBER() OVER (PARTITION BY part_number "
+                "ORDER BY timestamp DESC, id DESC) AS position FROM operations "
+                f"WHERE part_number IN ({', '.join('?' * len(chunk))}) AND status NOT LIKE 'Skipped%') "
+                "WHERE position = 1 AND status LIKE 'Completed%'", chunk
+            )
+            for record in records:
+                latest[record["part_number"]] = record
+        return latest
+
+    def between(self, start, end, operation=None, status=None):
+        """
+        Looks up every record logged within a time range, oldest first
+
+        :param start: The start of the range formatted as '%Y-%m-%d' or '%Y-%m-%d %H:%M:%S' (inclusive)
+        :type start: str
+        :param end: The end of the range formatted as '%Y-%m-%d' or '%Y-%m-%d %H:%M:%S' (inclusive). A bare date
+        covers that whole day.
+        :type end: str
+        :param operation: Only return records of this operation (Create, Overwrite, Delete)
+        :type operation: str
+        :param status: Only return records whose status starts with this text (e.g. 'Completed')
+        :type status: str
+        :return: A list of record dictionaries
+        :rtype: list
+        """
+
+        if len(end) == 10:
+            end += " 23:59:59"
+        query = "SELECT * FROM operations WHERE timestamp BETWEEN ? AND ?"
+        query, parameters = _add_filters(query, [start, end], operation, status)
+        return self._fetch(query + " ORDER BY timestamp, id", parameters)
+
+    def run_summaries(self, operations, before, limit=10):
+        """
+        Summarizes the most recent earlier runs of the given operations, one per run id, newest first. Records imported
+        from operations log files carry no run id and are summarized per log file instead. Rows skipped as already
+        applied are left out, since they cost no time, and so are the records of the verification pass, which
+        re-checks rows that were already counted.
+
+        :param operations: The operation names to summarize (e.g. Create and Overwrite for an upsert)
+        :type operations: list
+        :param before: Only consider records logged before this time, formatted as '%Y-%m-%d %H:%M:%S'
+        :type before: str
+        :param limit: The number of runs to return at most
+        :type limit: int
+        :return: A list of dictionaries with 'run' (the run id, or the log file of imported records), 'log_file',
+        'started', 'finished', 'rows', and 'completed' keys
+        :rtype: list
+        """
+
+        operations = list(operations)
+        if not operations:
+            return []
+        return self._fetch(
+            "SELECT COALESCE(run_id, log_file) AS run, MIN(log_file) AS log_file, MIN(timestamp) AS started, "
+            "MAX(timestamp) AS finished, COUNT(*) AS rows, SUM(status LIKE 'Completed%') AS completed FROM operations "
+            f"WHERE operation IN ({', '.join('?' * len(operations))}) AND timestamp < ? AND log_file IS NOT NULL "
+            "AND status NOT LIKE 'Skipped%' AND status NOT LIKE 'Verification failed%' "
+            "GROUP BY COALESCE(run_id, log_file) ORDER BY started DESC LIMIT ?",
+            operations + [before, limit]
+        )
+
+    def _fetch(self, query, parameters):
+        cursor = self.connection.execute(query, parameters)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, record)) for record in cursor.fetchall()]
+
+    def close(self):
+        """
+        Closes the history database
+
+        :return: None
+        """
+        self.connection.close()
+
+
+def _text(value):
+    return None if value is None else str(value)
+
+
+def _add_filters(query, parameters, operation, status):
+    if operation:
+        query += " AND operation = ?"
+        parameters.append(operation)
+    if status:
+        query += " AND status LIKE ?"
+        parameters.append(status + "%")
+    return query, parameters
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the operation history of every PartCreator run")
+    parser.add_argument("--database", default=HISTORY_FILENAME, help="Path to the history database")
+    parser.add_argument("--import-logs", metavar="FOLDER", help="Import every operations log file in a folder")
+    parser.add_argument("--part", help="Show the history of a part number")
+    parser.add_argument("--start", help="Show records from this date/time (YYYY-MM-DD [HH:MM:SS])")
+    parser.add_argument("--end", help="Show records up to this date/time (YYYY-MM-DD [HH:MM:SS])")
+    parser.add_argument("--operation", help="Only show this operation (Create, Overwrite, Delete)")
+    parser.add_argument("--status", help="Only show statuses starting with this text (e.g. Completed)")
+    args = parser.parse_args()
+
+    history = OperationHistory(args.database)
+    if args.import_logs:
+        print(f"Imported {history.import_log_folder(args.import_logs)} records")
+    results = []
+    if args.part:
+        results = history.part_history(args.part, args.operation, args.status)
+    elif args.start or args.end:
+        results = history.between(args.start or "0000-00-00", args.end or "9999-12-31", args.operation, args.status)
+    for result in results:
+        print(f"{result['timestamp']}  {result['operation']:<10} {str(result['part_number']):<20} {result['status']}")
+    history.close()
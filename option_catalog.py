@@ -0,0 +1,210 @@
+from combobox_options import (TYPE_OPTIONS, CLASS_OPTIONS, REPORTING_GROUP_OPTIONS,
+                              ON_HOLD_REASON_OPTIONS, GROUP_OPTIONS, LABEL_GROUP_OPTIONS)
+from openpyxl import load_workbook
+from telemetry import telemetry
+import threading
+import settings
+import json
+import time
+import csv
+import os
+
+
+# The hard-coded lists, used for every field the catalog export does not provide
+STATIC_OPTIONS = {
+    "Type": TYPE_OPTIONS,
+    "Group": GROUP_OPTIONS,
+    "Class": CLASS_OPTIONS,
+    "Label Group": LABEL_GROUP_OPTIONS,
+    "Reporting Group": REPORTING_GROUP_OPTIONS,
+    "On Hold Reason": ON_HOLD_REASON_OPTIONS
+}
+
+CACHE_FILENAME = "option_catalog.json"
+
+
+class OptionCatalog:
+    def __init__(self, cache_path=CACHE_FILENAME):
+        """
+        Initializes the OptionCatalog class instance, which serves the allowed values of every Label Information
+        dropdown.
+
+        Values come from an export of Epicor's code tables (settings.OPTION_CATALOG_SOURCE) and are cached on disk
+        for settings.OPTION_CATALOG_TTL seconds. A stale cache keeps being served while a background thread reads
+        the export again, and the hard-coded lists in combobox_options.py fill in for anything the cache lacks.
+
+        :param cache_path: The path of the on-disk cache
+        :type cache_path: str
+        """
+
+        self.cache_path = cache_path
+        self.lock = threading.Lock()
+        self.values = None  # Cached values by field, loaded from disk on first use
+        self.fetched = 0.0  # When the cached values were read from the export (time.time)
+        self.attempted = 0.0  # When the export was last read, successfully or not
+        self.refresher = None
+
+    # Seconds between two attempts to read an export that could not be read
+    RETRY_INTERVAL = 60
+
+    def options(self, field):
+        """
+        Lists the choices of a dropdown, starting with the empty choice
+
+        :param field: The Label Information field, e.g. 'Group'
+        :type field: str
+        :return: The list of choices
+        :rtype: list
+        """
+
+        self._load_cache()
+        if self.is_stale():
+            self.refresh_in_background()
+        with self.lock:
+            values = (self.values or {}).get(field)
+        if not values:
+            return list(STATIC_OPTIONS[field])
+        return [""] + values
+
+    def invalid_values(self, label_data):
+        """
+        Finds the label values Epicor no longer (or never did) accept, so a batch can be rejected before it starts
+
+        :param label_data: A dictionary containing user data related to the label information form
+        :type label_data: dict
+        :return: A list of (field, value) tuples
+        :rtype: list
+        """
+        return [(field, label_data[field]) for field in STATIC_OPTIONS
+                if label_data.get(field) and label_data[field] not in self.options(field)]
+
+    def is_stale(self):
+        now = time.time()
+        return (bool(settings.OPTION_CATALOG_SOURCE) and now - self.fetched > settings.OPTION_CATALOG_TTL
+                and now - self.attempted > self.RETRY_INTERVAL)
+
+    def refresh(self):
+        """
+        Reads the export again and rewrites the on-disk cache. Fields missing from the export keep their static
+        list. A failed read leaves the current values in place.
+
+        :return: True if the catalog was refreshed
+        :rtype: bool
+        """
+
+        source = settings.OPTION_CATALOG_SOURCE
+        if not source:
+            return False
+        self.attempted = time.time()
+        try:
+            values = read_option_export(source)
+        except Exception as e:
+            telemetry.warning(f"Could not refresh the dropdown values from {source}: {e}", step="option_catalog",
+                              outcome=type(e).__name__)
+            return False
+
+        fetched = time.time()
+        with self.lock:
+            self.values, self.fetched = values, fetched
+
+        # Write next to the cache and swap, so a reader never sees a half-written file
+        temporary_path = self.cache_path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as cache_file:
+            json.dump({"source": source, "fetched": fetched, "values": values}, cache_file, indent=1)
+        os.replace(temporary_path, self.cache_path)
+        telemetry.debug(step="option_catalog", outcome="refreshed",
+                        counts={field: len(field_values) for field, field_values in values.items()})
+        return True
+
+    def refresh_in_background(self):
+        """
+        Starts refreshing the catalog on a background thread unless a refresh is already running
+
+        :return: None
+        """
+
+        if not settings.OPTION_CATALOG_SOURCE:
+            return
+        with self.lock:
+            if self.refresher and self.refresher.is_alive():
+                return
+            self.refresher = threading.Thread(target=self.refresh, name="option-catalog-refresh", daemon=True)
+            self.refresher.start()
+
+    def wait_for_refresh(self, timeout=None):
+        """
+        Brings a stale catalog up to date before values are checked somewhere that cannot pick up a later refresh,
+        e.g. the job validation workers, which read the on-disk cache
+
+        :param timeout: The number of seconds to wait at most
+        :type timeout: float
+        :return: None
+        """
+
+        self._load_cache()
+        if self.is_stale():
+            self.refresh_in_background()
+        refresher = self.refresher
+        if refresher:
+            refresher.join(timeout)
+
+    def _load_cache(self):
+        with self.lock:
+            if self.values is not None:
+                return
+            self.values = {}
+            if not os.path.exists(self.cache_path):
+                return
+            try:
+                with open(self.cache_path, "r", encoding="utf-8") as cache_file:
+                    cache = json.load(cache_file)
+            except (OSError, ValueError):
+                return
+            # A cache built from another export is as good as none
+            if cache.get("source") == settings.OPTION_CATALOG_SOURCE:
+                self.values, self.fetched = cache.get("values", {}), cache.get("fetched", 0.0)
+
+
+def read_option_export(export_path):
+    """
+    Reads the dropdown values out of an export (.xlsx or .csv) with one column per field. The header names the
+    field (e.g. 'Group') and the values below it are listed as Epicor shows them in its dropdowns
+    (e.g. '_COMP - Component parts'). Empty cells are ignored.
+
+    :param export_path: The path to the export
+    :type export_path: str
+    :return: A dictionary whose keys are fields and whose values are lists of allowed values
+    :rtype: dict
+    """
+
+    if os.path.splitext(export_path)[1].lower() == ".csv":
+        with open(export_path, "r", encoding="utf-8-sig", newline="") as export_file:
+            rows = list(csv.reader(export_file))
+    else:
+        workbook = load_workbook(export_path, read_only=True, data_only=True)
+        try:
+            rows = list(workbook.active.iter_rows(values_only=True))
+        finally:
+            workbook.close()
+
+    headers = [str(header).strip() if header is not None else "" for header in (rows[0] if rows else [])]
+    values = {}
+    for position, header in enumerate(headers):
+        if header not in STATIC_OPTIONS:
+            continue
+        field_values = []
+        for row in rows[1:]:
+            value = row[position] if position < len(row) else None
+            value = str(value).strip() if value is not None else ""
+            if value and value not in field_values:
+                field_values.append(value)
+        if field_values:
+            values[header] = field_values
+
+    if not values:
+        raise ValueError("the export has no column named after a dropdown field")
+    return values
+
+
+# Create a global instance of OptionCatalog
+catalog = OptionCatalog()
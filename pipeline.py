@@ -0,0 +1,108 @@
+import threading
+import queue
+
+
+_DONE = object()
+
+
+def read_ahead(items, depth):
+    """
+    Iterates over items on a producer thread while the caller works on the items already produced. At most depth
+    items wait between the two, so a slow caller never lets the producer run away with memory.
+
+    :param items: An iterable, usually a generator doing the decoding work that should stay off the caller's thread
+    :param depth: The number of items that may wait for the caller
+    :type depth: int
+    :return: A generator yielding the items in order. Errors raised by the producer are raised again here.
+    """
+
+    buffer = queue.Queue(maxsize=max(1, depth))
+    stopped = threading.Event()
+
+    def put(item):
+        # Give up once the caller stopped consuming, so the producer never blocks forever on a full buffer
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put((item, None)):
+                    return
+        except BaseException as e:
+            put((_DONE, e))
+            return
+        put((_DONE, None))
+
+    producer = threading.Thread(target=produce, name="row-producer", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stopped.set()
+
+
+class WriteBehind:
+    def __init__(self, handler, maxsize, name="write-behind"):
+        """
+        Initializes the WriteBehind class instance, which hands queued items to a handler on a consumer thread in
+        batches, so writing results never sits between two UI actions
+
+        :param handler: A callable that writes a list of items. It runs on the consumer thread only.
+        :param maxsize: The number of items that may wait for the consumer before put blocks
+        :type maxsize: int
+        :param name: The name of the consumer thread
+        :type name: str
+        """
+
+        self.handler = handler
+        self.error = None
+        self.queue = queue.Queue(maxsize=max(1, maxsize))
+        self.consumer = threading.Thread(target=self._consume, name=name, daemon=True)
+        self.consumer.start()
+
+    def put(self, item):
+        self.queue.put(item)
+
+    def flush(self):
+        """
+        Waits until every queued item has been handed to the handler
+
+        :raises Exception: The first error the handler raised since the last flush, so a failed write is not lost
+        :return: None
+        """
+
+        self.queue.join()
+        error, self.error = self.error, None
+        if error is not None:
+            raise error
+
+    def _consume(self):
+        while True:
+            items = [self.queue.get()]
+            # Drain whatever else is waiting so the handler writes in batches
+            while True:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.handler(items)
+            except Exception as e:
+                # Kept for the next flush, which raises it on the caller's thread
+                if self.error is None:
+                    self.error = e
+            finally:
+                for _ in items:
+                    self.queue.task_done()
@@ -0,0 +1,157 @@
+from statistics import mean, median
+import tracemalloc
+import cProfile
+import pstats
+import sys
+import io
+import gc
+
+
+# From Python 3.12 on cProfile profiles every thread of the process; before, only the thread that enabled it
+PROFILES_ALL_THREADS = sys.version_info >= (3, 12)
+
+
+class RunProfiler:
+    def __init__(self, run_id, snapshot_every=25, compare_rows=20):
+        """
+        Initializes the RunProfiler class instance, which captures a CPU profile of a whole run plus periodic heap
+        snapshots. It is attached to the run telemetry as a sink, so it sees every row and step timing without the
+        row loop knowing about it.
+
+        The CPU profile covers the row producer and the write-behind writers (workbook reading, the operations log
+        and history saves) only on Python 3.12 and later; the report says which threads it covers.
+
+        :param run_id: The run identifier used to name the report files
+        :type run_id: str
+        :param snapshot_every: The number of rows between heap snapshots
+        :type snapshot_every: int
+        :param compare_rows: The number of rows at the start and at the end of the run that are compared
+        :type compare_rows: int
+        """
+
+        self.run_id = run_id
+        self.snapshot_every = max(1, snapshot_every)
+        self.compare_rows = max(1, compare_rows)
+        self.profile = cProfile.Profile()
+        self.rows = []  # One dictionary per finished row with its duration, step durations, and traced memory
+        self.steps = {}  # Step durations of the row currently in progress
+        self.snapshots = []  # Tuples of (rows finished, heap snapshot, live object count)
+
+    def start(self):
+        """
+        Starts tracing allocations and profiling the calling thread, which must be the one that runs the rows (and,
+        on Python 3.12 and later, every other thread)
+
+        :return: None
+        """
+
+        tracemalloc.start(10)
+        self._take_snapshot()
+        self.profile.enable()
+
+    def stop(self):
+        """
+        Stops profiling and writes the report files
+
+        :return: The path of the text report
+        :rtype: str
+        """
+
+        self.profile.disable()
+        self._take_snapshot()
+        tracemalloc.stop()
+
+        self.profile.dump_stats(f"profile_{self.run_id}.prof")
+        report_path = f"profile_{self.run_id}.txt"
+        with open(report_path, "w", encoding="utf-8") as report_file:
+            report_file.write(self.report())
+        return report_path
+
+    def write(self, events):
+        """
+        Telemetry sink method: collects the step and row timings of every row
+
+        :param events: The events written by the run telemetry
+        :type events: list
+        :return: None
+        """
+
+        for event in events:
+            step = event.get("step")
+            if step == "row":
+                current, _ = tracemalloc.get_traced_memory()
+                self.rows.append({"row": event.get("row"), "part_number": event.get("part_number"),
+                                  "duration": event.get("duration") or 0.0, "steps": self.steps,
+                                  "memory": current})
+                self.steps = {}
+                if len(self.rows) % self.snapshot_every == 0:
+                    self._take_snapshot()
+            elif step and event.get("duration") is not None and event.get("row") is not None:
+                self.steps[step] = self.steps.get(step, 0.0) + event["duration"]
+
+    def close(self):
+        pass
+
+    def report(self):
+        """
+        Builds the text report: the first and last rows compared side by side, the memory timeline, the allocation
+        sites that grew the most, and the most expensive functions
+
+        :return: The report
+        :rtype: str
+        """
+
+        lines = [f"Profile of run {self.run_id}", ""]
+
+        # Compare the first and last rows to tell a slowing server apart from growth in our own process
+        count = min(self.compare_rows, len(self.rows) // 2)
+        if count:
+            first, last = self.rows[:count], self.rows[-count:]
+            lines.append(f"First {count} rows vs last {count} rows (of {len(self.rows)})")
+            lines.append(f"{'':<24}{'first':>12}{'last':>12}{'change':>10}")
+            comparisons = [("row mean (s)", mean, lambda row: row["duration"]),
+                           ("row median (s)", median, lambda row: row["duration"])]
+            for step in sorted({step for row in first + last for step in row["steps"]}):
+                comparisons.append((f"{step} mean (s)", mean, lambda row, step=step: row["steps"].get(step, 0.0)))
+            comparisons.append(("traced memory (MB)", mean, lambda row: row["memory"] / 1e6))
+            for name, aggregate, value in comparisons:
+                before, after = aggregate([value(row) for row in first]), aggregate([value(row) for row in last])
+                change = f"{(after - before) / before * 100:+.0f}%" if before else "n/a"
+                lines.append(f"{name:<24}{before:>12.3f}{after:>12.3f}{change:>10}")
+            lines.append("")
+        else:
+            lines += ["Not enough rows to compare the start and the end of the run", ""]
+
+        # Memory timeline
+        lines.append("Heap snapshots")
+        for rows_finished, snapshot, objects in self.snapshots:
+            size = sum(stat.size for stat in snapshot.statistics("filename"))
+            lines.append(f"  after {rows_finished:>6} rows: {size / 1e6:>9.2f} MB traced, {objects:>9} live objects")
+        lines.append("")
+
+        # Allocation sites that grew between the first and last snapshot
+        if len(self.snapshots) >= 2:
+            lines.append("Top allocation growth (first to last snapshot)")
+            for stat in self.snapshots[-1][1].compare_to(self.snapshots[0][1], "lineno")[:15]:
+                lines.append(f"  {stat}")
+            lines.append("")
+
+        # Most expensive functions of the whole run
+        if PROFILES_ALL_THREADS:
+            lines.append("CPU profile of every thread: the row loop, the row producer, and the write-behind writers")
+        else:
+            lines.append(f"CPU profile of the row loop only: Python {sys.version_info[0]}.{sys.version_info[1]}'s "
+                         f"cProfile does not see the row producer (workbook reading) or the write-behind writers "
+                         f"(operations log and history saves). Profile on Python 3.12 or later to include them.")
+        stream = io.StringIO()
+        pstats.Stats(self.profile, stream=stream).sort_stats("cumulative").print_stats(30)
+        lines.append(stream.getvalue())
+
+        return "\n".join(lines)
+
+    def _take_snapshot(self):
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        self.snapshots.append((len(self.rows), snapshot, len(gc.get_objects())))
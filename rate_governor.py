@@ -0,0 +1,117 @@
+from telemetry import telemetry
+import time
+
+
+class RateGovernor:
+    def __init__(self, target_rows_per_minute, min_rows_per_minute=2, max_rows_per_minute=None,
+                 latency_target=None, burst=1):
+        """
+        Initializes the RateGovernor class instance: a token bucket that paces the row loop and adapts its rate to
+        how quickly Epicor answers.
+
+        The rate backs off multiplicatively while the smoothed row latency is well above its baseline and creeps back
+        up additively while latency is close to the baseline, so sustained throughput stays as high as Epicor can
+        take without pushing the client into timeouts.
+
+        :param target_rows_per_minute: The rate the run starts at
+        :type target_rows_per_minute: float
+        :param min_rows_per_minute: The rate never drops below this
+        :type min_rows_per_minute: float
+        :param max_rows_per_minute: The rate never rises above this. Defaults to twice the target.
+        :type max_rows_per_minute: float
+        :param latency_target: The row latency (seconds) considered healthy. Defaults to the lowest smoothed latency
+        seen during the run.
+        :type latency_target: float
+        :param burst: The number of rows that may start back-to-back after an idle period
+        :type burst: int
+        """
+
+        self.rate = target_rows_per_minute / 60.0
+        self.min_rate = min_rows_per_minute / 60.0
+        self.max_rate = (max_rows_per_minute or target_rows_per_minute * 2) / 60.0
+        self.latency_target = latency_target
+        self.increase_step = max(1.0, target_rows_per_minute / 20) / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.refilled = time.monotonic()
+
+        self.smoothed_latency = None
+        self.baseline = latency_target
+        self.rows_since_backoff = 0
+
+    # Smoothing factor of the latency average and the thresholds relative to the baseline
+    SMOOTHING = 0.3
+    BACKOFF_RATIO = 1.5
+    RECOVER_RATIO = 1.2
+    BACKOFF_FACTOR = 0.75
+    BACKOFF_COOLDOWN = 5  # Rows between two back-offs, so one slow spell is not punished repeatedly
+
+    @property
+    def rows_per_minute(self):
+        return self.rate * 60.0
+
+    def acquire(self):
+        """
+        Waits until the bucket holds a token for the next row
+
+        :return: The number of seconds spent waiting
+        :rtype: float
+        """
+
+        waited = 0.0
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.refilled) * self.rate)
+            self.refilled = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return waited
+            delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def record_latency(self, latency):
+        """
+        Feeds the measured latency of a finished row (pacing waits excluded) into the rate controller
+
+        :param latency: The number of seconds the row took
+        :type latency: float
+        :return: None
+        """
+
+        if self.smoothed_latency is None:
+            self.smoothed_latency = latency
+        else:
+            self.smoothed_latency = self.SMOOTHING * latency + (1 - self.SMOOTHING) * self.smoothed_latency
+
+        if self.latency_target is None:
+            # Track the best latency seen, drifting up slowly so a lasting shift in Epicor becomes the new normal
+            self.baseline = self.smoothed_latency if self.baseline is None else min(self.baseline * 1.01,
+                                                                                   self.smoothed_latency)
+
+        self.rows_since_backoff += 1
+        previous_rate = self.rate
+        if self.smoothed_latency > self.baseline * self.BACKOFF_RATIO:
+            if self.rows_since_backoff >= self.BACKOFF_COOLDOWN:
+                self.rate = max(self.min_rate, self.rate * self.BACKOFF_FACTOR)
+                self.rows_since_backoff = 0
+        elif self.smoothed_latency <= self.baseline * self.RECOVER_RATIO:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+        if abs(self.rate - previous_rate) * 60.0 >= 0.5:
+            telemetry.debug(step="pacing", rows_per_minute=round(self.rows_per_minute, 1),
+                            latency=round(self.smoothed_latency, 3), baseline=round(self.baseline, 3))
+
+
+def governor_from_settings(settings):
+    """
+    Builds the rate governor configured in the run options
+
+    :param settings: The settings module
+    :return: A RateGovernor, or None when pacing is turned off
+    """
+
+    if not settings.RATE_TARGET_ROWS_PER_MINUTE:
+        return None
+    return RateGovernor(settings.RATE_TARGET_ROWS_PER_MINUTE, settings.RATE_MIN_ROWS_PER_MINUTE,
+                        settings.RATE_MAX_ROWS_PER_MINUTE, settings.RATE_LATENCY_TARGET)
@@ -0,0 +1,335 @@
+from statistics import median
+from collections import Counter
+from datetime import datetime, timedelta
+from html import escape
+
+
+# Steps whose latency distributions are charted, in the order a row goes through them
+CHARTED_STEPS = ("pacing_wait", "connect", "open_part", "snapshot", "save", "row")
+
+CHART_WIDTH = 720
+BAR_COLOR = "#3b6ea5"
+HIGHLIGHT_COLOR = "#d9822b"
+
+
+class RunReport:
+    def __init__(self, run_id):
+        """
+        Initializes the RunReport class instance, a telemetry sink that keeps the row and step timings of a run and
+        renders them as a single self-contained HTML file: throughput over time, latency distributions per step,
+        outcomes by status, the slowest rows, and a comparison with earlier runs of the same operations. Charts are
+        inline SVG, so the report opens anywhere without network access.
+
+        :param run_id: The run identifier used to name the report file
+        :type run_id: str
+        """
+
+        self.run_id = run_id
+        self.rows = []  # One dictionary per finished row with its end time, duration, status, and step durations
+        self.skipped = 0
+        self.steps = {}  # Durations of every step, by step name
+        self.row_steps = {}  # Step durations of the row currently in progress
+        self.operations = set()  # The operation names this run's rows were logged under
+
+    def write(self, events):
+        """
+        Telemetry sink method: collects the row and step timings
+
+        :param events: The events written by the run telemetry
+        :type events: list
+        :return: None
+        """
+
+        for event in events:
+            step = event.get("step")
+            if step == "skip":
+                self.skipped += 1
+            elif step == "row":
+                self.rows.append({"time": datetime.fromisoformat(event["time"]), "row": event.get("row"),
+                                  "part_number": event.get("part_number"), "duration": event.get("duration"),
+                                  "status": event.get("outcome") or "Not logged", "steps": self.row_steps})
+                self.row_steps = {}
+                if event.get("logged_as"):
+                    self.operations.add(event["logged_as"])
+                if event.get("duration") is not None:
+                    self.steps.setdefault("row", []).append(event["duration"])
+            elif step in CHARTED_STEPS and event.get("duration") is not None:
+                self.steps.setdefault(step, []).append(event["duration"])
+                self.row_steps[step] = self.row_steps.get(step, 0.0) + event["duration"]
+
+    def close(self):
+        pass
+
+    def save(self, history=None):
+        """
+        Writes the report to run_report_<run id>.html
+
+        :param history: The operation history to compare this run with, or None to leave the comparison out
+        :type history: OperationHistory
+        :return: The path of the report
+        :rtype: str
+        """
+
+        earlier_runs = []
+        if history and self.rows:
+            started = min(row["time"] for row in self.rows).strftime("%Y-%m-%d %H:%M:%S")
+            earlier_runs = history.run_summaries(sorted(self.operations), started)
+
+        report_path = f"run_report_{self.run_id}.html"
+        with open(report_path, "w", encoding="utf-8") as report_file:
+            report_file.write(self.render(earlier_runs))
+        return report_path
+
+    def render(self, earlier_runs=()):
+        """
+        Renders the report
+
+        :param earlier_runs: Summaries of earlier runs, as returned by OperationHistory.run_summaries
+        :type earlier_runs: list
+        :return: The HTML document
+        :rtype: str
+        """
+
+        timed_rows = [row for row in self.rows if row["duration"] is not None]
+        statuses = Counter(row["status"] for row in self.rows)
+        completed = sum(count for status, count in statuses.items() if status.startswith("Completed"))
+        rate = self.rows_per_minute()
+
+        sections = [
+            f"<h1>Run {escape(self.run_id)}</h1>",
+            "<table class='facts'>" + "".join(
+                f"<tr><th>{escape(label)}</th><td>{escape(str(value))}</td></tr>" for label, value in (
+                    ("Operations", ", ".join(sorted(self.operations)) or "-"),
+                    ("Started", self._started().strftime("%Y-%m-%d %H:%M:%S") if self.rows else "-"),
+                    ("Finished", self.rows[-1]["time"].strftime("%Y-%m-%d %H:%M:%S") if self.rows else "-"),
+                    ("Rows processed", len(self.rows)),
+                    ("Rows skipped (already applied)", self.skipped),
+                    ("Completed", f"{completed} ({_percent(completed, len(self.rows))})"),
+                    ("Average rows per minute", f"{rate:.1f}" if rate else "-"),
+                    ("Median row time", f"{median(row['duration'] for row in timed_rows):.2f} s"
+                     if timed_rows else "-")
+                )) + "</table>",
+            "<h2>Throughput</h2>",
+            line_chart(self.throughput(), "rows per minute"),
+            "<h2>Step latency</h2>",
+            latency_chart({step: self.steps[step] for step in CHARTED_STEPS if self.steps.get(step)}),
+            "<h2>Outcomes</h2>",
+            bar_chart([(status, count) for status, count in statuses.most_common()], integer=True),
+            "<h2>Slowest rows</h2>",
+            self._slowest_rows_table(timed_rows),
+            "<h2>Earlier runs</h2>",
+            self._comparison(earlier_runs, rate, completed)
+        ]
+        return ("<!DOCTYPE html><html><head><meta charset='utf-8'>"
+                f"<title>Run {escape(self.run_id)}</title><style>{STYLE}</style></head><body>"
+                + "\n".join(sections) + "</body></html>\n")
+
+    def rows_per_minute(self):
+        """
+        :return: The average throughput of the run in rows per minute, or None if it cannot be told
+        :rtype: float
+        """
+
+        if not self.rows:
+            return None
+        seconds = (self.rows[-1]["time"] - self._started()).total_seconds()
+        return len(self.rows) * 60 / seconds if seconds > 0 else None
+
+    def throughput(self):
+        """
+        Counts the rows finished in consecutive time buckets, about fifty over the run and never shorter than ten
+        seconds
+
+        :return: A list of (minutes since the start, rows per minute) points
+        :rtype: list
+        """
+
+        if not self.rows:
+            return []
+        started = self._started()
+        span = max((self.rows[-1]["time"] - started).total_seconds(), 1.0)
+        bucket = max(10.0, span / 50)
+        counts = Counter(int((row["time"] - started).total_seconds() // bucket) for row in self.rows)
+        return [((index + 0.5) * bucket / 60, counts.get(index, 0) * 60 / bucket)
+                for index in range(int(span // bucket) + 1)]
+
+    def _started(self):
+        # The first row started its own duration before it finished
+        return self.rows[0]["time"] - timedelta(seconds=self.rows[0]["duration"] or 0)
+
+    @staticmethod
+    def _slowest_rows_table(timed_rows):
+        slowest = sorted(timed_rows, key=lambda row: row["duration"], reverse=True)[:10]
+        if not slowest:
+            return "<p>No rows were timed.</p>"
+        header = "".join(f"<th>{escape(step)}</th>" for step in CHARTED_STEPS if step != "row")
+        lines = [f"<table><tr><th>Row</th><th>Part number</th><th>Seconds</th>{header}<th>Status</th></tr>"]
+        for row in slowest:
+            steps = "".join(f"<td>{row['steps'][step]:.2f}</td>" if step in row["steps"] else "<td>-</td>"
+                            for step in CHARTED_STEPS if step != "row")
+            lines.append(f"<tr><td>{escape(str(row['row']))}</td><td>{escape(str(row['part_number']))}</td>"
+                         f"<td>{row['duration']:.2f}</td>{steps}<td>{escape(row['status'])}</td></tr>")
+        return "".join(lines) + "</table>"
+
+    @staticmethod
+    def _comparison(earlier_runs, rate, completed_rows):
+        if not earlier_runs:
+            return "<p>No earlier runs of these operations in the history.</p>"
+
+        lines = ["<table><tr><th>Run</th><th>Started</th><th>Rows</th><th>Completed</th><th>Rows per minute</th>"
+                 "</tr>"]
+        bars = [("This run", rate or 0.0)]
+        for run in earlier_runs:
+            span = (datetime.strptime(run["finished"], "%Y-%m-%d %H:%M:%S")
+                    - datetime.strptime(run["started"], "%Y-%m-%d %H:%M:%S")).total_seconds()
+            run_rate = run["rows"] * 60 / span if span > 0 else None
+            lines.append(f"<tr><td>{escape(str(run['run']))}</td><td>{escape(run['started'])}</td>"
+                         f"<td>{run['rows']}</td><td>{_percent(run['completed'], run['rows'])}</td>"
+                         f"<td>{f'{run_rate:.1f}' if run_rate else '-'}</td></tr>")
+            if run_rate:
+                bars.append((run["started"], run_rate))
+        return bar_chart(bars, highlight=0) + "".join(lines) + "</table>"
+
+
+def line_chart(points, y_label, height=220):
+    """
+    Draws a line chart as inline SVG
+
+    :param points: (x, y) points, x in minutes
+    :type points: list
+    :param y_label: The label of the y axis
+    :type y_label: str
+    :param height: The height of the chart in pixels
+    :type height: int
+    :return: The SVG element
+    :rtype: str
+    """
+
+    if not points:
+        return "<p>No data.</p>"
+    left, bottom, top, right = 50, 30, 10, 10
+    x_max = max(x for x, _ in points) or 1.0
+    y_max = max(y for _, y in points) or 1.0
+    plot_width, plot_height = CHART_WIDTH - left - right, height - top - bottom
+
+    def position(x, y):
+        return left + x / x_max * plot_width, top + plot_height - y / y_max * plot_height
+
+    path = " ".join(f"{x:.1f},{y:.1f}" for x, y in (position(*point) for point in points))
+    ticks = "".join(
+        f"<text x='{left - 6}' y='{position(0, value)[1] + 4:.1f}' text-anchor='end'>{value:.0f}</text>"
+        f"<line x1='{left}' x2='{CHART_WIDTH - right}' y1='{position(0, value)[1]:.1f}' "
+        f"y2='{position(0, value)[1]:.1f}' class='grid'/>"
+        for value in (0, y_max / 2, y_max))
+    return (f"<svg width='{CHART_WIDTH}' height='{height}' role='img'>{ticks}"
+            f"<polyline points='{path}' fill='none' stroke='{BAR_COLOR}' stroke-width='2'/>"
+            f"<text x='{left}' y='{height - 8}'>0 min</text>"
+            f"<text x='{CHART_WIDTH - right}' y='{height - 8}' text-anchor='end'>{x_max:.1f} min</text>"
+            f"<text x='{left + 4}' y='{top + 12}'>{escape(y_label)}</text></svg>")
+
+
+def bar_chart(items, integer=False, highlight=None):
+    """
+    Draws a horizontal bar chart as inline SVG
+
+    :param items: (label, value) pairs, drawn top to bottom
+    :type items: list
+    :param integer: Show the values as whole numbers
+    :type integer: bool
+    :param highlight: The position of a bar drawn in the highlight color
+    :type highlight: int
+    :return: The SVG element
+    :rtype: str
+    """
+
+    if not items:
+        return "<p>No data.</p>"
+    label_width, bar_height = 300, 22
+    largest = max(value for _, value in items) or 1
+    bars = []
+    for position, (label, value) in enumerate(items):
+        y = position * bar_height
+        width = value / largest * (CHART_WIDTH - label_width - 70)
+        text = f"{value:.0f}" if integer else f"{value:.1f}"
+        color = HIGHLIGHT_COLOR if position == highlight else BAR_COLOR
+        bars.append(f"<text x='{label_width - 6}' y='{y + 15}' text-anchor='end'>{escape(_shorten(label))}</text>"
+                    f"<rect x='{label_width}' y='{y + 3}' width='{width:.1f}' height='{bar_height - 6}' "
+                    f"fill='{color}'/><text x='{label_width + width + 6:.1f}' y='{y + 15}'>{text}</text>")
+    return (f"<svg width='{CHART_WIDTH}' height='{len(items) * bar_height + 4}' role='img'>" + "".join(bars)
+            + "</svg>")
+
+
+def latency_chart(durations_by_step):
+    """
+    Draws the latency distribution of every step as a box plot (median, quartiles, 5th to 95th percentile, and the
+    maximum) on a shared axis, in inline SVG
+
+    :param durations_by_step: Lists of durations in seconds, by step name
+    :type durations_by_step: dict
+    :return: The SVG element followed by a table of the percentiles
+    :rtype: str
+    """
+
+    if not durations_by_step:
+        return "<p>No step timings were recorded.</p>"
+    label_width, row_height = 110, 34
+    summaries = {step: _percentiles(durations) for step, durations in durations_by_step.items()}
+    largest = max(summary["max"] for summary in summaries.values()) or 1.0
+    scale = (CHART_WIDTH - label_width - 20) / largest
+
+    shapes, table = [], ["<table><tr><th>Step</th><th>Count</th><th>p50</th><th>p90</th><th>p99</th><th>Max</th>"
+                         "</tr>"]
+    for position, (step, summary) in enumerate(summaries.items()):
+        middle = position * row_height + row_height / 2
+
+        def x(value):
+            return label_width + value * scale
+
+        shapes.append(
+            f"<text x='{label_width - 8}' y='{middle + 4}' text-anchor='end'>{escape(step)}</text>"
+            f"<line x1='{x(summary['p5']):.1f}' x2='{x(summary['p95']):.1f}' y1='{middle}' y2='{middle}' "
+            f"stroke='{BAR_COLOR}'/>"
+            f"<rect x='{x(summary['p25']):.1f}' y='{middle - 9}' width='{max(1.0, x(summary['p75']) - x(summary['p25'])):.1f}' "
+            f"height='18' fill='{BAR_COLOR}' fill-opacity='0.35' stroke='{BAR_COLOR}'/>"
+            f"<line x1='{x(summary['p50']):.1f}' x2='{x(summary['p50']):.1f}' y1='{middle - 9}' y2='{middle + 9}' "
+            f"stroke='{HIGHLIGHT_COLOR}' stroke-width='2'/>"
+            f"<circle cx='{x(summary['max']):.1f}' cy='{middle}' r='3' fill='{HIGHLIGHT_COLOR}'/>")
+        table.append(f"<tr><td>{escape(step)}</td><td>{summary['count']}</td>"
+                     + "".join(f"<td>{summary[key]:.3f}</td>" for key in ("p50", "p90", "p99", "max")) + "</tr>")
+
+    height = len(summaries) * row_height + 24
+    axis = (f"<text x='{label_width}' y='{height - 6}'>0 s</text>"
+            f"<text x='{CHART_WIDTH - 20}' y='{height - 6}' text-anchor='end'>{largest:.2f} s</text>")
+    return (f"<svg width='{CHART_WIDTH}' height='{height}' role='img'>" + "".join(shapes) + axis + "</svg>"
+            + "".join(table) + "</table>")
+
+
+def _percentiles(durations):
+    ordered = sorted(durations)
+
+    def percentile(share):
+        return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+    return {"count": len(ordered), "p5": percentile(0.05), "p25": percentile(0.25), "p50": percentile(0.5),
+            "p75": percentile(0.75), "p90": percentile(0.9), "p95": percentile(0.95), "p99": percentile(0.99),
+            "max": ordered[-1]}
+
+
+def _percent(part, whole):
+    return f"{part * 100 / whole:.1f}%" if whole else "-"
+
+
+def _shorten(text, length=45):
+    text = str(text)
+    return text if len(text) <= length else text[:length - 1] + "…"
+
+
+STYLE = """
+body { font-family: Segoe UI, Arial, sans-serif; margin: 24px; color: #222; }
+h1 { font-size: 22px; } h2 { font-size: 17px; margin-top: 28px; border-bottom: 1px solid #ccc; }
+table { border-collapse: collapse; margin: 8px 0; font-size: 13px; }
+th, td { border: 1px solid #ddd; padding: 3px 8px; text-align: left; }
+table.facts th { background: #f3f3f3; }
+svg { display: block; margin: 8px 0; font-size: 12px; }
+svg .grid { stroke: #e4e4e4; }
+"""
@@ -0,0 +1,131 @@
+# Run options shared by the operation selection form, the command line, and the operations.
+# main.py overrides these from its command line flags before anything runs.
+
+# Skip rows whose operation, part number, and payload match the part's latest completed record in the operation
+# history, so re-submitting a workbook only repeats the rows that did not go through
+SKIP_APPLIED_ROWS = False
+
+# Part-master export (.xlsx or .csv) read back after a run to verify every applied value. The export must be
+# refreshed after the run ends, e.g. by a scheduled export in Epicor. None turns verification off.
+VERIFY_EXPORT_FILE = None
+
+# Seconds to wait for the part export to be refreshed before skipping verification. The run waits at the end, so keep
+# this short unless the export is known to be refreshed within minutes.
+VERIFY_EXPORT_TIMEOUT = 120
+
+# Profile the whole run (CPU profile plus periodic heap snapshots) and write profile_<run id>.prof/.txt
+PROFILE_RUN = False
+
+# Rows between heap snapshots while profiling
+PROFILE_SNAPSHOT_EVERY = 25
+
+# Rows at the start and at the end of the run compared in the profile report
+PROFILE_COMPARE_ROWS = 20
+
+# Pace the row loop with a token bucket starting at this many rows per minute. The rate backs off while Epicor answers
+# slower than usual and recovers as it speeds up again. None runs at full speed.
+RATE_TARGET_ROWS_PER_MINUTE = None
+
+# Bounds of the paced rate. None for the maximum allows up to twice the target.
+RATE_MIN_ROWS_PER_MINUTE = 2
+RATE_MAX_ROWS_PER_MINUTE = None
+
+# Row latency in seconds considered healthy. None uses the fastest smoothed latency seen during the run.
+RATE_LATENCY_TARGET = None
+
+# Record every driver call of the run (arguments, result, and latency) to this trace file for ui_trace.py to replay.
+# Record without SKIP_APPLIED_ROWS, since the replay runs every row. None turns recording off.
+RECORD_TRACE_FILE = None
+
+# Rows decoded ahead of the row being driven in Part Maintenance
+PIPELINE_DEPTH = 32
+
+# Logged records that may wait for the log writer before the row loop waits for it
+LOG_QUEUE_SIZE = 256
+
+# Seconds between two saves of the operations log workbook during a run. The history database gets every record
+# right away, and the workbook is always saved when the run ends.
+LOG_SAVE_INTERVAL = 5
+
+# Export (.xlsx or .csv) of the values Epicor accepts in each Label Information dropdown, one column per field named
+# after it. None keeps the hard-coded lists in combobox_options.py.
+OPTION_CATALOG_SOURCE = None
+
+# Seconds the cached dropdown values are used before they are read from the export again in the background
+OPTION_CATALOG_TTL = 12 * 60 * 60
+
+# Seconds to wait for an Epicor dialog (e.g. Add New Confirmation or Error) before deciding it will not appear.
+# pywinauto's exists() waits 0.5 seconds by default.
+DIALOG_TIMEOUT = 0.5
+
+# Run without any modal UI: errors are recorded against their row and the run moves on, and every notification is
+# gathered into run_summary_<run id>.txt at the end of the run instead of a message box
+UNATTENDED = False
+
+# Rows in a row that may fail in unattended mode before the rest of the batch is abandoned
+UNATTENDED_MAX_CONSECUTIVE_FAILURES = 5
+
+# Run the first rows of a batch as a canary: if any of them fails, the run pauses (or aborts) before the rest of the
+# batch is touched. 0 runs no canary.
+CANARY_ROWS = 0
+
+# Ask before carrying on after a canary whose rows all completed, so they can be checked in Epicor first
+CANARY_CONFIRM = False
+
+# Stop the run once this share (0 to 1) of the last FAILURE_RATE_WINDOW rows failed in Epicor (an error, a refused save,
+# a dialog that never appeared), e.g. 0.5. None does not watch the rate.
+FAILURE_RATE_THRESHOLD = None
+FAILURE_RATE_WINDOW = 10
+
+# What a failed canary or a failure rate over the threshold does: 'pause' asks whether to carry on (unattended runs
+# abort, since nobody can answer) and 'abort' stops the run straight away
+FAILURE_RATE_ACTION = "pause"
+
+# Run every pywinauto call in a separate worker process, so a hung UI Automation call cannot freeze the program
+UI_WORKER = False
+
+# Seconds a UI call may take before the worker is considered hung, killed, and started again
+UI_WORKER_CALL_TIMEOUT = 60
+
+# Rows after which the worker is replaced by a fresh one, so COM objects never pile up. None never recycles it.
+UI_WORKER_RECYCLE_ROWS = 250
+
+# Write the batch into import files for Epicor's import tool (DMT) in this directory instead of typing it into Part
+# Maintenance. None drives the screen as usual.
+BULK_IMPORT_DIRECTORY = None
+
+# Records per import file. Larger batches are split across several files.
+BULK_IMPORT_CHUNK_ROWS = 5000
+
+# Epicor company written into the Company column of every import record. An empty string leaves the column out.
+BULK_IMPORT_COMPANY = ""
+
+# Press buttons, toggle checkboxes, and fill fields through UI Automation patterns and window messages instead of the
+# mouse and keyboard, so Part Maintenance does not need to be the foreground window. Controls that do not support
+# this fall back to mouse and keyboard input.
+BACKGROUND_INPUT = False
+
+# Write run_report_<run id>.html at the end of every run, with throughput and latency charts and a comparison with
+# earlier runs
+RUN_REPORT = True
+
+# Seconds between two looks at the hot folder inbox for new jobs
+HOT_FOLDER_POLL_INTERVAL = 5
+
+# Seconds a job's files must stay unchanged before the hot folder picks it up, so half-copied files are never read
+HOT_FOLDER_SETTLE_SECONDS = 10
+
+# Folder the job queue runner moves each job's operations log, events, summary, and report into
+JOB_QUEUE_RESULTS_DIRECTORY = "job_results"
+
+# Rows per minute assumed for queue estimates until the runner has finished a job
+JOB_QUEUE_DEFAULT_ROWS_PER_MINUTE = 20
+
+# Seconds between two heartbeats of the runner on the job it performs, and seconds without a heartbeat after which
+# the job counts as interrupted (a crash, a reboot) and is queued again
+JOB_QUEUE_HEARTBEAT_INTERVAL = 30
+JOB_QUEUE_LEASE_SECONDS = 180
+
+# Keep the values an overwrite replaces and the whole record of a deleted part, so a run can be rolled back with
+# main.py --rollback <run id>. Off by default since it reads the part once more before every overwrite and delete.
+SNAPSHOT_CHANGES = False
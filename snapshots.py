@@ -0,0 +1,210 @@
+from operation_history import HISTORY_FILENAME
+from verification import DROPDOWN_FIELDS, CHECKBOX_FIELDS
+from pipeline import WriteBehind
+from telemetry import telemetry
+from datetime import datetime
+import settings
+import threading
+import atexit
+import sqlite3
+import json
+
+
+class SnapshotStore:
+    def __init__(self, filename=HISTORY_FILENAME):
+        """
+        Initializes the SnapshotStore class instance, which keeps the state a part was in before an overwrite or a
+        delete changed it: the value of every field the overwrite typed into or could toggle, or the whole part
+        record for a delete. Snapshots live in the history database next to the operation records, one compact row
+        per changed part, so a bad batch can be rolled back with rollback_entries. They are written behind the run on
+        a consumer thread, like the operation records.
+
+        :param filename: The path to the history database. Defaults to operations_history.db in the working folder.
+        :type filename: str
+        """
+
+        self.filename = filename
+        self.local = threading.local()  # One connection per thread, opened on first use
+        self.writer = None  # Started with the first snapshot, so processes that take none run no writer thread
+
+    @property
+    def connection(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = self.local.connection = sqlite3.connect(self.filename, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    id INTEGER PRIMARY KEY,
+                    run_id TEXT,
+                    log_file TEXT,
+                    operation TEXT NOT NULL,
+                    part_number TEXT NOT NULL,
+                    captured TEXT NOT NULL,
+                    fields TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_snapshots_run ON snapshots (run_id);
+                CREATE INDEX IF NOT EXISTS idx_snapshots_log ON snapshots (log_file);
+                CREATE INDEX IF NOT EXISTS idx_snapshots_part ON snapshots (part_number, captured);
+            """)
+        return connection
+
+    def record(self, operation, part_number, fields, run_id=None, log_file=None):
+        """
+        Queues the state of a part from before a change that has just been saved. It is written to the database on
+        the writer thread; flush waits for it.
+
+        :param operation: The change that was made (Overwrite or Delete)
+        :type operation: str
+        :param part_number: The part number that was changed
+        :type part_number: str
+        :param fields: The values the fields held before the change, by Label Information field (and 'Description')
+        :type fields: dict
+        :param run_id: The run that made the change
+        :type run_id: str
+        :param log_file: The operations log the change was logged to
+        :type log_file: str
+        :return: None
+        """
+
+        if self.writer is None:
+            self.writer = WriteBehind(self.write_records, settings.LOG_QUEUE_SIZE, name="snapshot-writer")
+            atexit.register(self.flush)
+        self.writer.put((run_id, log_file, operation, str(part_number), datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                         json.dumps(fields, separators=(",", ":"), default=str)))
+
+    def write_records(self, records):
+        """
+        Writes a batch of snapshots into the database in a single transaction. Runs on the writer thread.
+
+        :param records: Tuples of (run id, log file, operation, part number, captured, fields as JSON)
+        :type records: list
+        :return: None
+        """
+
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO snapshots (run_id, log_file, operation, part_number, captured, fields) "
+                "VALUES (?, ?, ?, ?, ?, ?)", records
+            )
+
+    def flush(self):
+        """
+        Waits until every queued snapshot has been written
+
+        :raises Exception: The error a write raised on the writer thread since the last flush
+        :return: None
+        """
+        if self.writer is not None:
+            self.writer.flush()
+
+    def for_run(self, run):
+        """
+        Lists the snapshots taken by a run, in the order they were taken
+
+        :param run: The run id (e.g. 20240131_142501) or the operations log file of the run
+        :type run: str
+        :return: A list of dictionaries with 'operation', 'part_number', 'captured', and 'fields' keys
+        :rtype: list
+        """
+
+        self.flush()
+        cursor = self.connection.execute(
+            "SELECT operation, part_number, captured, fields FROM snapshots WHERE run_id = ? OR log_file = ? "
+            "ORDER BY id", (run, run))
+        return [{"operation": operation, "part_number": part_number, "captured": captured,
+                 "fields": json.loads(fields)} for operation, part_number, captured, fields in cursor.fetchall()]
+
+    def close(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
+
+
+def rollback_entries(snapshots, run):
+    """
+    Builds the job that puts every part a run changed back the way it was: deleted parts are created again with
+    their description and fields, and overwritten parts get their previous values back. A part the run changed
+    several times returns to the state it had before the first change. Rows that share the same values are grouped
+    into one entry, so the job can run over any backend (the screen or the bulk-load files).
+
+    Dropdowns an overwrite found empty stay as they are, since an overwrite never clears a dropdown.
+
+    :param snapshots: The snapshots of the run, as returned by SnapshotStore.for_run
+    :type snapshots: list
+    :param run: The run being rolled back, named in the entries
+    :type run: str
+    :raises ValueError: If the run took no snapshots
+    :return: Job entries ready for ERPManager.perform_job
+    :rtype: list
+    """
+
+    if not snapshots:
+        raise ValueError(f"No snapshots were taken by run {run}")
+
+    parts = {}
+    for snapshot in snapshots:
+        part = parts.setdefault(snapshot["part_number"], {"fields": {}, "deleted": False})
+        # The earliest snapshot of a field holds its value from before the run
+        for field, value in snapshot["fields"].items():
+            part["fields"].setdefault(field, value)
+        part["deleted"] = snapshot["operation"] == "Delete"
+
+    groups = {}
+    for part_number, part in parts.items():
+        fields = part["fields"]
+        label_data = {field: fields.get(field) or "" for field in DROPDOWN_FIELDS}
+        label_data.update({field: bool(fields.get(field)) for field in CHECKBOX_FIELDS})
+        operation = "CREATE" if part["deleted"] else "OVERWRITE"
+        key = (operation, json.dumps(label_data, sort_keys=True))
+        groups.setdefault(key, []).append({"Part Number": part_number,
+                                           "Description": fields.get("Description") if part["deleted"] else None})
+
+    entries = []
+    for (operation, label_json), rows in groups.items():
+        label_data = json.loads(label_json)
+        for number, row in enumerate(rows, 1):
+            row["Row"] = number
+        entries.append({"Operation": operation, "Input File": f"snapshots of {run}", "Sheet Name": operation.title(),
+                        "First Row": 1, "Last Row": len(rows), "Label Data": label_data, "Rows": rows})
+    return entries
+
+
+def run_rollback(erp_manager, run):
+    """
+    Rolls a run back from its snapshots in one job, over the bulk-load files when settings.BULK_IMPORT_DIRECTORY is
+    set and over Part Maintenance otherwise
+
+    :param erp_manager: An instance of the ERPManager class
+    :param run: The run id or the operations log file of the run to roll back
+    :type run: str
+    :return: None
+    """
+
+    entries = rollback_entries(snapshot_store.for_run(run), run)
+    # The values being restored were applied long before the run, so the history must not skip them
+    settings.SKIP_APPLIED_ROWS = False
+    telemetry.info(f"Rolling back {sum(len(entry['Rows']) for entry in entries)} parts changed by {run}",
+                   step="rollback")
+    erp_manager.perform_job(entries)
+
+
+def install_snapshot_store(store):
+    """
+    Replaces the snapshot store of this process, e.g. with one in a scratch folder while a trace is replayed
+
+    :param store: The store to use from now on
+    :type store: SnapshotStore
+    :return: The store that was used before
+    :rtype: SnapshotStore
+    """
+
+    global snapshot_store
+    previous, snapshot_store = snapshot_store, store
+    return previous
+
+
+# Create a global instance of SnapshotStore
+snapshot_store = SnapshotStore()
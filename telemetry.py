@@ -0,0 +1,289 @@
+from contextlib import contextmanager
+from datetime import datetime
+import threading
+import logging
+import atexit
+import shutil
+import queue
+import json
+import time
+import sys
+
+
+# Event levels, shared with the standard logging module so the event file can feed any log pipeline
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+ERROR = logging.ERROR
+
+
+class ConsoleSink:
+    def __init__(self, level=INFO, stream=None):
+        """
+        Initializes the ConsoleSink class instance, which renders events as the familiar console progress lines
+
+        :param level: The lowest level of event that is written to the console
+        :type level: int
+        :param stream: The stream to write to. Defaults to sys.stdout.
+        """
+
+        self.level = level
+        self.stream = stream or sys.stdout
+        # The terminal width only changes when the window is resized, so it is read once per run
+        self.width = shutil.get_terminal_size().columns
+
+    def write(self, events):
+        """
+        Writes a batch of events with a single write call
+
+        :param events: The events to write
+        :type events: list
+        :return: None
+        """
+
+        lines = [self.render(event) for event in events if event["level"] >= self.level]
+        if lines:
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+
+    def render(self, event):
+        """
+        Renders an event as a console line. Separator events are centered within a line of dashes.
+
+        :param event: The event to render
+        :type event: dict
+        :return: The rendered line
+        :rtype: str
+        """
+
+        if event.get("step") == "separator":
+            text = f" {event['message']} " if event["message"] else ""
+            separator_width = (self.width - len(text)) // 2
+            return f"{'-' * separator_width}{text}{'-' * separator_width}"
+        return event["message"]
+
+    def close(self):
+        pass
+
+
+class JsonLinesSink:
+    def __init__(self, filename, level=DEBUG):
+        """
+        Initializes the JsonLinesSink class instance, which writes every event as one JSON object per line.
+        The file is only created once the first event is written.
+
+        :param filename: The path of the event file
+        :type filename: str
+        :param level: The lowest level of event that is written to the file
+        :type level: int
+        """
+
+        self.filename = filename
+        self.level = level
+        self.file = None
+
+    def write(self, events):
+        """
+        Appends a batch of events to the event file
+
+        :param events: The events to write
+        :type events: list
+        :return: None
+        """
+
+        lines = [json.dumps(event, default=str) for event in events if event["level"] >= self.level]
+        if not lines:
+            return
+        if self.file is None:
+            self.file = open(self.filename, "a", encoding="utf-8")
+        self.file.write("\n".join(lines) + "\n")
+        self.file.flush()
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+class RunTelemetry:
+    def __init__(self, run_id=None, sinks=None):
+        """
+        Initializes the RunTelemetry class instance: a structured event stream for one run.
+
+        Every event carries the run id, its level, a message, and (when known) the row, part number, step, duration,
+        and outcome. Events are handed to a background writer through a queue, so emitting one never waits on
+        console or file I/O.
+
+        :param run_id: The identifier stamped on every event. Defaults to the start time of the run.
+        :type run_id: str
+        :param sinks: The sinks events are written to. Defaults to the console and run_events_<run_id>.jsonl.
+        :type sinks: list
+        """
+
+        self.run_id = run_id or datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.sinks = sinks if sinks is not None else [ConsoleSink(),
+                                                      JsonLinesSink(f"run_events_{self.run_id}.jsonl")]
+        self.context_fields = {}
+        self.queue = queue.SimpleQueue()
+        self.writer = threading.Thread(target=self._write_events, name="telemetry-writer", daemon=True)
+        self.writer.start()
+        atexit.register(self.close)
+
+    def emit(self, level, message="", **fields):
+        """
+        Queues an event for the sinks
+
+        :param level: The level of the event (DEBUG, INFO, WARNING, ERROR)
+        :type level: int
+        :param message: The human-readable message shown on the console
+        :type message: str
+        :param fields: Structured fields such as row, part_number, step, duration, and outcome. They are added to
+        the fields of the current row context.
+        :return: None
+        """
+
+        event = {"time": datetime.now().isoformat(timespec="milliseconds"), "run_id": self.run_id,
+                 "level": level, "level_name": logging.getLevelName(level), "message": message}
+        event.update(self.context_fields)
+        event.update(fields)
+        self.queue.put(event)
+
+    def debug(self, message="", **fields):
+        self.emit(DEBUG, message, **fields)
+
+    def info(self, message="", **fields):
+        self.emit(INFO, message, **fields)
+
+    def warning(self, message="", **fields):
+        self.emit(WARNING, message, **fields)
+
+    def error(self, message="", **fields):
+        self.emit(ERROR, message, **fields)
+
+    def separator(self, text=""):
+        """
+        Queues a separator line, shown on the console centered within a line of dashes
+
+        :param text: The text to be centered within the separator. Default is an empty string.
+        :type text: str
+        :return: None
+        """
+        self.emit(INFO, text, step="separator")
+
+    def start_run(self, run_id=None):
+        """
+        Starts a new run in a long-lived process, e.g. the next job of the hot folder: every queued event is written,
+        the event file of the previous run is closed, and later events go to run_events_<run id>.jsonl
+
+        :param run_id: The identifier of the new run. Defaults to the current time.
+        :type run_id: str
+        :return: The identifier of the new run
+        :rtype: str
+        """
+
+        self.flush()
+        self.run_id = run_id or datetime.now().strftime('%Y%m%d_%H%M%S')
+        sinks = []
+        for sink in self.sinks:
+            if isinstance(sink, JsonLinesSink):
+                sink.close()
+                sink = JsonLinesSink(f"run_events_{self.run_id}.jsonl", sink.level)
+            sinks.append(sink)
+        self.sinks = sinks
+        return self.run_id
+
+    def add_sink(self, sink):
+        """
+        Attaches another sink, e.g. a profiler, for the rest of the run
+
+        :param sink: An object with write(events) and close() methods
+        :return: None
+        """
+        self.sinks = self.sinks + [sink]
+
+    def remove_sink(self, sink):
+        self.sinks = [attached for attached in self.sinks if attached is not sink]
+
+    def set_context(self, **fields):
+        """
+        Sets the fields (e.g. row and part_number) stamped on every event until the context is cleared
+
+        :return: None
+        """
+        self.context_fields = {key: value for key, value in fields.items() if value is not None}
+
+    def clear_context(self):
+        self.context_fields = {}
+
+    @contextmanager
+    def step(self, name, level=DEBUG, **fields):
+        """
+        Times a step of a row and emits it with its duration once it finishes (or fails)
+
+        :param name: The name of the step, e.g. 'open_part' or 'save'
+        :type name: str
+        :param level: The level of the emitted event
+        :type level: int
+        :return: A context manager
+        """
+
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            yield
+        except BaseException as e:
+            outcome = type(e).__name__
+            raise
+        finally:
+            self.emit(level, step=name, duration=round(time.perf_counter() - started, 4), outcome=outcome,
+                      **fields)
+
+    def flush(self, timeout=5):
+        """
+        Waits until every queued event has been written
+
+        :param timeout: The number of seconds to wait at most
+        :type timeout: float
+        :return: None
+        """
+
+        if not self.writer.is_alive():
+            return
+        written = threading.Event()
+        self.queue.put(written)
+        written.wait(timeout)
+
+    def close(self):
+        """
+        Writes every queued event and closes the sinks
+
+        :return: None
+        """
+
+        self.flush()
+        for sink in self.sinks:
+            sink.close()
+
+    def _write_events(self):
+        while True:
+            events = [self.queue.get()]
+            # Drain whatever else is waiting so the sinks write in batches
+            while True:
+                try:
+                    events.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            markers = [event for event in events if isinstance(event, threading.Event)]
+            events = [event for event in events if not isinstance(event, threading.Event)]
+            for sink in list(self.sinks):
+                try:
+                    sink.write(events)
+                except Exception as e:
+                    sys.stderr.write(f"Telemetry sink {type(sink).__name__} failed: {e}\n")
+            for marker in markers:
+                marker.set()
+
+
+# Create a global instance of RunTelemetry
+telemetry = RunTelemetry()
@@ -0,0 +1,76 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operation_history import OperationHistory
+
+
+class LatestCompletedTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.history = OperationHistory(os.path.join(self.folder.name, "history.db"))
+
+    def tearDown(self):
+        self.history.close()
+        self.folder.cleanup()
+
+    def test_completed_part(self):
+        self.history.record("Create", "P1", "Part", "Completed", "2026-01-01 10:00:00", fingerprint="a")
+
+        self.assertEqual(self.history.latest_completed(["P1"])["P1"]["fingerprint"], "a")
+
+    def test_completed_then_incomplete(self):
+        self.history.record("Overwrite", "P1", "n/a", "Completed", "2026-01-01 10:00:00", fingerprint="a")
+        self.history.record("Overwrite", "P1", "n/a", "Incomplete - Epicor reported an error on save",
+                            "2026-01-02 10:00:00", fingerprint="a")
+
+        self.assertEqual(self.history.latest_completed(["P1"]), {})
+
+    def test_completed_then_skipped(self):
+        self.history.record("Create", "P1", "Part", "Completed", "2026-01-01 10:00:00", fingerprint="a")
+        self.history.record("Create", "P1", "Part", "Skipped - already applied", "2026-01-02 10:00:00",
+                            fingerprint="a")
+
+        self.assertEqual(self.history.latest_completed(["P1"])["P1"]["status"], "Completed")
+
+
+class RunSummariesTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.history = OperationHistory(os.path.join(self.folder.name, "history.db"))
+
+    def tearDown(self):
+        self.history.close()
+        self.folder.cleanup()
+
+    def test_runs_sharing_a_log_file(self):
+        self.history.record("Create", "P1", "Part", "Completed", "2026-01-01 10:00:00", "log.xlsx", run_id="r1")
+        self.history.record("Create", "P2", "Part", "Completed", "2026-01-01 10:01:00", "log.xlsx", run_id="r1")
+        self.history.record("Create", "P3", "Part", "Completed", "2026-01-02 10:00:00", "log.xlsx", run_id="r2")
+
+        runs = self.history.run_summaries(["Create"], "2026-01-03 00:00:00")
+
+        self.assertEqual([(run["run"], run["rows"]) for run in runs], [("r2", 1), ("r1", 2)])
+
+    def test_verification_records_are_not_rows(self):
+        self.history.record("Create", "P1", "Part", "Completed", "2026-01-01 10:00:00", "log.xlsx", run_id="r1")
+        self.history.record("Create", "P1", "n/a", "Verification failed - part not in export", "2026-01-01 10:05:00",
+                            "log.xlsx", run_id="r1")
+
+        run, = self.history.run_summaries(["Create"], "2026-01-03 00:00:00")
+
+        self.assertEqual((run["rows"], run["completed"], run["finished"]), (1, 1, "2026-01-01 10:00:00"))
+
+    def test_imported_records_are_grouped_by_log_file(self):
+        self.history.record("Create", "P1", "Part", "Completed", "2026-01-01 10:00:00", "old.xlsx")
+
+        run, = self.history.run_summaries(["Create"], "2026-01-03 00:00:00")
+
+        self.assertEqual((run["run"], run["log_file"]), ("old.xlsx", "old.xlsx"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline import WriteBehind
+
+
+class WriteBehindTest(unittest.TestCase):
+    def test_handler_error_raised_on_flush(self):
+        written = []
+
+        def handler(items):
+            if "bad" in items:
+                raise OSError("disk full")
+            written.extend(items)
+
+        writer = WriteBehind(handler, 10)
+        writer.put("bad")
+        with self.assertRaises(OSError):
+            writer.flush()
+
+        # The error is raised once and the writer keeps going
+        writer.put("good")
+        writer.flush()
+        self.assertEqual(written, ["good"])
+
+
+if __name__ == "__main__":
+    unittest.main()
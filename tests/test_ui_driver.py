@@ -0,0 +1,25 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ui_driver import literal_keys, split_literal_keys
+
+
+class LiteralKeysTest(unittest.TestCase):
+    def test_special_characters(self):
+        self.assertEqual(literal_keys("Bolt (M6) +5%"), "Bolt {(}M6{)} {+}5{%}")
+
+    def test_none_types_nothing(self):
+        self.assertEqual(literal_keys(None), "")
+
+    def test_numbers(self):
+        self.assertEqual(literal_keys(1234), "1234")
+
+    def test_split(self):
+        self.assertEqual(split_literal_keys(literal_keys("Bolt (M6)") + "{TAB}"), ("Bolt (M6)", "{TAB}"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import erp_manager
+import settings
+
+
+class VerifyTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.export = os.path.join(self.folder.name, "part_export.csv")
+        with open(self.export, "w") as export:
+            export.write("Part Number\n")
+        self.saved = settings.VERIFY_EXPORT_FILE, settings.VERIFY_EXPORT_TIMEOUT
+        settings.VERIFY_EXPORT_FILE, settings.VERIFY_EXPORT_TIMEOUT = self.export, 0
+        # Keeps the events of the pass out of the working folder
+        telemetry = mock.patch.object(erp_manager, "telemetry")
+        telemetry.start()
+        self.addCleanup(telemetry.stop)
+
+    def tearDown(self):
+        settings.VERIFY_EXPORT_FILE, settings.VERIFY_EXPORT_TIMEOUT = self.saved
+        self.folder.cleanup()
+
+    def test_export_written_during_the_run_is_not_read(self):
+        # The run started a minute ago and the export landed half way through it
+        started = time.time() - 60
+        os.utime(self.export, (started + 30, started + 30))
+
+        applied_rows = [{"Operation": "Create", "Part Number": "P1", "Label Data": {}}]
+        with mock.patch.object(erp_manager, "verify_applied_rows") as verify_applied_rows, \
+                mock.patch.object(erp_manager, "get_operation_logger"):
+            erp_manager.ERPManager.verify(applied_rows)
+
+        verify_applied_rows.assert_not_called()
+
+    def test_export_written_after_the_run_is_read(self):
+        applied_rows = [{"Operation": "Create", "Part Number": "P1", "Label Data": {}}]
+        future = time.time() + 60
+        os.utime(self.export, (future, future))
+        with mock.patch.object(erp_manager, "verify_applied_rows") as verify_applied_rows, \
+                mock.patch.object(erp_manager, "get_operation_logger"), \
+                mock.patch("verification.time.sleep"):
+            erp_manager.ERPManager.verify(applied_rows)
+
+        verify_applied_rows.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,292 @@
+import time
+
+
+# Characters type_keys reads as modifiers (+ ^ % ~) or key groups ({ } ( )) instead of typing them
+TYPE_KEYS_SPECIAL_CHARACTERS = "+^%~{}()"
+
+
+def literal_keys(text):
+    """
+    Escapes text so type_keys types every character as written, e.g. the parentheses of 'Bolt (M6)'
+
+    :param text: The text to type. None (e.g. an empty cell or form field) types nothing.
+    :return: The escaped text
+    :rtype: str
+    """
+
+    if text is None:
+        return ""
+    return "".join(f"{{{character}}}" if character in TYPE_KEYS_SPECIAL_CHARACTERS else character
+                   for character in str(text))
+
+
+def split_literal_keys(keys):
+    """
+    Splits keys in type_keys notation into the text they type as written and the keys that follow it, e.g.
+    'Bolt {(}M6{)}{TAB}' into ('Bolt (M6)', '{TAB}')
+
+    :param keys: The keys, usually escaped with literal_keys
+    :type keys: str
+    :return: A tuple of the literal text and the remaining keys
+    :rtype: tuple
+    """
+
+    text = []
+    position = 0
+    while position < len(keys):
+        character = keys[position]
+        if character == "{" and position + 2 < len(keys) and keys[position + 2] == "}":
+            text.append(keys[position + 1])
+            position += 3
+        elif character in TYPE_KEYS_SPECIAL_CHARACTERS:
+            break
+        else:
+            text.append(character)
+            position += 1
+    return "".join(text), keys[position:]
+
+
+class PywinautoDriver:
+    """
+    Drives the Epicor client through pywinauto's UI Automation backend. Every call the operations make on Epicor
+    goes through a driver, so a run can be recorded or replayed (see ui_trace.py) without changing the operations.
+    """
+
+    def __init__(self):
+        # Imported here so the rest of the program (e.g. a trace replay) also works where pywinauto cannot be loaded
+        import pywinauto.findwindows
+        import pywinauto.timings
+        from pywinauto import Application
+        from pywinauto.keyboard import send_keys
+
+        self.application = Application
+        self._send_keys = send_keys
+        self.ElementNotFoundError = pywinauto.findwindows.ElementNotFoundError
+        self.TimeoutError = pywinauto.timings.TimeoutError
+
+    def connect(self, **criteria):
+        """
+        Connects to a running application
+
+        :param criteria: The search criteria of its window, e.g. title="Part Maintenance"
+        :return: The connected application, whose window(**criteria) method returns a window specification
+        """
+        return self.application(backend="uia").connect(**criteria)
+
+    def wait_for_dialog(self, window, titles, timeout):
+        """
+        Waits for any of several dialogs with one shared deadline. Every poll looks at the open windows under the
+        given window in a single sweep of the UI Automation tree, instead of probing for each title in turn and
+        waiting out a timeout per title that never appears.
+
+        :param window: The window specification the dialogs open under
+        :param titles: The titles of the dialogs to wait for, in order of precedence
+        :type titles: tuple
+        :param timeout: The number of seconds to wait before deciding that none of them appeared
+        :type timeout: float
+        :return: The title of the dialog that appeared, or None
+        :rtype: str
+        """
+
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                open_titles = {dialog.window_text() for dialog in
+                               window.wrapper_object().descendants(control_type="Window")}
+            except self.ElementNotFoundError:
+                open_titles = set()
+            for title in titles:
+                if title in open_titles:
+                    return title
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(self.POLL_INTERVAL)
+
+    # Seconds between two sweeps of wait_for_dialog
+    POLL_INTERVAL = 0.05
+
+    def read_fields(self, window, text_ids, toggle_ids):
+        """
+        Reads the current values of several controls in a single sweep of the UI Automation tree, instead of
+        looking each control up on its own
+
+        :param window: The window specification holding the controls
+        :param text_ids: The automation ids of the text boxes and dropdowns to read
+        :type text_ids: list
+        :param toggle_ids: The automation ids of the checkboxes to read
+        :type toggle_ids: list
+        :return: The value of every control found, by automation id: the text of a text box or dropdown, the toggle
+        state (0 or 1) of a checkbox
+        :rtype: dict
+        """
+
+        wanted = set(text_ids) | set(toggle_ids)
+        values = {}
+        for element in window.wrapper_object().descendants():
+            # The rest of the tree is not looked at once every control has been found
+            if len(values) == len(wanted):
+                break
+            auto_id = element.element_info.automation_id
+            if auto_id in values:
+                continue
+            if auto_id in toggle_ids:
+                values[auto_id] = element.get_toggle_state()
+            elif auto_id in text_ids:
+                try:
+                    # A dropdown's name is its caption; its value pattern holds the chosen item
+                    values[auto_id] = element.iface_value.CurrentValue
+                except Exception:
+                    values[auto_id] = element.window_text()
+        return values
+
+    def send_keys(self, keys):
+        """
+        Types keys into whichever control has the keyboard focus
+
+        :param keys: The keys in pywinauto's send_keys notation, e.g. '{TAB}'
+        :type keys: str
+        :return: None
+        """
+        self._send_keys(keys)
+
+
+class BackgroundDriver(PywinautoDriver):
+    """
+    Drives the Epicor client without the mouse or the keyboard focus. Buttons are pressed through the UI Automation
+    invoke pattern, checkboxes through the toggle pattern, and text boxes and dropdowns are filled through the value
+    pattern, with keys such as {TAB} posted to the control as window messages. Part Maintenance can stay in the
+    background and the operator can keep working. A control that does not support its pattern falls back to real
+    mouse and keyboard input, and keeps using it for the rest of the run.
+    """
+
+    def __init__(self):
+        super().__init__()
+        from pywinauto.controls.hwndwrapper import HwndWrapper
+        self.hwnd_wrapper = HwndWrapper
+        self.foreground_controls = set()  # Paths of the controls that needed foreground input
+
+    def connect(self, **criteria):
+        return BackgroundElement(self, super().connect(**criteria), (tuple(sorted(criteria.items())),))
+
+    def actuate(self, element, background, foreground):
+        """
+        Actuates a control in the background, falling back to foreground input once the control turns out not to
+        support it
+
+        :param element: The control
+        :type element: BackgroundElement
+        :param background: A callable that actuates the control through UI Automation patterns and window messages
+        :param foreground: A callable that actuates the control with real mouse and keyboard input
+        :return: None
+        """
+
+        if element._path not in self.foreground_controls:
+            try:
+                background()
+                return
+            except self.ElementNotFoundError:
+                raise
+            except Exception as e:
+                self.foreground_controls.add(element._path)
+                # Imported here since the drivers do not depend on the telemetry otherwise
+                from telemetry import telemetry
+                telemetry.debug(step="foreground_fallback", outcome=type(e).__name__,
+                                control=dict(element._path[-1]))
+        foreground()
+
+
+class BackgroundElement:
+    def __init__(self, driver, target, path):
+        """
+        Initializes the BackgroundElement class instance, which wraps a pywinauto application or window
+        specification and actuates it in the background. Every other call goes to the wrapped specification.
+
+        :param driver: The driver that owns the element
+        :type driver: BackgroundDriver
+        :param target: The pywinauto application or window specification
+        :param path: The criteria of every lookup leading to the element, identifying the control
+        :type path: tuple
+        """
+
+        self._driver = driver
+        self._target = target
+        self._path = path
+
+    def __getattr__(self, name):
+        attribute = getattr(self._target, name)
+        if name in ("window", "child_window"):
+            return lambda **criteria: BackgroundElement(self._driver, attribute(**criteria),
+                                                        self._path + (tuple(sorted(criteria.items())),))
+        return attribute
+
+    def click_input(self, *args, **kwargs):
+        def press():
+            wrapper = self._target.wrapper_object()
+            if wrapper.element_info.control_type == "CheckBox":
+                wrapper.iface_toggle.Toggle()
+            else:
+                wrapper.iface_invoke.Invoke()
+
+        self._driver.actuate(self, press, lambda: self._target.click_input(*args, **kwargs))
+        return self
+
+    def type_keys(self, keys, *args, **kwargs):
+        def fill():
+            text, remaining_keys = split_literal_keys(keys)
+            wrapper = self._target.wrapper_object()
+            wrapper.iface_value.SetValue(text)
+            if remaining_keys:
+                if not wrapper.handle:
+                    raise ValueError("the control has no window to post keys to")
+                self._driver.hwnd_wrapper(wrapper.handle).send_keystrokes(remaining_keys)
+
+        self._driver.actuate(self, fill, lambda: self._target.type_keys(keys, *args, **kwargs))
+        return self
+
+
+_driver = None
+
+
+def current_driver():
+    """
+    Returns the driver every operation talks to, creating it on first use: the pywinauto driver (in the background
+    when settings.BACKGROUND_INPUT is set), or the out-of-process worker driver when settings.UI_WORKER is set
+
+    :return: The current driver
+    """
+
+    global _driver
+    if _driver is None:
+        import settings
+        if settings.UI_WORKER:
+            # Imported here since ui_worker builds on this module
+            from ui_worker import ProcessDriver
+            _driver = ProcessDriver(settings.UI_WORKER_CALL_TIMEOUT, settings.UI_WORKER_RECYCLE_ROWS,
+                                    settings.BACKGROUND_INPUT)
+        else:
+            _driver = pywinauto_driver(settings.BACKGROUND_INPUT)
+    return _driver
+
+
+def pywinauto_driver(background):
+    """
+    Creates a driver that talks to Epicor in this process
+
+    :param background: Actuate controls without the mouse or the keyboard focus
+    :type background: bool
+    :return: A BackgroundDriver or a PywinautoDriver
+    """
+    return BackgroundDriver() if background else PywinautoDriver()
+
+
+def install_driver(driver):
+    """
+    Replaces the current driver, e.g. with a recording or replaying one
+
+    :param driver: The driver to install, or None to go back to the pywinauto driver on next use
+    :return: The driver that was installed before
+    """
+
+    global _driver
+    previous, _driver = _driver, driver
+    return previous
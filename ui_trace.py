@@ -0,0 +1,332 @@
+from statistics import mean, median
+from ui_driver import current_driver, install_driver
+import argparse
+import os
+import tempfile
+import json
+import time
+
+
+# Results of these calls are kept in the trace; everything else returns the element it was called on
+RESULT_CALLS = ("exists", "get_toggle_state", "window_text", "is_enabled", "is_visible", "wait_for_dialog",
+                "read_fields")
+
+
+class TraceMismatchError(Exception):
+    """Raised when a replayed run makes a call that differs from the next call in the trace"""
+
+
+class RecordingDriver:
+    def __init__(self, driver, trace_path, header):
+        """
+        Initializes the RecordingDriver class instance, which passes every call through to a real driver and writes
+        it to a trace file with its arguments, result, and measured latency
+
+        :param driver: The driver that actually talks to Epicor
+        :param trace_path: The path of the trace file (JSON lines)
+        :type trace_path: str
+        :param header: The run inputs (operation, form data, label data, and rows read, or job entries) replayed with
+        the trace
+        :type header: dict
+        """
+
+        self.driver = driver
+        self.ElementNotFoundError = driver.ElementNotFoundError
+        self.TimeoutError = driver.TimeoutError
+        self.file = open(trace_path, "w", encoding="utf-8")
+        self._write(dict(header, kind="header"))
+
+    def connect(self, **criteria):
+        return RecordedElement(self, self.call([], "connect", lambda: self.driver.connect(**criteria), (), criteria),
+                               [])
+
+    def send_keys(self, keys):
+        self.call([], "send_keys", lambda: self.driver.send_keys(keys), (keys,), {})
+
+    def wait_for_dialog(self, window, titles, timeout):
+        return self.call(window._path, "wait_for_dialog",
+                         lambda: self.driver.wait_for_dialog(window._target, titles, timeout),
+                         (list(titles), timeout), {})
+
+    def read_fields(self, window, text_ids, toggle_ids):
+        return self.call(window._path, "read_fields",
+                         lambda: self.driver.read_fields(window._target, text_ids, toggle_ids),
+                         (list(text_ids), list(toggle_ids)), {})
+
+    def call(self, path, name, action, args, kwargs):
+        """
+        Performs a driver call and records it, including the error it raised
+
+        :param path: The criteria of every window specification leading to the element
+        :type path: list
+        :param name: The name of the call
+        :type name: str
+        :param action: A callable that performs the call
+        :param args: The positional arguments of the call
+        :type args: tuple
+        :param kwargs: The keyword arguments of the call
+        :type kwargs: dict
+        :return: Whatever the call returned
+        """
+
+        record = {"kind": "call", "path": path, "call": name, "args": list(args), "kwargs": kwargs}
+        started = time.perf_counter()
+        try:
+            result = action()
+        except Exception as e:
+            record.update(latency=round(time.perf_counter() - started, 6), error=type(e).__name__, message=str(e))
+            self._write(record)
+            raise
+        record["latency"] = round(time.perf_counter() - started, 6)
+        if name in RESULT_CALLS:
+            record["result"] = result
+        self._write(record)
+        return result
+
+    def close(self):
+        self.file.close()
+
+    def _write(self, record):
+        self.file.write(json.dumps(record, default=str) + "\n")
+
+
+class RecordedElement:
+    def __init__(self, recorder, target, path):
+        self._recorder = recorder
+        self._target = target
+        self._path = path
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            result = self._recorder.call(self._path, name, lambda: getattr(self._target, name)(*args, **kwargs),
+                                         args, kwargs)
+            if name in ("window", "child_window"):
+                return RecordedElement(self._recorder, result, self._path + [kwargs])
+            return result if name in RESULT_CALLS else self
+        return call
+
+
+class ReplayDriver:
+    # Stand-ins for pywinauto's exceptions, raised where the recorded run raised them
+    class ElementNotFoundError(Exception):
+        pass
+
+    class TimeoutError(Exception):
+        pass
+
+    def __init__(self, calls, realtime=False):
+        """
+        Initializes the ReplayDriver class instance, which answers every call from a recorded trace instead of
+        Epicor. Calls must arrive in the recorded order with the recorded arguments.
+
+        :param calls: The call records of the trace, in order
+        :type calls: list
+        :param realtime: Wait out each call's recorded latency, so the replay takes as long as the recorded run
+        :type realtime: bool
+        """
+
+        self.calls = calls
+        self.position = 0
+        self.realtime = realtime
+        self.simulated_latency = 0.0
+
+    def connect(self, **criteria):
+        self.call([], "connect", (), criteria)
+        return ReplayElement(self, [])
+
+    def send_keys(self, keys):
+        self.call([], "send_keys", (keys,), {})
+
+    def wait_for_dialog(self, window, titles, timeout):
+        return self.call(window._path, "wait_for_dialog", (list(titles), timeout), {})
+
+    def read_fields(self, window, text_ids, toggle_ids):
+        return self.call(window._path, "read_fields", (list(text_ids), list(toggle_ids)), {})
+
+    def call(self, path, name, args, kwargs):
+        """
+        Matches a call with the next record of the trace and answers it
+
+        :raises TraceMismatchError: If the call differs from the recorded one or the trace is exhausted
+        :return: The recorded result
+        """
+
+        if self.position >= len(self.calls):
+            raise TraceMismatchError(f"Call {name} on {path} was not recorded (trace exhausted)")
+        record = self.calls[self.position]
+        actual = json.loads(json.dumps({"path": path, "call": name, "args": list(args), "kwargs": kwargs},
+                                       default=str))
+        expected = {key: record[key] for key in ("path", "call", "args", "kwargs")}
+        if actual != expected:
+            raise TraceMismatchError(f"Call {self.position + 1} differs from the trace:\n"
+                                     f"  recorded: {expected}\n  replayed: {actual}")
+        self.position += 1
+
+        self.simulated_latency += record["latency"]
+        if self.realtime:
+            time.sleep(record["latency"])
+        if record.get("error"):
+            raise getattr(self, record["error"], RuntimeError)(record.get("message", ""))
+        return record.get("result")
+
+    def unused_calls(self):
+        return len(self.calls) - self.position
+
+
+class ReplayElement:
+    def __init__(self, replayer, path):
+        self._replayer = replayer
+        self._path = path
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            result = self._replayer.call(self._path, name, args, kwargs)
+            if name in ("window", "child_window"):
+                return ReplayElement(self._replayer, self._path + [kwargs])
+            return result if name in RESULT_CALLS else self
+        return call
+
+
+def recording(trace_path, header, work):
+    """
+    Runs the work with every driver call recorded to a trace file
+
+    :param trace_path: The path of the trace file
+    :type trace_path: str
+    :param header: The run inputs needed to replay the trace
+    :type header: dict
+    :param work: A callable that performs the run
+    :return: Whatever the work returned
+    """
+
+    recorder = RecordingDriver(current_driver(), trace_path, header)
+    previous = install_driver(recorder)
+    try:
+        return work()
+    finally:
+        install_driver(previous)
+        recorder.close()
+
+
+def load_trace(trace_path):
+    """
+    Reads a trace file
+
+    :param trace_path: The path of the trace file
+    :type trace_path: str
+    :return: A tuple of the header and the list of call records
+    :rtype: tuple
+    """
+
+    with open(trace_path, "r", encoding="utf-8") as trace_file:
+        records = [json.loads(line) for line in trace_file if line.strip()]
+    if not records or records[0].get("kind") != "header":
+        raise ValueError(f"{trace_path} is not a UI trace")
+    return records[0], [record for record in records[1:] if record.get("kind") == "call"]
+
+
+def replay(trace_path, realtime=False):
+    """
+    Runs the recorded operation again with the same inputs against the trace instead of Epicor. The operations log,
+    the history, and the snapshots of the replay go to a scratch folder instead of the working folder, no run report
+    is written, and every setting the replay changes is put back when it returns.
+
+    :param trace_path: The path of the trace file
+    :type trace_path: str
+    :param realtime: Wait out each call's recorded latency
+    :type realtime: bool
+    :return: A dictionary with the number of calls replayed, the recorded UI time, the wall time of the replay, and
+    the scratch folder holding its operations log
+    :rtype: dict
+    """
+
+    # Imported here so recording from erp_manager does not import it back while it is loading
+    from erp_manager import (ERPManager, CreateOperation, OverwriteOperation, DeleteOperation, OperationType,
+                             OperationLogger, install_operation_logger)
+    from snapshots import SnapshotStore, install_snapshot_store
+    from operation_history import HISTORY_FILENAME
+    import settings
+
+    header, calls = load_trace(trace_path)
+    replayer = ReplayDriver(calls, realtime)
+
+    # Rows skipped through the history would make the replay diverge from the trace, and pacing, a verification
+    # pass, or a report would only add waits and files
+    overrides = {"SKIP_APPLIED_ROWS": False, "VERIFY_EXPORT_FILE": None, "RATE_TARGET_ROWS_PER_MINUTE": None,
+                 "RECORD_TRACE_FILE": None, "RUN_REPORT": False, "UNATTENDED": header.get("unattended", False),
+                 "SNAPSHOT_CHANGES": header.get("snapshots", False)}
+    # Traces recorded before the failure monitor existed ran without one
+    overrides.update(header.get("failure_monitor", {"CANARY_ROWS": 0, "FAILURE_RATE_THRESHOLD": None}))
+    saved = {name: getattr(settings, name) for name in overrides}
+
+    folder = tempfile.mkdtemp(prefix="replay_")
+    logger = OperationLogger(folder)
+    store = SnapshotStore(os.path.join(folder, HISTORY_FILENAME))
+    previous_logger, previous_store = install_operation_logger(logger), install_snapshot_store(store)
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    erp_manager = ERPManager(CreateOperation(), OverwriteOperation(), DeleteOperation())
+    previous = install_driver(replayer)
+    started = time.perf_counter()
+    try:
+        if "job_entries" in header:
+            erp_manager.perform_job(header["job_entries"])
+        else:
+            # Traces recorded before the rows were kept read them from the workbook again
+            erp_manager.perform_operation(OperationType[header["operation"]], header["file_data"],
+                                          header["label_data"], header.get("rows"))
+    finally:
+        install_driver(previous)
+        logger.flush()
+        store.flush()
+        install_operation_logger(previous_logger)
+        install_snapshot_store(previous_store)
+        for name, value in saved.items():
+            setattr(settings, name, value)
+
+    if replayer.unused_calls():
+        raise TraceMismatchError(f"The replay stopped {replayer.unused_calls()} calls before the end of the trace")
+    return {"calls": replayer.position, "recorded_ui_time": replayer.simulated_latency,
+            "wall_time": time.perf_counter() - started, "output_folder": folder}
+
+
+def latency_summary(calls):
+    """
+    Summarizes the recorded latency of every kind of call
+
+    :param calls: The call records of a trace
+    :type calls: list
+    :return: The summary lines
+    :rtype: list
+    """
+
+    by_call = {}
+    for record in calls:
+        # Lookups are named after the element they look up, every other call after the element it acts on
+        if record["call"] in ("connect", "window", "child_window"):
+            target = record["kwargs"]
+        else:
+            target = record["path"][-1] if record["path"] else {}
+        name = f"{record['call']}({', '.join(f'{key}={value}' for key, value in target.items())})"
+        by_call.setdefault(name, []).append(record["latency"])
+
+    lines = [f"{'call':<60}{'count':>7}{'total (s)':>11}{'mean':>9}{'median':>9}{'max':>9}"]
+    for name, latencies in sorted(by_call.items(), key=lambda item: -sum(item[1])):
+        lines.append(f"{name[:59]:<60}{len(latencies):>7}{sum(latencies):>11.3f}{mean(latencies):>9.3f}"
+                     f"{median(latencies):>9.3f}{max(latencies):>9.3f}")
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay or summarize a recorded PartCreator UI trace")
+    parser.add_argument("trace", help="Path to a trace recorded with --record-trace")
+    parser.add_argument("--stats", action="store_true", help="Only summarize the recorded call latencies")
+    parser.add_argument("--realtime", action="store_true", help="Wait out each call's recorded latency")
+    args = parser.parse_args()
+
+    if args.stats:
+        print("\n".join(latency_summary(load_trace(args.trace)[1])))
+    else:
+        result = replay(args.trace, args.realtime)
+        print(f"Replayed {result['calls']} calls in {result['wall_time']:.3f} s "
+              f"(recorded UI time {result['recorded_ui_time']:.3f} s); its log is in {result['output_folder']}")
@@ -0,0 +1,214 @@
+from ui_driver import pywinauto_driver
+from ui_trace import RESULT_CALLS
+from telemetry import telemetry
+import multiprocessing
+
+
+class UIWorkerError(Exception):
+    """Raised when the UI worker process died while answering a call"""
+
+
+class ProcessDriver:
+    # Stand-ins for pywinauto's exceptions, raised where the worker's call raised them
+    class ElementNotFoundError(Exception):
+        pass
+
+    class TimeoutError(Exception):
+        pass
+
+    def __init__(self, call_timeout, recycle_rows, background=False):
+        """
+        Initializes the ProcessDriver class instance, which runs every pywinauto and COM call in a separate worker
+        process. The worker is killed and started again when a call misses its deadline, and recycled every few
+        rows so the COM objects UI Automation leaves behind never pile up over a long run. The batch, the log, and
+        the history stay in this process.
+
+        :param call_timeout: The number of seconds a call may take before the worker is considered hung
+        :type call_timeout: float
+        :param recycle_rows: The number of rows after which the worker is replaced, or None to never recycle it
+        :type recycle_rows: int
+        :param background: Have the worker actuate controls without the mouse or the keyboard focus
+        :type background: bool
+        """
+
+        self.call_timeout = call_timeout
+        self.recycle_rows = recycle_rows
+        self.background = background
+        self.process = None
+        self.connection = None
+        self.connects = 0  # Every row starts by connecting, so connects count the rows since the worker started
+        self._start()
+
+    def connect(self, **criteria):
+        """
+        Connects the worker to a running application. Rows reconnect before they start, so this is also where a
+        worker that has served its rows is recycled.
+
+        :param criteria: The search criteria of its window, e.g. title="Part Maintenance"
+        :return: The connected application, whose window(**criteria) method returns a window specification
+        """
+
+        if self.recycle_rows and self.connects >= self.recycle_rows:
+            self._stop()
+            self._start()
+            telemetry.debug(step="ui_worker", outcome="recycled")
+        self.connects += 1
+        self.call(criteria, [], "connect", (), {})
+        return WorkerElement(self, criteria, [])
+
+    def send_keys(self, keys):
+        self.call(None, [], "send_keys", (keys,), {})
+
+    def wait_for_dialog(self, window, titles, timeout):
+        return self.call(window._criteria, window._steps, "wait_for_dialog", (tuple(titles), timeout), {},
+                         self.call_timeout + timeout)
+
+    def read_fields(self, window, text_ids, toggle_ids):
+        return self.call(window._criteria, window._steps, "read_fields", (list(text_ids), list(toggle_ids)), {})
+
+    def call(self, criteria, steps, name, args, kwargs, timeout=None):
+        """
+        Sends a call to the worker and waits for its answer until the deadline
+
+        :param criteria: The connect criteria of the application the element belongs to
+        :type criteria: dict
+        :param steps: The (method, criteria) lookups leading from the application to the element
+        :type steps: list
+        :param name: The name of the call
+        :type name: str
+        :param args: The positional arguments of the call
+        :type args: tuple
+        :param kwargs: The keyword arguments of the call
+        :type kwargs: dict
+        :param timeout: The deadline of the call in seconds. Defaults to the driver's call timeout.
+        :type timeout: float
+        :raises TimeoutError: If the worker did not answer in time. The worker is replaced.
+        :raises UIWorkerError: If the worker died. The worker is replaced.
+        :return: The result of the call for calls in RESULT_CALLS, None otherwise
+        """
+
+        timeout = self.call_timeout if timeout is None else timeout
+        try:
+            self.connection.send((criteria, steps, name, args, kwargs))
+            answered = self.connection.poll(timeout)
+            if answered:
+                answer = self.connection.recv()
+        except (EOFError, OSError) as e:
+            self._restart("died")
+            raise UIWorkerError(f"The UI worker died during {name}: {e}")
+        if not answered:
+            self._restart("killed")
+            raise self.TimeoutError(f"{name} did not answer within {timeout} seconds")
+
+        status, result = answer
+        if status == "ok":
+            return result
+        error_name, message = result
+        if error_name == "ElementNotFoundError":
+            raise self.ElementNotFoundError(message)
+        if error_name == "TimeoutError":
+            raise self.TimeoutError(message)
+        raise UIWorkerError(f"{error_name}: {message}")
+
+    def close(self):
+        self._stop()
+
+    def _start(self):
+        # The worker is a fresh process (spawned on Windows), so it imports pywinauto and connects on its own
+        self.connection, worker_connection = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=serve, args=(worker_connection, self.background),
+                                               name="ui-worker", daemon=True)
+        self.process.start()
+        worker_connection.close()
+        self.connects = 0
+
+    def _stop(self):
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.process.join(5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.connection.close()
+
+    def _restart(self, outcome):
+        telemetry.warning(f"Restarting the UI worker ({outcome})", step="ui_worker", outcome=outcome)
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+        self._start()
+
+
+class WorkerElement:
+    def __init__(self, driver, criteria, steps):
+        """
+        Initializes the WorkerElement class instance, which stands for a window specification living in the worker.
+        Lookups (window and child_window) only extend the path and cost no round trip; every other call is sent to
+        the worker with the path, which resolves it again there.
+
+        :param driver: The driver that owns the worker
+        :type driver: ProcessDriver
+        :param criteria: The connect criteria of the application the element belongs to
+        :type criteria: dict
+        :param steps: The (method, criteria) lookups leading from the application to the element
+        :type steps: list
+        """
+
+        self._driver = driver
+        self._criteria = criteria
+        self._steps = steps
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            if name in ("window", "child_window"):
+                return WorkerElement(self._driver, self._criteria, self._steps + [(name, kwargs)])
+            result = self._driver.call(self._criteria, self._steps, name, args, kwargs)
+            return result if name in RESULT_CALLS else self
+        return call
+
+
+def serve(connection, background=False):
+    """
+    Main loop of the worker process: answers calls with a pywinauto driver until it is told to stop
+
+    :param connection: The worker's end of the pipe
+    :param background: Actuate controls without the mouse or the keyboard focus
+    :type background: bool
+    :return: None
+    """
+
+    driver = pywinauto_driver(background)
+    applications = {}
+
+    def resolve(criteria, steps):
+        key = tuple(sorted(criteria.items()))
+        if key not in applications:
+            applications[key] = driver.connect(**criteria)
+        element = applications[key]
+        for method, step_criteria in steps:
+            element = getattr(element, method)(**step_criteria)
+        return element
+
+    while True:
+        request = connection.recv()
+        if request is None:
+            return
+        criteria, steps, name, args, kwargs = request
+        try:
+            if name == "connect":
+                applications[tuple(sorted(criteria.items()))] = driver.connect(**criteria)
+                result = None
+            elif name == "send_keys":
+                driver.send_keys(*args)
+                result = None
+            elif name in ("wait_for_dialog", "read_fields"):
+                result = getattr(driver, name)(resolve(criteria, steps), *args)
+            else:
+                result = getattr(resolve(criteria, steps), name)(*args, **kwargs)
+                result = result if name in RESULT_CALLS else None
+        except Exception as e:
+            connection.send(("error", (type(e).__name__, str(e))))
+            continue
+        connection.send(("ok", result))
@@ -0,0 +1,226 @@
+from openpyxl import load_workbook
+from telemetry import telemetry
+import time
+import csv
+import os
+
+
+# Headers a part-master export may use for each Label Information field, checked in order. Adjust these to match
+# the columns of the site's export (BAQ or DMT) if they differ.
+EXPORT_COLUMNS = {
+    "Part Number": ("Part Number", "PartNum", "Part_PartNum"),
+    "Type": ("Type", "TypeCode", "Part_TypeCode"),
+    "Group": ("Group", "ProdCode", "Part_ProdCode"),
+    "Class": ("Class", "ClassID", "Part_ClassID"),
+    "Label Group": ("Label Group", "LabelGroup_c", "Part_LabelGroup_c"),
+    "Reporting Group": ("Reporting Group", "ReportingGroup_c", "Part_ReportingGroup_c"),
+    "On Hold Reason": ("On Hold Reason", "OnHoldReasonCode", "Part_OnHoldReasonCode"),
+    "Priced Part": ("Priced Part", "PricedPart_c", "Part_PricedPart_c"),
+    "Salesforce Sync": ("Salesforce Sync", "SalesforceSync_c", "Part_SalesforceSync_c"),
+    "Catalog Part": ("Catalog Part", "CatalogPart_c", "Part_CatalogPart_c")
+}
+DROPDOWN_FIELDS = ("Type", "Group", "Class", "Label Group", "Reporting Group", "On Hold Reason")
+CHECKBOX_FIELDS = ("Priced Part", "Salesforce Sync", "Catalog Part")
+
+# Part types are exported as their one-letter codes
+TYPE_CODES = {"Manufactured": "M", "Purchased": "P", "Sales Kit": "K"}
+
+
+class PartExportReader:
+    def __init__(self, export_path):
+        """
+        Initializes the PartExportReader class instance, which reads part records out of a part-master export
+        (.xlsx or .csv) instead of opening every part in the Part Maintenance edit form
+
+        :param export_path: The path to the part-master export
+        :type export_path: str
+        """
+
+        self.export_path = export_path
+
+    def read(self, part_numbers):
+        """
+        Streams the export once and keeps only the records of the requested part numbers
+
+        :param part_numbers: The part numbers to look up
+        :type part_numbers: set
+        :return: A tuple of a dictionary whose keys are part numbers and whose values are dictionaries keyed by
+        Label Information field, and the list of fields the export does not contain
+        :rtype: tuple
+        """
+
+        rows = self._rows()
+        headers = [str(header).strip() if header is not None else "" for header in next(rows, [])]
+        positions = {}
+        for field, names in EXPORT_COLUMNS.items():
+            for name in names:
+                if name in headers:
+                    positions[field] = headers.index(name)
+                    break
+        if "Part Number" not in positions:
+            raise ValueError(f"The part export {self.export_path} has no part number column")
+
+        records = {}
+        for values in rows:
+            part_number = values[positions["Part Number"]] if positions["Part Number"] < len(values) else None
+            if part_number is None or str(part_number).strip() not in part_numbers:
+                continue
+            records[str(part_number).strip()] = {
+                field: values[position] if position < len(values) else None
+                for field, position in positions.items()
+            }
+
+        return records, [field for field in EXPORT_COLUMNS if field not in positions]
+
+    def _rows(self):
+        if os.path.splitext(self.export_path)[1].lower() == ".csv":
+            with open(self.export_path, "r", encoding="utf-8-sig", newline="") as export_file:
+                yield from csv.reader(export_file)
+        else:
+            workbook = load_workbook(self.export_path, read_only=True, data_only=True)
+            try:
+                yield from workbook.active.iter_rows(values_only=True)
+            finally:
+                workbook.close()
+
+
+def wait_for_export(export_path, newer_than, timeout):
+    """
+    Waits for the part-master export to be refreshed after the run, e.g. by a scheduled export in Epicor
+
+    :param export_path: The path to the part-master export
+    :type export_path: str
+    :param newer_than: The time (as returned by time.time) the export must have been written after
+    :type newer_than: float
+    :param timeout: The number of seconds to wait before giving up
+    :type timeout: float
+    :return: True if a fresh export is available, False if the wait timed out
+    :rtype: bool
+    """
+
+    deadline = time.time() + timeout
+    while True:
+        if os.path.exists(export_path) and os.path.getmtime(export_path) >= newer_than:
+            # Give the exporting process a moment to finish writing the file
+            time.sleep(1)
+            return True
+        if time.time() >= deadline:
+            return False
+        time.sleep(2)
+
+
+def expected_values(operation, label_data):
+    """
+    Lists the field values a completed create or overwrite should have left in Epicor
+
+    :param operation: The operation name the row was logged under (Create or Overwrite)
+    :type operation: str
+    :param label_data: A dictionary containing user data related to the label information form
+    :type label_data: dict
+    :return: A dictionary whose keys are Label Information fields and whose values are the expected values
+    :rtype: dict
+    """
+
+    expected = {}
+    for field in DROPDOWN_FIELDS:
+        # Overwrites leave empty dropdowns untouched
+        if label_data.get(field) or operation == "Create":
+            expected[field] = label_data.get(field) or ""
+    for field in CHECKBOX_FIELDS:
+        expected[field] = bool(label_data.get(field))
+    return expected
+
+
+def values_match(field, expected, actual):
+    """
+    Compares an expected field value with the exported one. Dropdown values are shown as 'CODE - Description' in
+    the forms while exports usually hold only the code, so either form matches.
+
+    :param field: The Label Information field
+    :type field: str
+    :param expected: The value chosen in the Label Information form
+    :param actual: The value read from the export
+    :return: True if the values match
+    :rtype: bool
+    """
+
+    if field in CHECKBOX_FIELDS:
+        return expected == (str(actual).strip().lower() in ("1", "true", "yes", "y", "x"))
+
+    expected = str(expected or "").strip().lower()
+    actual = str(actual if actual is not None else "").strip().lower()
+    if field == "Type":
+        codes = {code.lower() for name, code in TYPE_CODES.items() if name.lower() == expected}
+        if actual in codes:
+            return True
+    return actual == expected or (actual != "" and expected.startswith(actual + " "))
+
+
+def find_mismatches(applied_rows, records, missing_fields):
+    """
+    Compares every applied part with its exported record in one batch
+
+    :param applied_rows: Dictionaries with 'Operation', 'Part Number', and 'Label Data' keys for every completed row
+    :type applied_rows: list
+    :param records: The exported records keyed by part number, as returned by PartExportReader.read
+    :type records: dict
+    :param missing_fields: The fields the export does not contain, which are not compared
+    :type missing_fields: list
+    :return: A list of (operation, part number, status) tuples describing each mismatch
+    :rtype: list
+    """
+
+    # Only the last action applied to a part describes the state it should be in now
+    final_rows = {str(applied["Part Number"]).strip(): applied for applied in applied_rows}
+
+    mismatches = []
+    for part_number, applied in final_rows.items():
+        record = records.get(part_number)
+        if applied["Operation"] == "Delete":
+            if record is not None:
+                mismatches.append((applied["Operation"], part_number, "Verification failed - part still exists"))
+            continue
+        if record is None:
+            mismatches.append((applied["Operation"], part_number, "Verification failed - part not in export"))
+            continue
+
+        differences = [
+            f"{field}: expected '{expected}', found '{record[field]}'"
+            for field, expected in expected_values(applied["Operation"], applied["Label Data"]).items()
+            if field not in missing_fields and not values_match(field, expected, record[field])
+        ]
+        if differences:
+            mismatches.append((applied["Operation"], part_number,
+                               "Verification failed - " + "; ".join(differences)))
+
+    return mismatches
+
+
+def verify_applied_rows(applied_rows, reader, logger):
+    """
+    Reads back every applied part in a single pass and writes each mismatch to the operations log
+
+    :param applied_rows: Dictionaries with 'Operation', 'Part Number', and 'Label Data' keys for every completed row
+    :type applied_rows: list
+    :param reader: An object whose read(part_numbers) method returns the current records, such as a
+    PartExportReader
+    :param logger: The OperationLogger the mismatches are written to
+    :return: The number of mismatches found
+    :rtype: int
+    """
+
+    if not applied_rows:
+        return 0
+
+    records, missing_fields = reader.read({str(applied["Part Number"]).strip() for applied in applied_rows})
+    if missing_fields:
+        telemetry.warning(f"Not verified (missing from the export): {', '.join(missing_fields)}", step="verify")
+
+    mismatches = find_mismatches(applied_rows, records, missing_fields)
+    for operation, part_number, status in mismatches:
+        logger.log_operation(operation, part_number, "n/a", status)
+        telemetry.warning(f"{part_number} - {status}", step="verify", part_number=part_number, outcome="mismatch")
+
+    telemetry.info(f"Verified {len({str(applied['Part Number']).strip() for applied in applied_rows})} parts: "
+                   f"{len(mismatches)} mismatches", step="verify", outcome=len(mismatches))
+    return len(mismatches)
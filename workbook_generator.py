@@ -0,0 +1,160 @@
+from openpyxl import Workbook
+import argparse
+import random
+import string
+
+
+# Part number families and how often they appear, modelled on the part catalog
+PART_FAMILIES = {
+    "KDR": 30, "KLR": 12, "HGP": 10, "HG7": 8, "KMG": 6, "MSD": 5, "KTR": 5, "PFG": 4, "HSE": 4, "ENCL": 3,
+    "CUST": 8, "COMP": 5
+}
+
+DESCRIPTION_WORDS = (
+    "reactor", "filter", "harmonic", "panel", "kit", "enclosure", "line", "load", "drive", "motor", "guard",
+    "assembly", "bracket", "terminal", "block", "fuse", "breaker", "contactor", "fan", "cover", "door", "label",
+    "cable", "lug", "bolt", "washer", "nut", "coil", "core", "capacitor", "resistor", "board", "NEMA", "open",
+    "type", "1", "3R", "12", "480V", "600V", "208V", "60Hz", "50Hz", "3-phase", "5%", "3%", "copper", "aluminum",
+    "custom", "standard", "spare", "replacement", "service", "obsolete"
+)
+
+ACTION_VALUES = ("Create", "Overwrite", "Delete")
+
+# Rates of the irregular cells a real workbook carries, each exercising a different validation rule
+NUMERIC_PART_RATE = 0.002
+SPACED_PART_RATE = 0.002
+DUPLICATE_PART_RATE = 0.003
+SPECIAL_DESCRIPTION_RATE = 0.02
+LINE_BREAK_DESCRIPTION_RATE = 0.001
+
+
+def part_number(rng):
+    """
+    Draws a part number such as 'KDR-A-0480-3' or 'HGP480T-12'
+
+    :param rng: The random number generator
+    :type rng: random.Random
+    :return: The part number
+    :rtype: str
+    """
+
+    family = rng.choices(list(PART_FAMILIES), weights=list(PART_FAMILIES.values()))[0]
+    style = rng.random()
+    if style < 0.5:
+        return f"{family}-{rng.choice(string.ascii_uppercase[:8])}-{rng.randint(1, 9999):04d}-{rng.randint(1, 9)}"
+    if style < 0.85:
+        return f"{family}{rng.choice((208, 240, 480, 600))}{rng.choice('TWSE')}-{rng.randint(1, 250)}"
+    return f"{family}{rng.randint(10000, 999999)}"
+
+
+def description(rng):
+    """
+    Draws a description whose word count follows a long-tailed distribution, like the free text of the catalog
+
+    :param rng: The random number generator
+    :type rng: random.Random
+    :return: The description
+    :rtype: str
+    """
+
+    words = rng.choices(DESCRIPTION_WORDS, k=max(1, min(60, int(rng.lognormvariate(1.6, 0.6)))))
+    text = " ".join(words).capitalize()
+    if rng.random() < SPECIAL_DESCRIPTION_RATE:
+        text += rng.choice((" (M6)", " 1/2\"", " +/- 5%", " {spare}", " ^A", " ~approx"))
+    if rng.random() < LINE_BREAK_DESCRIPTION_RATE:
+        text += "\nsee drawing"
+    return text
+
+
+def generate_workbook(path, rows, seed=0, sheets=3, blank_row_rate=0.01, blank_cell_rate=0.02):
+    """
+    Writes a seeded synthetic input workbook: a 'Parts' sheet with a header row and the given number of part rows
+    (part number, description, action, and sparsely filled note columns) among other sheets, with blank rows, blank
+    cells, and a small share of the irregular values operators produce. The same seed always gives the same
+    workbook. Rows are streamed, so a million rows fit in little memory.
+
+    :param path: The path of the workbook to write
+    :type path: str
+    :param rows: The number of part rows
+    :type rows: int
+    :param seed: The seed of the random number generator
+    :type seed: int
+    :param sheets: The number of sheets, including the 'Parts' sheet
+    :type sheets: int
+    :param blank_row_rate: The share of rows left entirely empty
+    :type blank_row_rate: float
+    :param blank_cell_rate: The share of part number and description cells left empty
+    :type blank_cell_rate: float
+    :return: File data for the 'Parts' sheet, as the File Information form collects it
+    :rtype: dict
+    """
+
+    rng = random.Random(seed)
+    workbook = Workbook(write_only=True)
+    parts_index = rng.randrange(max(1, sheets))
+    for index in range(max(1, sheets)):
+        if index == parts_index:
+            _write_parts_sheet(workbook.create_sheet("Parts"), rows, rng, blank_row_rate, blank_cell_rate)
+        else:
+            # Other sheets hold a slice of the catalog, so opening the workbook costs what a real one does
+            other = workbook.create_sheet(f"Archive {index + 1}")
+            other.append(["Part Number", "Description", "Retired"])
+            for _ in range(rows // 10):
+                other.append([part_number(rng), description(rng), rng.random() < 0.3])
+    workbook.save(path)
+
+    return {
+        "Input File": path,
+        "Sheet Name": "Parts",
+        "Sheet Index": parts_index,
+        "First Row": 2,
+        "Last Row": rows + 1,
+        "Part Column Letter": "A",
+        "Description Column Letter": "B",
+        "Action Column Letter": "C"
+    }
+
+
+def _write_parts_sheet(sheet, rows, rng, blank_row_rate, blank_cell_rate):
+    sheet.append(["Part Number", "Description", "Action", "Notes", "Qty", "Owner"])
+    recent = []
+    for _ in range(rows):
+        if rng.random() < blank_row_rate:
+            sheet.append([])
+            continue
+
+        draw = rng.random()
+        if draw < NUMERIC_PART_RATE:
+            part = rng.randint(100000, 9999999)
+        elif draw < NUMERIC_PART_RATE + SPACED_PART_RATE:
+            part = f" {part_number(rng)} "
+        elif draw < NUMERIC_PART_RATE + SPACED_PART_RATE + DUPLICATE_PART_RATE and recent:
+            part = rng.choice(recent)
+        else:
+            part = part_number(rng)
+            recent = (recent + [part])[-50:]
+
+        sheet.append([
+            None if rng.random() < blank_cell_rate else part,
+            None if rng.random() < blank_cell_rate else description(rng),
+            rng.choices(ACTION_VALUES, weights=(6, 3, 1))[0],
+            description(rng) if rng.random() < 0.05 else None,
+            rng.randint(1, 500) if rng.random() < 0.3 else None,
+            rng.choice(("planning", "engineering", "purchasing")) if rng.random() < 0.1 else None
+        ])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a seeded synthetic input workbook for benchmarks and tests")
+    parser.add_argument("path", help="The workbook to write (.xlsx)")
+    parser.add_argument("--rows", type=int, default=1000, help="Number of part rows (default: 1000)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random number generator (default: 0)")
+    parser.add_argument("--sheets", type=int, default=3, help="Number of sheets (default: 3)")
+    parser.add_argument("--blank-rows", type=float, default=0.01, help="Share of empty rows (default: 0.01)")
+    parser.add_argument("--blank-cells", type=float, default=0.02,
+                        help="Share of empty part number and description cells (default: 0.02)")
+    args = parser.parse_args()
+
+    file_data = generate_workbook(args.path, args.rows, args.seed, args.sheets, args.blank_rows, args.blank_cells)
+    print(f"Wrote {args.rows} rows to sheet '{file_data['Sheet Name']}' (index {file_data['Sheet Index']}) "
+          f"of {args.path}, rows {file_data['First Row']}-{file_data['Last Row']}")
@@ -0,0 +1,73 @@
+from openpyxl import load_workbook
+from openpyxl.utils import column_index_from_string
+
+
+# Actions a row may carry in the action column of a mixed batch
+ACTION_NAMES = ("CREATE", "OVERWRITE", "DELETE")
+
+
+def read_part_rows(file_data):
+    """
+    Reads the part numbers (and descriptions, if a description column was given) for the selected row range in a
+    single pass over the user-provided workbook
+
+    :param file_data: A dictionary containing user data related to the file information form
+    :type file_data: dict
+
+    :return: A list of row dictionaries with 'Row', 'Part Number', and 'Description' keys. The description is 'n/a'
+    when the file data has no description column. When the file data has an 'Action Column Letter', every row also
+    carries its upper-cased 'Action' (None if the cell was empty).
+    :rtype: list
+    """
+    return list(iter_part_rows(file_data))
+
+
+def iter_part_rows(file_data):
+    """
+    Streams the rows read_part_rows returns, so the first rows can be worked on while the rest are still being read
+
+    :param file_data: A dictionary containing user data related to the file information form
+    :type file_data: dict
+    :return: A generator of row dictionaries, as described in read_part_rows
+    """
+
+    first_row = int(file_data["First Row"])
+    last_row = int(file_data["Last Row"])
+    part_column = column_index_from_string(file_data["Part Column Letter"])
+    description_letter = file_data.get("Description Column Letter")
+    description_column = column_index_from_string(description_letter) if description_letter else None
+    action_letter = file_data.get("Action Column Letter")
+    action_column = column_index_from_string(action_letter) if action_letter else None
+
+    columns = [column for column in (part_column, description_column, action_column) if column]
+    min_column, max_column = min(columns), max(columns)
+    empty_values = (None,) * (max_column - min_column + 1)
+
+    workbook = load_workbook(file_data["Input File"], read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[file_data["Sheet Index"]]
+        next_row = first_row
+        for row_number, values in enumerate(sheet.iter_rows(min_row=first_row, max_row=last_row,
+                                                             min_col=min_column, max_col=max_column,
+                                                             values_only=True), first_row):
+            yield _part_row(row_number, values or empty_values, min_column, part_column, description_column,
+                            action_column)
+            next_row = row_number + 1
+    finally:
+        workbook.close()
+
+    # Read-only sheets stop at the last populated row, so anything past it is treated as empty
+    for row_number in range(next_row, last_row + 1):
+        yield _part_row(row_number, empty_values, min_column, part_column, description_column, action_column)
+
+
+def _part_row(row_number, values, min_column, part_column, description_column, action_column):
+    row = {
+        "Row": row_number,
+        "Part Number": values[part_column - min_column],
+        "Description": values[description_column - min_column] if description_column else "n/a"
+    }
+    if action_column:
+        action = values[action_column - min_column]
+        row["Action"] = str(action).strip().upper() if action is not None and str(action).strip() else None
+    return row